@@ -1,19 +1,59 @@
 #  Created byMartin.cz
 #  Copyright (c) Martin Strohalm. All rights reserved.
 
+import importlib
+
 version = (5, 0, 0)
 
 # import utils
 from .iters import aggregate, bisect, chunk, chunks, concat, count
-from .iters import argmax, argmin, argsort, index, multisort, rank
+from .iters import argmax, argmin, argsort, index, merge, multisort, rank
 from .iters import first, last, single
 from .iters import skip, skip_while, take, take_while
 from .iters import distinct, exclude, group
 from .iters import intersect, union
+from .iters import join, left_join, full_join, group_join, semi_join, anti_join
+from .iters import merge_join, asof_join
 from .iters import combinations, permutations, variations
 
-# import main class
+# import expressions
+from .expressions import Expression, col, field, item, lit
+
+# import main classes
 from .linque import Linque
+from .indexed import IndexedLinque
+from .sorted import SortedLinque
+from .disk import DiskLinque
+
+# define classes imported on first use
+LAZY = {
+    'ParallelLinque': 'parallel',
+    'AsyncLinque': 'asynchronous',
+    'ArrayLinque': 'array',
+    'ColumnarLinque': 'columnar',
+    'SqliteLinque': 'sqlite',
+    'FileLinque': 'files',
+    'ParallelFileLinque': 'files'}
+
+
+def __getattr__(name):
+    """Imports optional classes on first use."""
+    
+    if name not in LAZY:
+        message = "module '%s' has no attribute '%s'" % (__name__, name)
+        raise AttributeError(message)
+    
+    module = importlib.import_module('.' + LAZY[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    
+    return value
+
+
+def __dir__():
+    """Lists module attributes including optional classes."""
+    
+    return list(set(globals()) | set(LAZY))
 
 
 # create shortcuts
@@ -26,8 +66,8 @@ def linq(source, evaluate=False):
             Sequence of items.
         
         evaluate: bool
-            If set to True, items sequence is evaluated into tuple upon
-            class init and for each method call as well.
+            If set to True, items sequence can be iterated repeatedly and
+            the same applies to all derived sequences as well.
     """
     
     return Linque(source, evaluate)
@@ -0,0 +1,383 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+from .linque import Linque
+from .expressions import Expression, _vectorize
+
+# try import numpy
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ArrayLinque(Linque):
+    """
+    ArrayLinque keeps numeric data as NumPy array and runs the aggregations,
+    sorting, ranking and filtering as vectorized array operations instead of
+    Python-level loops over individual items. Vectorized path is used only if
+    the array is one-dimensional and of numeric or boolean type and no item's
+    selector or key is specified, otherwise the call transparently falls back
+    to the generic implementation of Linque. Items of one-dimensional array
+    are iterated as Python scalars. NumPy is an optional dependency and it is
+    required only when ArrayLinque is created.
+    """
+    
+    def __init__(self, source, evaluate=False):
+        """
+        Initializes a new instance of ArrayLinque.
+        
+        Args:
+            source: numpy.ndarray or iterable
+                Array or sequence of items to be converted into array.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        """
+        
+        if numpy is None:
+            raise ImportError("NumPy is required for ArrayLinque!")
+        
+        if not isinstance(source, numpy.ndarray):
+            source = numpy.asarray(list(source))
+        
+        super().__init__(source, False)
+        
+        self._evaluate = evaluate
+    
+    
+    def __iter__(self):
+        """Gets items iterator."""
+        
+        if self._source.ndim == 1:
+            return iter(self._source.tolist())
+        
+        return iter(self._source)
+    
+    
+    def __len__(self):
+        """Gets number of items."""
+        
+        return len(self._source)
+    
+    
+    def __getitem__(self, idx):
+        """Gets item at specified index."""
+        
+        return self._source[idx]
+    
+    
+    def argmax(self, key=None):
+        """
+        Returns index of the maximum item in a sequence by using default
+        comparer or specified item's key. The first occurrence is used.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+        
+        Returns:
+            int
+        """
+        
+        if not self._vectorized(key):
+            return super().argmax(key)
+        
+        return int(numpy.argmax(self._source))
+    
+    
+    def argmin(self, key=None):
+        """
+        Returns index of the minimum item in a sequence by using default
+        comparer or specified item's key. The first occurrence is used.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+        
+        Returns:
+            int
+        """
+        
+        if not self._vectorized(key):
+            return super().argmin(key)
+        
+        return int(numpy.argmin(self._source))
+    
+    
+    def argsort(self, key=None, reverse=False):
+        """
+        Returns items indices that would sort current sequence by using
+        default comparer or specified item's key. Equal items keep their
+        original order.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+            
+            reverse: bool
+                If set to True, sorting is reversed.
+        
+        Returns:
+            Linque
+        """
+        
+        if not self._vectorized(key):
+            return super().argsort(key, reverse)
+        
+        result = self._argsort(reverse)
+        
+        return ArrayLinque(result, self._evaluate)
+    
+    
+    def maximum(self, selector=None):
+        """
+        Returns maximum value in current sequence by specified items data
+        selector.
+        
+        Args:
+            selector: callable
+                Item's data selector.
+        
+        Returns:
+            any
+        """
+        
+        if not self._vectorized(selector):
+            return super().maximum(selector)
+        
+        return self._source.max().item()
+    
+    
+    def mean(self, selector=None):
+        """
+        Returns average value of current sequence by specified items data
+        selector.
+        
+        Args:
+            selector: callable
+                Item's data selector.
+        
+        Returns:
+            any
+        """
+        
+        if not self._vectorized(selector):
+            return super().mean(selector)
+        
+        return self._source.mean().item()
+    
+    
+    def minimum(self, selector=None):
+        """
+        Returns minimum value in current sequence by specified items data
+        selector.
+        
+        Args:
+            selector: callable
+                Item's data selector.
+        
+        Returns:
+            any
+        """
+        
+        if not self._vectorized(selector):
+            return super().minimum(selector)
+        
+        return self._source.min().item()
+    
+    
+    def rank(self, key=None, method='average', reverse=False):
+        """
+        Provides 1-based rank for each item of current sequence by using default
+        comparer or specified item's key. The ties are resolved according to
+        selected method.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+            
+            method: str
+                Method used to assign ranks to tied items.
+                    'average' - tied values are assigned by their average rank
+                    'min' - tied values are assigned by their minimum rank
+                    'max' - tied values are assigned by their maximum rank
+                    'dense' - like 'min' but without rank gaps
+                    'ordinal' - distinct rank for all values
+            
+            reverse: bool
+                If set to True, sorting is reversed.
+        
+        Returns:
+            Linque
+        """
+        
+        if not self._vectorized(key) or method not in ('average', 'min', 'max', 'dense', 'ordinal'):
+            return super().rank(key, method, reverse)
+        
+        size = len(self._source)
+        idxs = self._argsort(reverse)
+        
+        # ordinal ranks
+        if method == 'ordinal':
+            ranks = numpy.empty(size, dtype=int)
+            ranks[idxs] = numpy.arange(1, size + 1)
+            return ArrayLinque(ranks, self._evaluate)
+        
+        # find ties
+        items = self._source[idxs]
+        starts = numpy.concatenate(([True], items[1:] != items[:-1]))
+        dense = numpy.empty(size, dtype=int)
+        dense[idxs] = numpy.cumsum(starts)
+        
+        if method == 'dense':
+            return ArrayLinque(dense, self._evaluate)
+        
+        # get tie bounds
+        bounds = numpy.concatenate((numpy.nonzero(starts)[0], [size]))
+        
+        if method == 'min':
+            ranks = bounds[dense - 1] + 1
+        
+        elif method == 'max':
+            ranks = bounds[dense]
+        
+        else:
+            ranks = 0.5 * (bounds[dense] + bounds[dense - 1] + 1)
+        
+        return ArrayLinque(ranks, self._evaluate)
+    
+    
+    def sort(self, key=None, reverse=False, parallel=None, memory_limit=None):
+        """
+        Produces new sequence by sorting elements of current sequence by using
+        default comparer or specified item's key. If no key is specified, the
+        items are sorted as array, otherwise the generic sorting is used.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+            
+            reverse: bool
+                If set to True, sorting is reversed. This flag can be specified
+                independently foreach key column.
+            
+            parallel: int or None
+                Number of worker processes to use. If set to None, items are
+                sorted in current process.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are sorted in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        if not self._vectorized(key) or parallel or memory_limit or not isinstance(reverse, bool):
+            return super().sort(key, reverse, parallel, memory_limit)
+        
+        result = numpy.sort(self._source, kind='stable')
+        if reverse:
+            result = result[::-1]
+        
+        return ArrayLinque(result, self._evaluate)
+    
+    
+    def sum(self, selector=None):
+        """
+        Returns summed value in current sequence by specified items data
+        selector.
+        
+        Args:
+            selector: callable
+                Item's data selector.
+        
+        Returns:
+            any
+        """
+        
+        if not self._vectorized(selector):
+            return super().sum(selector)
+        
+        # check integer overflow
+        if self._source.dtype.kind in 'iu':
+            bound = max(abs(int(self._source.min())), abs(int(self._source.max())))
+            if bound * len(self._source) > numpy.iinfo(numpy.int64).max:
+                return sum(self._source.tolist())
+        
+        return self._source.sum().item()
+    
+    
+    def to_array(self):
+        """
+        Gets items as NumPy array. The array is not copied and it should not
+        be modified.
+        
+        Returns:
+            numpy.ndarray
+        """
+        
+        return self._source
+    
+    
+    def where(self, condition):
+        """
+        Produces new sequence by selecting items by specified predicate. The
+        predicate can also be a boolean mask array or an expression using the
+        item itself only (e.g. item() > 0), which is evaluated over the whole
+        array. Any other function is called for each item separately.
+        
+        Args:
+            condition: callable, Expression or numpy.ndarray
+                Condition to test or boolean mask.
+        
+        Returns:
+            Linque
+        """
+        
+        mask = condition
+        
+        # apply expression to array
+        if isinstance(condition, Expression):
+            mask = None
+            if self._vectorized(None) and condition.fields() == ((),):
+                mask = _vectorize(condition, {None: self._source}, numpy)
+        
+        # check mask
+        if not self._is_mask(mask):
+            return super().where(condition)
+        
+        result = self._source[mask]
+        
+        return ArrayLinque(result, self._evaluate)
+    
+    
+    def _argsort(self, reverse):
+        """Gets stable sorting indices."""
+        
+        if not reverse:
+            return numpy.argsort(self._source, kind='stable')
+        
+        size = len(self._source)
+        idxs = numpy.argsort(self._source[::-1], kind='stable')
+        
+        return size - 1 - idxs[::-1]
+    
+    
+    def _is_mask(self, mask):
+        """Checks whether given value is a valid boolean mask."""
+        
+        return (isinstance(mask, numpy.ndarray)
+            and mask.dtype == bool
+            and mask.shape == (len(self._source),))
+    
+    
+    def _vectorized(self, selector):
+        """Checks whether vectorized path can be used."""
+        
+        return (selector is None
+            and self._source.ndim == 1
+            and self._source.size > 0
+            and self._source.dtype.kind in 'biuf')
@@ -0,0 +1,812 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import asyncio
+import inspect
+from collections import deque
+from . import iters
+from .linque import Linque
+
+
+class AsyncLinque(object):
+    """
+    AsyncLinque provides Linque-like functionality over asynchronous
+    iterables. Selectors, keys and conditions can be standard functions as
+    well as coroutine functions, whose results are awaited. Similar to Linque,
+    the chain is not evaluated until necessary and the final results are
+    retrieved by awaiting one of the terminal methods. Operations requiring
+    all the items (e.g. 'group' or 'sort') collect them first and reuse the
+    standard algorithms.
+    """
+    
+    def __init__(self, source):
+        """
+        Initializes a new instance of AsyncLinque.
+        
+        Args:
+            source: iterable or async iterable
+                Sequence of items.
+        """
+        
+        self._source = source
+    
+    
+    def __aiter__(self):
+        """Gets items async iterator."""
+        
+        if hasattr(self._source, '__aiter__'):
+            return self._source.__aiter__()
+        
+        return _wrap(self._source).__aiter__()
+    
+    
+    async def aggregate(self, accumulator, seed=None):
+        """
+        Applies accumulator function over current sequence.
+        
+        Args:
+            accumulator: callable
+                Accumulator function expecting two arguments (res, next).
+            
+            seed: any
+                Initial aggregation value. If set to None, the first item is
+                used.
+        
+        Returns:
+            any
+        """
+        
+        res = seed
+        first = seed is None
+        
+        async for item in self:
+            if first:
+                res = item
+                first = False
+                continue
+            res = await _call(accumulator, res, item)
+        
+        return res
+    
+    
+    async def all(self, condition):
+        """
+        Determines whether all items of current sequence satisfy given
+        condition.
+        
+        Args:
+            condition: callable
+                Condition to test.
+        
+        Returns:
+            bool
+        """
+        
+        async for item in self:
+            if not await _call(condition, item):
+                return False
+        
+        return True
+    
+    
+    async def any(self, condition=None):
+        """
+        Determines whether current sequence contains any item or whether any
+        item of current sequence satisfies given condition.
+        
+        Args:
+            condition: callable or None
+                Condition to test.
+        
+        Returns:
+            bool
+        """
+        
+        async for item in self:
+            if condition is None or await _call(condition, item):
+                return True
+        
+        return False
+    
+    
+    def chunk(self, size):
+        """
+        Splits current sequence into chunks of specified size. If not enough
+        items in given sequence, partial tuple is returned at the end.
+        
+        Args:
+            size: int
+                Maximum size of each chunk.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            chunk = []
+            async for item in self:
+                chunk.append(item)
+                if len(chunk) == size:
+                    yield tuple(chunk)
+                    chunk = []
+            if chunk:
+                yield tuple(chunk)
+        
+        return AsyncLinque(source())
+    
+    
+    def concat(self, items):
+        """
+        Produces new sequence by appending given items at the end of current
+        sequence.
+        
+        Args:
+            items: iterable or async iterable
+                Items to append.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            async for item in self:
+                yield item
+            async for item in AsyncLinque(items):
+                yield item
+        
+        return AsyncLinque(source())
+    
+    
+    async def contains(self, value, key=None):
+        """
+        Determines whether current sequence contains specified item or value
+        by using default comparer or specified item's key.
+        
+        Args:
+            value: any
+                Item or value to check.
+            
+            key: callable or None
+                Item's key selector.
+        
+        Returns:
+            bool
+        """
+        
+        async for item in self:
+            if (await _call(key, item) if key is not None else item) == value:
+                return True
+        
+        return False
+    
+    
+    async def count(self, condition=None):
+        """
+        Returns number of items in current sequence satisfying given condition.
+        
+        Args:
+            condition: callable or None
+                Condition to test.
+        
+        Returns:
+            int
+        """
+        
+        count = 0
+        
+        async for item in self:
+            if condition is None or await _call(condition, item):
+                count += 1
+        
+        return count
+    
+    
+    def distinct(self, key=None):
+        """
+        Produces new sequence by selecting distinct items from current sequence
+        using default comparer or specified item's key. First occurrence of each
+        item is used.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            seen = set()
+            async for item in self:
+                k = await _call(key, item) if key is not None else item
+                if k not in seen:
+                    seen.add(k)
+                    yield item
+        
+        return AsyncLinque(source())
+    
+    
+    async def each(self, action):
+        """
+        Applies specified function to every item in current sequence. Any
+        return value of given function is ignored.
+        
+        Args:
+            action: callable
+                Function to be applied.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async for item in self:
+            await _call(action, item)
+        
+        return self
+    
+    
+    def enumerate(self):
+        """
+        Produces new sequence by enumerating items of current sequence into
+        (index, item) pairs.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            i = 0
+            async for item in self:
+                yield i, item
+                i += 1
+        
+        return AsyncLinque(source())
+    
+    
+    async def evaluate(self):
+        """
+        Evaluates all the items in current sequence and stores them as
+        internal list.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        if not isinstance(self._source, (list, tuple, set)):
+            self._source = await self.to_list()
+        
+        return self
+    
+    
+    def exclude(self, items, key=None):
+        """
+        Produces new sequence by excluding specified items from current sequence
+        using default comparer or specified item's key.
+        
+        Args:
+            items: (any,)
+                Items to exclude.
+            
+            key: callable or None
+                Item's key selector.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            keys = set()
+            async for item in AsyncLinque(items):
+                keys.add(await _call(key, item) if key is not None else item)
+            async for item in self:
+                if (await _call(key, item) if key is not None else item) not in keys:
+                    yield item
+        
+        return AsyncLinque(source())
+    
+    
+    async def first(self, condition=None, default=iters.UNDEFINED):
+        """
+        Returns the first item in current sequence that satisfies specified
+        condition or raises error if no item found and no default value is
+        provided.
+        
+        Args:
+            condition: callable or None
+                Condition to test.
+            
+            default: any
+                Default value.
+        
+        Returns:
+            any
+        """
+        
+        items = self.__aiter__()
+        
+        try:
+            async for item in items:
+                if condition is None or await _call(condition, item):
+                    return item
+        
+        finally:
+            await _close(items)
+        
+        if default is not iters.UNDEFINED:
+            return default
+        
+        raise ValueError("No item found.")
+    
+    
+    def flatten(self, selector=None):
+        """
+        Produces new sequence by selecting and flattening items data using
+        specified selector.
+        
+        Args:
+            selector: callable
+                Item's data selector.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            async for item in self:
+                items = await _call(selector, item) if selector is not None else item
+                async for d in AsyncLinque(items):
+                    yield d
+        
+        return AsyncLinque(source())
+    
+    
+    def group(self, key=None):
+        """
+        Produces new sequence by grouping items of current sequence according to
+        default comparer or specified item's key and creates result values as
+        (key, group) pairs. All items are collected first.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            items, keys = await self._collect(key)
+            for k, group in iters.group(zip(keys, items), lambda d: d[0]):
+                yield k, Linque(tuple(d[1] for d in group))
+        
+        return AsyncLinque(source())
+    
+    
+    async def last(self, condition=None, default=iters.UNDEFINED):
+        """
+        Returns the last item in current sequence that satisfies specified
+        condition or raises error if no item found and no default value is
+        provided.
+        
+        Args:
+            condition: callable or None
+                Condition to test.
+            
+            default: any
+                Default value.
+        
+        Returns:
+            any
+        """
+        
+        last = default
+        
+        async for item in self:
+            if condition is None or await _call(condition, item):
+                last = item
+        
+        if last is iters.UNDEFINED:
+            raise ValueError("No item found.")
+        
+        return last
+    
+    
+    async def max(self, key=None):
+        """
+        Returns item having maximum value in current sequence by using default
+        comparer or specified item's key.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+        
+        Returns:
+            any
+        """
+        
+        items, keys = await self._collect(key)
+        
+        return items[iters.argmax(keys)]
+    
+    
+    async def min(self, key=None):
+        """
+        Returns item having minimum value in current sequence by using default
+        comparer or specified item's key.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+        
+        Returns:
+            any
+        """
+        
+        items, keys = await self._collect(key)
+        
+        return items[iters.argmin(keys)]
+    
+    
+    def select(self, selector):
+        """
+        Produces new sequence by selecting items data by specified selector.
+        If the selector is a coroutine function, its results are awaited one
+        by one.
+        
+        Args:
+            selector: callable
+                Item's data selector.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            async for item in self:
+                yield await _call(selector, item)
+        
+        return AsyncLinque(source())
+    
+    
+    def select_async(self, selector, concurrency=10, ordered=True):
+        """
+        Produces new sequence by selecting items data by specified coroutine
+        function, while awaiting multiple calls concurrently. The number of
+        pending calls is limited, so that new calls are only made as the
+        results are consumed.
+        
+        Args:
+            selector: callable
+                Item's data selector.
+            
+            concurrency: int
+                Maximum number of pending calls.
+            
+            ordered: bool
+                If set to True, results are produced in the order of items,
+                otherwise as they complete.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            pending = deque()
+            items = self.__aiter__()
+            exhausted = False
+            
+            try:
+                while True:
+                    
+                    # fill pending calls
+                    while not exhausted and len(pending) < max(1, concurrency):
+                        try:
+                            item = await items.__anext__()
+                        except StopAsyncIteration:
+                            exhausted = True
+                            break
+                        pending.append(asyncio.ensure_future(_call(selector, item)))
+                    
+                    if not pending:
+                        break
+                    
+                    # keep order
+                    if ordered:
+                        task = pending.popleft()
+                    
+                    # get any finished
+                    else:
+                        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        task = done.pop()
+                        pending.remove(task)
+                    
+                    yield await task
+            
+            finally:
+                for task in pending:
+                    task.cancel()
+                await _close(items)
+        
+        return AsyncLinque(source())
+    
+    
+    def skip(self, count):
+        """
+        Produces new sequence by bypassing specified number of items in current
+        sequence and returns the remaining items.
+        
+        Args:
+            count: int
+                Number of items to skip.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            i = 0
+            async for item in self:
+                if i >= count:
+                    yield item
+                i += 1
+        
+        return AsyncLinque(source())
+    
+    
+    def skip_while(self, condition):
+        """
+        Produces new sequence by bypassing contiguous items from the start of
+        current sequence until specified condition fails the first time.
+        
+        Args:
+            condition: callable
+                Condition to test.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            failed = False
+            async for item in self:
+                if not failed:
+                    failed = not await _call(condition, item)
+                    if not failed:
+                        continue
+                yield item
+        
+        return AsyncLinque(source())
+    
+    
+    def sort(self, key=None, reverse=False):
+        """
+        Produces new sequence by sorting elements of current sequence by using
+        default comparer or specified item's key. All items are collected
+        first.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+            
+            reverse: bool or (bool,)
+                If set to True, sorting is reversed. This flag can be specified
+                independently foreach key column.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            items, keys = await self._collect(key)
+            pairs = iters.multisort(zip(keys, items), key=lambda d: d[0], reverse=reverse)
+            for k, item in pairs:
+                yield item
+        
+        return AsyncLinque(source())
+    
+    
+    async def sum(self, selector=None):
+        """
+        Returns summed value in current sequence by specified items data
+        selector.
+        
+        Args:
+            selector: callable
+                Item's data selector.
+        
+        Returns:
+            any
+        """
+        
+        total = 0
+        
+        async for item in self:
+            total += await _call(selector, item) if selector is not None else item
+        
+        return total
+    
+    
+    def take(self, count):
+        """
+        Produces new sequence by selecting specified number of contiguous items
+        from the start of current sequence.
+        
+        Args:
+            count: int
+                Number of items to take.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            if count <= 0:
+                return
+            
+            i = 0
+            items = self.__aiter__()
+            
+            try:
+                async for item in items:
+                    yield item
+                    i += 1
+                    if i >= count:
+                        return
+            
+            finally:
+                await _close(items)
+        
+        return AsyncLinque(source())
+    
+    
+    def take_while(self, condition):
+        """
+        Produces new sequence by selecting items from current sequence as long
+        as specified condition is true.
+        
+        Args:
+            condition: callable
+                Condition to test.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            async for item in self:
+                if not await _call(condition, item):
+                    return
+                yield item
+        
+        return AsyncLinque(source())
+    
+    
+    async def to_dict(self, key, value=lambda d: d):
+        """
+        Evaluates items into dictionary.
+        
+        Args:
+            key: callable
+                Item's key selector.
+            
+            value: callable
+                Item's value selector.
+        
+        Returns:
+            dict
+        """
+        
+        result = {}
+        
+        async for item in self:
+            k = await _call(key, item)
+            if k in result:
+                raise KeyError("Key is not unique.")
+            result[k] = await _call(value, item)
+        
+        return result
+    
+    
+    async def to_linque(self):
+        """
+        Evaluates items into standard Linque.
+        
+        Returns:
+            Linque
+        """
+        
+        return Linque(await self.to_list())
+    
+    
+    async def to_list(self):
+        """
+        Evaluate items into list.
+        
+        Returns:
+            list
+        """
+        
+        return [d async for d in self]
+    
+    
+    async def to_set(self):
+        """
+        Evaluate items into set.
+        
+        Returns:
+            set
+        """
+        
+        return set(await self.to_list())
+    
+    
+    async def to_tuple(self):
+        """
+        Evaluate items into tuple.
+        
+        Returns:
+            tuple
+        """
+        
+        return tuple(await self.to_list())
+    
+    
+    def where(self, condition):
+        """
+        Produces new sequence by selecting items by specified predicate. If the
+        predicate is a coroutine function, its results are awaited.
+        
+        Args:
+            condition: callable
+                Condition to test.
+        
+        Returns:
+            AsyncLinque
+        """
+        
+        async def source():
+            async for item in self:
+                if await _call(condition, item):
+                    yield item
+        
+        return AsyncLinque(source())
+    
+    
+    async def _collect(self, key):
+        """Collects all items and their keys."""
+        
+        items = await self.to_list()
+        
+        if key is None:
+            return items, items
+        
+        keys = [await _call(key, d) for d in items]
+        
+        return items, keys
+
+
+async def _call(func, *args):
+    """Calls given function and awaits the result if needed."""
+    
+    result = func(*args)
+    
+    if inspect.isawaitable(result):
+        result = await result
+    
+    return result
+
+
+async def _close(items):
+    """Closes given async iterator if possible to release pending work."""
+    
+    close = getattr(items, 'aclose', None)
+    
+    if close is not None:
+        await close()
+
+
+async def _wrap(sequence):
+    """Wraps standard iterable as async iterable."""
+    
+    for item in sequence:
+        yield item
@@ -0,0 +1,229 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import weakref
+from itertools import islice
+from .spill import Spill
+
+# define end marker
+_END = object()
+
+
+class Cache(object):
+    """
+    Cache memoizes items of a single-pass sequence lazily as they are pulled.
+    Each iteration replays the items pulled so far and continues pulling from
+    the source only as far as needed, so the source is never consumed more
+    than once and never further than requested. If memory limit is specified
+    and exceeded, further items are either spilled into temporary file or
+    error is raised. Once released, the cache keeps only the items, which are
+    still needed by running iterations.
+    """
+    
+    def __init__(self, source, memory_limit=None, spill=False):
+        """
+        Initializes a new instance of Cache.
+        
+        Args:
+            source: iterable
+                Sequence of items.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are kept in memory.
+            
+            spill: bool
+                If set to True, items exceeding the memory limit are stored in
+                temporary file, otherwise error is raised.
+        """
+        
+        self._source = source
+        self._memory_limit = memory_limit
+        self._spill = spill
+        
+        self._items = None
+        self._memory = []
+        self._stored = None
+        self._done = False
+        
+        self._keep = True
+        self._count = 0
+        self._offset = 0
+        self._readers = weakref.WeakSet()
+    
+    
+    def __len__(self):
+        """Gets number of items cached so far."""
+        
+        return len(self._memory) + (len(self._stored) if self._stored is not None else 0)
+    
+    
+    def __iter__(self):
+        """Gets items iterator."""
+        
+        if self._offset:
+            message = "Cache was released already!"
+            raise RuntimeError(message)
+        
+        reader = _Reader()
+        self._readers.add(reader)
+        
+        return self._replay(reader)
+    
+    
+    @property
+    def source(self):
+        """
+        Gets original sequence.
+        
+        Returns:
+            iterable
+        """
+        
+        return self._source
+    
+    
+    @property
+    def started(self):
+        """
+        Checks whether any item was pulled from the source already.
+        
+        Returns:
+            bool
+        """
+        
+        return self._done or self._items is not None
+    
+    
+    @property
+    def done(self):
+        """
+        Checks whether the source is fully consumed.
+        
+        Returns:
+            bool
+        """
+        
+        return self._done
+    
+    
+    def release(self):
+        """
+        Stops keeping items for future iterations. Only the items, which are
+        not yet pulled by all running iterations are kept from now on. This
+        has no effect if the items are spilled already.
+        """
+        
+        if self._stored is None:
+            self._keep = False
+            self._trim()
+    
+    
+    def close(self):
+        """Releases cached items and removes temporary file."""
+        
+        self._memory = []
+        
+        if self._stored is not None:
+            self._stored.close()
+            self._stored = None
+    
+    
+    def _pull(self, reader):
+        """Pulls next item from source into cache or gets end marker."""
+        
+        if self._done:
+            return _END
+        
+        if self._items is None:
+            self._items = iter(self._source)
+        
+        # get next
+        for item in self._items:
+            break
+        else:
+            self._done = True
+            self._items = None
+            return _END
+        
+        self._count += 1
+        
+        # keep for running iterations only
+        if not self._keep:
+            if len(self._readers) > 1:
+                self._memory.append(item)
+                self._trim(reader)
+            else:
+                del self._memory[:]
+                self._offset = self._count
+            return item
+        
+        # keep in memory
+        if self._memory_limit is None or len(self._memory) < self._memory_limit:
+            self._memory.append(item)
+            return item
+        
+        # check spill
+        if not self._spill:
+            message = "Cache memory limit exceeded! -> %d" % self._memory_limit
+            raise MemoryError(message)
+        
+        # store in file
+        if self._stored is None:
+            self._stored = Spill()
+            weakref.finalize(self, self._stored.close)
+        
+        self._stored.append(item)
+        
+        return item
+    
+    
+    def _replay(self, reader):
+        """Gets items for given iteration."""
+        
+        while True:
+            idx = reader.idx - self._offset
+            
+            # replay memory
+            if idx < len(self._memory):
+                item = self._memory[idx]
+            
+            # replay spill
+            elif reader.idx < self._count:
+                for item in islice(self._stored, idx - len(self._memory), None):
+                    reader.idx += 1
+                    yield item
+                continue
+            
+            # pull next
+            else:
+                item = self._pull(reader)
+                if item is _END:
+                    return
+            
+            reader.idx += 1
+            yield item
+    
+    
+    def _trim(self, reader=None):
+        """Removes items already pulled by all running iterations."""
+        
+        # get slowest iteration
+        low = self._count
+        for other in self._readers:
+            if other is not reader and other.idx < low:
+                low = other.idx
+        
+        # remove passed items
+        if low > self._offset:
+            del self._memory[:low - self._offset]
+            self._offset = low
+
+
+class _Reader(object):
+    """Holds position of a running iteration."""
+    
+    __slots__ = ('idx', '__weakref__')
+    
+    def __init__(self):
+        self.idx = 0
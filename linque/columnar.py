@@ -0,0 +1,379 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import array
+from . import iters
+from .linque import Linque
+from .expressions import Expression, _vectorize
+
+# try import numpy
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ColumnarLinque(Linque):
+    """
+    ColumnarLinque keeps tabular data as columns (struct of arrays) instead of
+    individual row objects. Numeric columns are stored as compact 'array.array'
+    (or kept as NumPy arrays if provided), other columns as lists. Projection,
+    filtering by column value, sorting and grouping by column keys work
+    directly on the columns and produce new ColumnarLinque. Row dictionaries
+    are created only when the items are iterated, e.g. when any generic
+    method is applied.
+    """
+    
+    def __init__(self, columns, evaluate=False):
+        """
+        Initializes a new instance of ColumnarLinque.
+        
+        Args:
+            columns: {str: iterable}
+                Column values by column name. All columns must have the same
+                length.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        """
+        
+        super().__init__((), False)
+        
+        self._evaluate = evaluate
+        self._columns = {k: _store(v) for k, v in columns.items()}
+        
+        # check size
+        sizes = set(len(c) for c in self._columns.values())
+        if len(sizes) > 1:
+            message = "Columns must have the same length! -> %s" % sorted(sizes)
+            raise ValueError(message)
+    
+    
+    def __iter__(self):
+        """Gets row items iterator."""
+        
+        names = list(self._columns)
+        columns = [_values(c) for c in self._columns.values()]
+        
+        return (dict(zip(names, d)) for d in zip(*columns))
+    
+    
+    def __len__(self):
+        """Gets number of rows."""
+        
+        for column in self._columns.values():
+            return len(column)
+        
+        return 0
+    
+    
+    def __getitem__(self, idx):
+        """Gets row item at specified index."""
+        
+        return {k: _value(c[idx]) for k, c in self._columns.items()}
+    
+    
+    def count(self, condition=None):
+        """
+        Returns number of items in current sequence satisfying given condition.
+        
+        Args:
+            condition: callable or None
+                Condition to test.
+        
+        Returns:
+            int
+        """
+        
+        if condition is None:
+            return len(self)
+        
+        return super().count(condition)
+    
+    
+    def group(self, key=None, memory_limit=None):
+        """
+        Produces new sequence by grouping items of current sequence according to
+        default comparer or specified item's key and creates result values as
+        (key, group) pairs. If the key is specified as column name or tuple of
+        column names, the groups are created directly from the columns as
+        ColumnarLinque.
+        
+        Args:
+            key: str, (str,), callable or None
+                Column name(s) or item's key selector.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        names = self._names(key)
+        if names is None:
+            return super().group(key, memory_limit)
+        
+        selector = self._selector(names, isinstance(key, str))
+        
+        def source():
+            for k, idxs in iters.group(range(len(self)), selector):
+                yield k, self._take(idxs)
+        
+        result = (d for d in source())
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def select(self, selector, threads=None, max_in_flight=None, ordered=True):
+        """
+        Produces new sequence by applying selector to each item of current
+        sequence. If the selector is specified as column name, the values of
+        the column are produced. If specified as tuple of column names, new
+        ColumnarLinque containing only those columns is created. If specified
+        as expression using column names only, it is evaluated directly over
+        the columns.
+        
+        Args:
+            selector: str, (str,), Expression or callable
+                Column name(s), expression or item's data selector.
+            
+            threads: int or None
+                Number of threads to use. If set to None, items are processed
+                in current thread.
+            
+            max_in_flight: int or None
+                Maximum number of items being processed at once.
+            
+            ordered: bool
+                If set to True, results are produced in the order of source
+                items, otherwise as they complete.
+        
+        Returns:
+            Linque
+        """
+        
+        if not threads:
+            values = self._compute(selector)
+            if values is not None:
+                return Linque(values, self._evaluate)
+        
+        names = self._names(selector)
+        if names is None:
+            return super().select(selector, threads, max_in_flight, ordered)
+        
+        if isinstance(selector, str):
+            result = _values(self._columns[selector])
+            return Linque(result, self._evaluate)
+        
+        columns = {k: self._columns[k] for k in names}
+        
+        return ColumnarLinque(columns, self._evaluate)
+    
+    
+    def sort(self, key=None, reverse=False, parallel=None, memory_limit=None):
+        """
+        Produces new sequence by sorting elements of current sequence by using
+        default comparer or specified item's key. If the key is specified as
+        column name or tuple of column names, the columns are reordered
+        directly and new ColumnarLinque is created.
+        
+        Args:
+            key: str, (str,), callable or None
+                Column name(s) or item's key selector.
+            
+            reverse: bool
+                If set to True, sorting is reversed. This flag can be specified
+                independently foreach key column.
+            
+            parallel: int or None
+                Number of worker processes to use. If set to None, items are
+                sorted in current process.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are sorted in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        names = self._names(key)
+        if names is None or parallel or memory_limit:
+            return super().sort(key, reverse, parallel, memory_limit)
+        
+        single = len(names) == 1 and isinstance(reverse, bool)
+        selector = self._selector(names, single)
+        idxs = iters.multisort(range(len(self)), selector, reverse)
+        
+        return self._take(idxs)
+    
+    
+    def to_columns(self):
+        """
+        Evaluates items into dictionary of column values lists.
+        
+        Returns:
+            {str: list}
+        """
+        
+        return {k: list(_values(c)) for k, c in self._columns.items()}
+    
+    
+    def where(self, condition, column=None):
+        """
+        Produces new sequence by selecting items by specified predicate. If
+        column name is specified, the predicate is applied directly to the
+        values of that column and new ColumnarLinque is created. The same
+        applies if the predicate is an expression using column names only.
+        
+        Args:
+            condition: Expression or callable
+                Condition to test.
+            
+            column: str or None
+                Column name to test.
+        
+        Returns:
+            Linque
+        """
+        
+        # apply expression
+        if column is None:
+            mask = self._compute(condition)
+            if mask is None:
+                return super().where(condition)
+            
+            idxs = [i for i, d in enumerate(mask) if d]
+            return self._take(idxs)
+        
+        values = _values(self._columns[column])
+        idxs = [i for i, d in enumerate(values) if condition(d)]
+        
+        return self._take(idxs)
+    
+    
+    def _compute(self, expr):
+        """Evaluates column-based expression for all rows."""
+        
+        if not isinstance(expr, Expression):
+            return None
+        
+        # check fields
+        paths = expr.fields()
+        if not paths or not all(len(p) == 1 and p[0] in self._columns for p in paths):
+            return None
+        
+        names = [p[0] for p in paths]
+        columns = [self._columns[k] for k in names]
+        size = len(self)
+        
+        # evaluate vectorized
+        if numpy is not None and all(isinstance(c, (array.array, numpy.ndarray)) for c in columns):
+            arrays = {k: numpy.asarray(c) for k, c in zip(names, columns)}
+            result = _vectorize(expr, arrays, numpy)
+            
+            if getattr(result, 'shape', None) == (size,):
+                return result.tolist()
+        
+        # evaluate by rows
+        columns = [_values(c) for c in columns]
+        
+        return [expr(dict(zip(names, d))) for d in zip(*columns)]
+    
+    
+    def _names(self, key):
+        """Gets column names from given key or None if not columns."""
+        
+        if isinstance(key, str):
+            names = (key,)
+        
+        elif isinstance(key, (list, tuple)) and key and all(isinstance(k, str) for k in key):
+            names = tuple(key)
+        
+        else:
+            return None
+        
+        for name in names:
+            if name not in self._columns:
+                message = "Unknown column! -> '%s'" % name
+                raise KeyError(message)
+        
+        return names
+    
+    
+    def _selector(self, names, single):
+        """Creates row index key selector for given columns."""
+        
+        columns = [_values(self._columns[k]) for k in names]
+        
+        if single:
+            return columns[0].__getitem__
+        
+        return lambda i: tuple(c[i] for c in columns)
+    
+    
+    def _take(self, idxs):
+        """Creates new instance from rows at given indices."""
+        
+        columns = {k: _take(c, idxs) for k, c in self._columns.items()}
+        
+        return ColumnarLinque(columns, self._evaluate)
+
+
+def _store(values):
+    """Converts values into column storage."""
+    
+    if isinstance(values, array.array):
+        return values
+    
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return values
+    
+    values = list(values)
+    
+    if not values:
+        return values
+    
+    if all(type(d) is int for d in values):
+        try:
+            return array.array('q', values)
+        except OverflowError:
+            return values
+    
+    if all(type(d) is float for d in values):
+        return array.array('d', values)
+    
+    return values
+
+
+def _take(column, idxs):
+    """Gets column values at given indices."""
+    
+    if isinstance(column, array.array):
+        return array.array(column.typecode, (column[i] for i in idxs))
+    
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        return column[numpy.asarray(idxs, dtype=int)]
+    
+    return [column[i] for i in idxs]
+
+
+def _value(value):
+    """Converts NumPy scalar into Python value."""
+    
+    if numpy is not None and isinstance(value, numpy.generic):
+        return value.item()
+    
+    return value
+
+
+def _values(column):
+    """Gets column values as Python values."""
+    
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        return column.tolist()
+    
+    return column
@@ -0,0 +1,238 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import os
+import sys
+import mmap
+import uuid
+import array
+import struct
+import pickle
+import tempfile
+import weakref
+from .linque import Linque
+
+BUFFER_SIZE = 1024 * 1024
+
+# define file layout
+MAGIC = b'LINQUE\x01\n'
+FRAME = struct.Struct('<Q')
+FOOTER = struct.Struct('<QQ8s')
+
+
+class DiskLinque(Linque):
+    """
+    DiskLinque provides items stored in a file instead of memory. Each item
+    is pickled into a separate length-prefixed frame followed by an index of
+    frame offsets. The file is memory-mapped, so the items can be iterated
+    repeatedly and accessed by index without loading the whole file. Since
+    the file is read-only, it can be opened by other processes as well,
+    without running the original chain again. Only instances of persistent
+    files can be pickled, since temporary file is removed when its original
+    instance is closed or garbage-collected.
+    """
+    
+    def __init__(self, path, evaluate=False, temporary=False):
+        """
+        Initializes a new instance of DiskLinque.
+        
+        Args:
+            path: str
+                Path of the file created by 'dump'.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+            
+            temporary: bool
+                If set to True, the file is removed when closed.
+        """
+        
+        super().__init__((), False)
+        
+        self._evaluate = evaluate
+        self._path = path
+        self._temporary = temporary
+        
+        # map file
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            self._file.close()
+            raise
+        
+        # check file
+        size = len(self._mmap)
+        if size < len(MAGIC) + FOOTER.size or self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            message = "Invalid file format! -> '%s'" % path
+            raise ValueError(message)
+        
+        self._index, self._count, magic = FOOTER.unpack_from(self._mmap, size - FOOTER.size)
+        if magic != MAGIC:
+            self.close()
+            message = "Invalid file format! -> '%s'" % path
+            raise ValueError(message)
+        
+        self._finalizer = weakref.finalize(self, _release, self._mmap, self._file, path if temporary else None)
+    
+    
+    def __iter__(self):
+        """Gets items iterator."""
+        
+        buff = self._mmap
+        pos = len(MAGIC)
+        
+        for _ in range(self._count):
+            size, = FRAME.unpack_from(buff, pos)
+            pos += FRAME.size
+            yield pickle.loads(buff[pos:pos+size])
+            pos += size
+    
+    
+    def __len__(self):
+        """Gets number of items."""
+        
+        return self._count
+    
+    
+    def __getitem__(self, idx):
+        """Gets item at specified index or items of specified slice."""
+        
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._count))]
+        
+        if idx < 0:
+            idx += self._count
+        
+        if not 0 <= idx < self._count:
+            raise IndexError("Index out of range.")
+        
+        pos, = FRAME.unpack_from(self._mmap, self._index + idx * FRAME.size)
+        size, = FRAME.unpack_from(self._mmap, pos)
+        pos += FRAME.size
+        
+        return pickle.loads(self._mmap[pos:pos+size])
+    
+    
+    def __reduce__(self):
+        """Gets pickling info to reopen the file."""
+        
+        if self._temporary:
+            message = "Temporary file cannot be pickled, specify path to keep it! -> '%s'" % self._path
+            raise TypeError(message)
+        
+        return DiskLinque, (self._path, self._evaluate)
+    
+    
+    def __enter__(self):
+        """Enters context manager."""
+        
+        return self
+    
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exits context manager."""
+        
+        self.close()
+    
+    
+    @property
+    def path(self):
+        """
+        Gets path of the file.
+        
+        Returns:
+            str
+        """
+        
+        return self._path
+    
+    
+    def close(self):
+        """Closes the file and removes it if temporary."""
+        
+        finalizer = getattr(self, '_finalizer', None)
+        
+        if finalizer is not None:
+            finalizer()
+        else:
+            _release(self._mmap, self._file, None)
+
+
+def dump(sequence, path=None, buffer_size=BUFFER_SIZE):
+    """
+    Writes items of a sequence into a file, which can be opened by
+    DiskLinque. If path is specified, the items are written into temporary
+    file in the same folder, which replaces the target file at the end.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to write. All items must be picklable.
+        
+        path: str or None
+            Path of the file to write. If set to None, new temporary file is
+            created.
+        
+        buffer_size: int
+            Size of the write buffer in bytes.
+    
+    Returns:
+        str
+            Path of the written file.
+    """
+    
+    # make temporary
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix='linque_', suffix='.disk')
+        os.close(fd)
+        temp = path
+    
+    else:
+        temp = "%s.%s.tmp" % (path, uuid.uuid4().hex[:8])
+    
+    offsets = array.array('Q')
+    
+    try:
+        with open(temp, 'wb', buffering=buffer_size) as f:
+            f.write(MAGIC)
+            pos = len(MAGIC)
+            
+            # write frames
+            for item in sequence:
+                data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+                offsets.append(pos)
+                f.write(FRAME.pack(len(data)))
+                f.write(data)
+                pos += FRAME.size + len(data)
+            
+            # write index
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+            
+            f.write(offsets.tobytes())
+            f.write(FOOTER.pack(pos, len(offsets), MAGIC))
+        
+        if temp != path:
+            os.replace(temp, path)
+    
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    
+    return path
+
+
+def _release(buff, file, path):
+    """Closes mapped file and removes it if needed."""
+    
+    buff.close()
+    file.close()
+    
+    if path is not None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,376 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import operator
+
+# define operators as name: (function, symbol)
+UNARY = {
+    'neg': (operator.neg, '-'),
+    'not': (operator.not_, '~'),
+    'abs': (abs, 'abs')}
+
+BINARY = {
+    'add': (operator.add, '+'),
+    'sub': (operator.sub, '-'),
+    'mul': (operator.mul, '*'),
+    'truediv': (operator.truediv, '/'),
+    'floordiv': (operator.floordiv, '//'),
+    'mod': (operator.mod, '%'),
+    'pow': (operator.pow, '**'),
+    'eq': (operator.eq, '=='),
+    'ne': (operator.ne, '!='),
+    'lt': (operator.lt, '<'),
+    'le': (operator.le, '<='),
+    'gt': (operator.gt, '>'),
+    'ge': (operator.ge, '>='),
+    'and': (None, '&'),
+    'or': (None, '|')}
+
+
+def _unary(op):
+    """Creates unary operator method."""
+    
+    def method(self):
+        return Expression(op, self)
+    
+    return method
+
+
+def _binary(op, reflected=False):
+    """Creates binary operator method."""
+    
+    def method(self, other):
+        if reflected:
+            return Expression(op, _wrap(other), self)
+        return Expression(op, self, _wrap(other))
+    
+    return method
+
+
+class Expression(object):
+    """
+    Expression represents an introspectable item selector, key or condition,
+    which can be used anywhere a callable is accepted. Expressions are
+    created by 'col', 'field', 'item' and 'lit' functions and combined by
+    standard arithmetic and comparison operators, by '&', '|' and '~' for
+    logical 'and', 'or' and 'not' and by 'isin' method. When called with an item, the
+    expression is compiled into nested Python functions. Since the structure
+    is available through the 'op' and 'args' attributes, specialized
+    backends can translate it into other forms (e.g. SQL or vectorized
+    operations over columns). Unlike lambdas, expressions can be pickled.
+    """
+    
+    def __init__(self, op, *args):
+        """
+        Initializes a new instance of Expression.
+        
+        Args:
+            op: str
+                Operation name.
+            
+            args: (any,)
+                Operation arguments. For 'field' the path items, for 'lit' the
+                value and for other operations the operand expressions.
+        """
+        
+        self.op = op
+        self.args = args
+        self._func = None
+    
+    
+    def __call__(self, item):
+        """Evaluates expression for given item."""
+        
+        if self._func is None:
+            self._func = _compile(self)
+        
+        return self._func(item)
+    
+    
+    def __repr__(self):
+        """Gets expression representation."""
+        
+        if self.op == 'field':
+            if not self.args:
+                return "item()"
+            if len(self.args) == 1:
+                return "col(%r)" % (self.args[0],)
+            return "field(%r)" % ".".join(str(d) for d in self.args)
+        
+        if self.op == 'lit':
+            return repr(self.args[0])
+        
+        if self.op == 'isin':
+            return "%r.isin(%r)" % (self.args[0], self.args[1].args[0])
+        
+        if self.op == 'abs':
+            return "abs(%r)" % (self.args[0],)
+        
+        if self.op in UNARY:
+            return "%s%r" % (UNARY[self.op][1], self.args[0])
+        
+        return "(%r %s %r)" % (self.args[0], BINARY[self.op][1], self.args[1])
+    
+    
+    def __getstate__(self):
+        """Gets state to pickle."""
+        
+        return {'op': self.op, 'args': self.args}
+    
+    
+    def __setstate__(self, state):
+        """Sets unpickled state."""
+        
+        self.op = state['op']
+        self.args = state['args']
+        self._func = None
+    
+    
+    def __bool__(self):
+        """Prevents usage in boolean context."""
+        
+        message = "Expression cannot be used as bool, use '&', '|' and '~' instead of 'and', 'or' and 'not'!"
+        raise TypeError(message)
+    
+    
+    # define operators
+    __neg__ = _unary('neg')
+    __invert__ = _unary('not')
+    __abs__ = _unary('abs')
+    
+    __add__ = _binary('add')
+    __radd__ = _binary('add', True)
+    __sub__ = _binary('sub')
+    __rsub__ = _binary('sub', True)
+    __mul__ = _binary('mul')
+    __rmul__ = _binary('mul', True)
+    __truediv__ = _binary('truediv')
+    __rtruediv__ = _binary('truediv', True)
+    __floordiv__ = _binary('floordiv')
+    __rfloordiv__ = _binary('floordiv', True)
+    __mod__ = _binary('mod')
+    __rmod__ = _binary('mod', True)
+    __pow__ = _binary('pow')
+    __rpow__ = _binary('pow', True)
+    
+    __eq__ = _binary('eq')
+    __ne__ = _binary('ne')
+    __lt__ = _binary('lt')
+    __le__ = _binary('le')
+    __gt__ = _binary('gt')
+    __ge__ = _binary('ge')
+    __hash__ = object.__hash__
+    
+    __and__ = _binary('and')
+    __rand__ = _binary('and', True)
+    __or__ = _binary('or')
+    __ror__ = _binary('or', True)
+    
+    
+    def fields(self):
+        """
+        Gets paths of all the fields used by current expression.
+        
+        Returns:
+            ((str or int,),)
+                Unique field paths in order of appearance.
+        """
+        
+        if self.op == 'field':
+            return (self.args,)
+        
+        if self.op == 'lit':
+            return ()
+        
+        paths = []
+        for arg in self.args:
+            for path in arg.fields():
+                if path not in paths:
+                    paths.append(path)
+        
+        return tuple(paths)
+    
+    
+    def isin(self, values):
+        """
+        Creates expression testing whether current value is one of given
+        values.
+        
+        Args:
+            values: (any,)
+                Values to test against.
+        
+        Returns:
+            Expression
+        """
+        
+        return Expression('isin', self, Expression('lit', tuple(values)))
+
+
+def col(name):
+    """
+    Creates expression selecting item's value by given key, index or
+    attribute name.
+    
+    Args:
+        name: str or int
+            Key, index or attribute name.
+    
+    Returns:
+        Expression
+    """
+    
+    return Expression('field', name)
+
+
+def field(path):
+    """
+    Creates expression selecting nested item's value by given dot-separated
+    path (e.g. 'user.address.city' or 'items.0.id'). Each part of the path is
+    used as key, index or attribute name.
+    
+    Args:
+        path: str
+            Dot-separated path.
+    
+    Returns:
+        Expression
+    """
+    
+    parts = (int(d) if d.isdigit() else d for d in path.split("."))
+    
+    return Expression('field', *parts)
+
+
+def item():
+    """
+    Creates expression selecting the item itself (e.g. item() > 0 for
+    numeric items).
+    
+    Returns:
+        Expression
+    """
+    
+    return Expression('field')
+
+
+def lit(value):
+    """
+    Creates expression of constant value.
+    
+    Args:
+        value: any
+            Constant value.
+    
+    Returns:
+        Expression
+    """
+    
+    return Expression('lit', value)
+
+
+def _compile(expr):
+    """Compiles expression into Python function."""
+    
+    op = expr.op
+    args = expr.args
+    
+    # constant value
+    if op == 'lit':
+        value = args[0]
+        return lambda d: value
+    
+    # single field
+    if op == 'field' and len(args) == 1:
+        name = args[0]
+        return lambda d: _get(d, name)
+    
+    # nested field
+    if op == 'field':
+        def func(d):
+            for name in args:
+                d = _get(d, name)
+            return d
+        return func
+    
+    # membership
+    if op == 'isin':
+        f = _compile(args[0])
+        values = args[1].args[0]
+        try:
+            values = frozenset(values)
+        except TypeError:
+            pass
+        return lambda d: f(d) in values
+    
+    # unary operation
+    if op in UNARY:
+        f = _compile(args[0])
+        fn = UNARY[op][0]
+        return lambda d: fn(f(d))
+    
+    f1 = _compile(args[0])
+    f2 = _compile(args[1])
+    
+    # logical operations
+    if op == 'and':
+        return lambda d: f1(d) and f2(d)
+    
+    if op == 'or':
+        return lambda d: f1(d) or f2(d)
+    
+    # binary operation
+    fn = BINARY[op][0]
+    return lambda d: fn(f1(d), f2(d))
+
+
+def _get(item, name):
+    """Gets item's value by key, index or attribute name."""
+    
+    try:
+        return item[name]
+    
+    except TypeError:
+        return getattr(item, name)
+
+
+def _vectorize(expr, columns, numpy):
+    """Evaluates expression over NumPy columns, the item itself under None."""
+    
+    op = expr.op
+    args = expr.args
+    
+    if op == 'lit':
+        return args[0]
+    
+    if op == 'field':
+        return columns[args[0] if args else None]
+    
+    if op == 'isin':
+        return numpy.isin(_vectorize(args[0], columns, numpy), list(args[1].args[0]))
+    
+    if op == 'not':
+        return numpy.logical_not(_vectorize(args[0], columns, numpy))
+    
+    if op in UNARY:
+        return UNARY[op][0](_vectorize(args[0], columns, numpy))
+    
+    a1 = _vectorize(args[0], columns, numpy)
+    a2 = _vectorize(args[1], columns, numpy)
+    
+    if op == 'and':
+        return numpy.logical_and(a1, a2)
+    
+    if op == 'or':
+        return numpy.logical_or(a1, a2)
+    
+    return BINARY[op][0](a1, a2)
+
+
+def _wrap(value):
+    """Converts value into expression."""
+    
+    if isinstance(value, Expression):
+        return value
+    
+    return Expression('lit', value)
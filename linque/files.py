@@ -0,0 +1,829 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import os
+import io
+import csv
+import json
+import gzip
+import bz2
+import lzma
+import time
+import uuid
+from . import iters
+from .linque import Linque
+from .parallel import ParallelLinque
+from .expressions import Expression
+
+BUFFER_SIZE = 1024 * 1024
+RANGE_SIZE = 64 * 1024 * 1024
+BATCH_SIZE = 1000
+
+# define compression signatures
+SIGNATURES = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'))
+
+# define compression extensions
+EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz'}
+
+# define compression openers
+OPENERS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open}
+
+
+class FileLinque(Linque):
+    """
+    FileLinque lazily reads items from a text file. The file is opened each
+    time the sequence is iterated, so unlike other sources the chain can be
+    iterated repeatedly. The data are read in large buffered blocks and
+    gzip, bz2 or xz compressed files are decompressed transparently. The file
+    is closed as soon as the iteration finishes or stops early (e.g. by
+    'first' or 'take'). Any remaining open file can also be closed explicitly
+    by calling 'close' or by using the sequence as context manager.
+    
+    For CSV and JSON lines, expression-based 'where' and column-based
+    'select' are pushed down into the reader. Equality and membership tests
+    against string literals are additionally used as cheap prefilters, so
+    that raw lines not containing the required text are skipped before they
+    are parsed. Such prefilters can also be declared explicitly by the
+    'prefilter' method.
+    """
+    
+    def __init__(self, path, format='lines', encoding='utf-8', compression='infer', buffer_size=BUFFER_SIZE, evaluate=False, **options):
+        """
+        Initializes a new instance of FileLinque.
+        
+        Args:
+            path: str
+                Path of the file to read.
+            
+            format: str
+                File format.
+                    'lines' - lines without the line terminators
+                    'csv' - CSV rows as dictionaries or lists
+                    'jsonl' - one JSON value per line
+            
+            encoding: str
+                Text encoding.
+            
+            compression: str or None
+                Compression type as 'gzip', 'bz2' or 'xz'. If set to 'infer',
+                the compression is detected from the file content.
+            
+            buffer_size: int
+                Size of blocks read at once in bytes.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+            
+            options: {str: any}
+                Additional format options. For CSV the 'header' (bool) and
+                'fieldnames' ((str,)) are used to create dictionaries and the
+                rest is passed to 'csv.reader'.
+        """
+        
+        if format not in ('lines', 'csv', 'jsonl'):
+            message = "Unknown file format! -> '%s'" % format
+            raise ValueError(message)
+        
+        super().__init__((), False)
+        
+        self._evaluate = evaluate
+        self._path = path
+        self._format = format
+        self._encoding = encoding
+        self._compression = compression
+        self._buffer_size = max(1, buffer_size)
+        self._options = options
+        self._streams = set()
+        
+        self._prefilters = ()
+        self._conditions = ()
+        self._fields = None
+    
+    
+    def __iter__(self):
+        """Gets items iterator."""
+        
+        if self._format == 'csv':
+            return self._read_csv()
+        
+        if self._format == 'jsonl':
+            return self._read_jsonl()
+        
+        return self._read_lines()
+    
+    
+    def __enter__(self):
+        """Enters context manager."""
+        
+        return self
+    
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exits context manager."""
+        
+        self.close()
+    
+    
+    def close(self):
+        """Closes all currently open files."""
+        
+        for stream in list(self._streams):
+            stream.close()
+        
+        self._streams.clear()
+    
+    
+    def prefilter(self, *values):
+        """
+        Produces new sequence skipping raw lines, which do not contain any of
+        given substrings, before they are parsed. For CSV, the whole record
+        is tested if it spans multiple lines. Header is never skipped.
+        Repeated calls require all the prefilters to pass.
+        
+        Args:
+            values: (str or bytes,)
+                Substrings of which at least one must be present.
+        
+        Returns:
+            FileLinque
+        """
+        
+        if not values:
+            message = "At least one value must be specified!"
+            raise ValueError(message)
+        
+        result = self._copy()
+        result._prefilters += (tuple(values),)
+        
+        return result
+    
+    
+    def select(self, selector, threads=None, max_in_flight=None, ordered=True):
+        """
+        Produces new sequence by applying selector to each item of current
+        sequence. For CSV and JSON lines, if the selector is specified as
+        field name, the values of the field are produced. If specified as
+        tuple of field names, the items are created as dictionaries of those
+        fields only. Missing fields are set to None. For CSV, only the fields
+        used by an expression selector are converted into row dictionary.
+        
+        Args:
+            selector: str, (str,), Expression or callable
+                Field name(s), expression or item's data selector.
+            
+            threads: int or None
+                Number of threads to use. If set to None, items are processed
+                in current thread.
+            
+            max_in_flight: int or None
+                Maximum number of items being processed at once.
+            
+            ordered: bool
+                If set to True, results are produced in the order of source
+                items, otherwise as they complete.
+        
+        Returns:
+            Linque
+        """
+        
+        if threads or not self._projectable():
+            return super().select(selector, threads, max_in_flight, ordered)
+        
+        # single field
+        if isinstance(selector, str):
+            result = self._copy()
+            result._fields = (selector,)
+            return Linque((d[selector] for d in result), self._evaluate)
+        
+        # projection
+        if isinstance(selector, (list, tuple)) and selector and all(isinstance(d, str) for d in selector):
+            result = self._copy()
+            result._fields = tuple(selector)
+            return result
+        
+        # expression fields
+        if self._format == 'csv' and isinstance(selector, Expression):
+            paths = selector.fields()
+            if paths and all(len(p) == 1 and isinstance(p[0], str) for p in paths):
+                result = self._copy()
+                result._fields = tuple(p[0] for p in paths)
+                return Linque((selector(d) for d in result), self._evaluate)
+        
+        return super().select(selector, threads, max_in_flight, ordered)
+    
+    
+    def where(self, condition):
+        """
+        Produces new sequence by selecting items by specified predicate. For
+        CSV and JSON lines, expression predicate is applied directly by the
+        reader and text required by equality or membership tests against
+        string literals is used to skip raw lines before they are parsed.
+        
+        Args:
+            condition: Expression or callable
+                Condition to test.
+        
+        Returns:
+            Linque
+        """
+        
+        if not isinstance(condition, Expression) or self._format == 'lines' or self._fields is not None:
+            return super().where(condition)
+        
+        result = self._copy()
+        result._conditions += (condition,)
+        
+        for values in _needles(condition, self._format):
+            result._prefilters += (values,)
+        
+        return result
+    
+    
+    def _apply(self, items):
+        """Applies pushed-down conditions and projection."""
+        
+        for condition in self._conditions:
+            items = filter(condition, items)
+        
+        if self._fields is not None:
+            fields = self._fields
+            items = ({k: d.get(k) for k in fields} for d in items)
+        
+        return items
+    
+    
+    def _copy(self):
+        """Creates copy of current sequence."""
+        
+        result = FileLinque.__new__(FileLinque)
+        result.__dict__.update(self.__dict__)
+        result._streams = set()
+        
+        return result
+    
+    
+    def _matcher(self, binary=False):
+        """Creates raw line prefilter or None if not needed."""
+        
+        if not self._prefilters:
+            return None
+        
+        clauses = []
+        for values in self._prefilters:
+            needles = []
+            for value in values:
+                if binary and isinstance(value, str):
+                    value = value.encode(self._encoding)
+                elif not binary and isinstance(value, bytes):
+                    value = value.decode(self._encoding)
+                needles.append(value)
+            clauses.append(tuple(needles))
+        
+        # single needle
+        if len(clauses) == 1 and len(clauses[0]) == 1:
+            needle = clauses[0][0]
+            return lambda d: needle in d
+        
+        return lambda d: all(any(n in d for n in c) for c in clauses)
+    
+    
+    def _projectable(self):
+        """Checks whether items are dictionaries to be projected."""
+        
+        if self._format == 'jsonl':
+            return True
+        
+        if self._format == 'csv':
+            return bool(self._options.get('header', True) or self._options.get('fieldnames'))
+        
+        return False
+    
+    
+    def _open(self, text=False, newline=''):
+        """Opens buffered binary or text stream."""
+        
+        compression = _detect(self._path, self._compression)
+        
+        # open file
+        if compression is None:
+            stream = open(self._path, 'rb', buffering=self._buffer_size)
+        
+        elif compression in OPENERS:
+            stream = io.BufferedReader(OPENERS[compression](self._path, 'rb'), self._buffer_size)
+        
+        else:
+            message = "Unknown compression! -> '%s'" % compression
+            raise ValueError(message)
+        
+        # make text stream
+        if text:
+            stream = io.TextIOWrapper(stream, self._encoding, newline=newline)
+        
+        self._streams.add(stream)
+        
+        return stream
+    
+    
+    def _close(self, stream):
+        """Closes given stream."""
+        
+        stream.close()
+        self._streams.discard(stream)
+    
+    
+    def _read_csv(self):
+        """Iterates over CSV rows."""
+        
+        options = dict(self._options)
+        header = options.pop('header', True)
+        names = options.pop('fieldnames', None)
+        
+        stream = self._open(True)
+        
+        try:
+            lines = stream
+            
+            match = self._matcher()
+            if match is not None:
+                lines = _records(stream, match, int(bool(header)), options.get('quotechar', '"'), options.get('escapechar'))
+            
+            reader = csv.reader(lines, **options)
+            
+            if header:
+                row = next(reader, None)
+                if names is None:
+                    names = row
+            
+            # lists
+            if names is None:
+                yield from self._apply(reader)
+            
+            # direct projection
+            elif self._fields is not None and not self._conditions:
+                idxs = [(k, names.index(k) if k in names else None) for k in self._fields]
+                for row in reader:
+                    size = len(row)
+                    yield {k: row[i] if i is not None and i < size else None for k, i in idxs}
+            
+            # dictionaries
+            else:
+                yield from self._apply(dict(zip(names, row)) for row in reader)
+        
+        finally:
+            self._close(stream)
+    
+    
+    def _read_jsonl(self):
+        """Iterates over JSON lines."""
+        
+        stream = self._open()
+        encoding = self._encoding
+        
+        try:
+            lines = (d for d in stream if d.strip())
+            
+            match = self._matcher(True)
+            if match is not None:
+                lines = filter(match, lines)
+            
+            yield from self._apply(json.loads(d.decode(encoding)) for d in lines)
+        
+        finally:
+            self._close(stream)
+    
+    
+    def _read_lines(self):
+        """Iterates over text lines."""
+        
+        # split by LF only, same as parallel ranges
+        stream = self._open(True, '\n')
+        match = self._matcher()
+        
+        try:
+            for line in stream:
+                if match is not None and not match(line):
+                    continue
+                if line[-1:] == '\n':
+                    line = line[:-1]
+                if line[-1:] == '\r':
+                    line = line[:-1]
+                yield line
+        
+        finally:
+            self._close(stream)
+
+
+class ParallelFileLinque(ParallelLinque):
+    """
+    ParallelFileLinque reads a large uncompressed line-oriented file in
+    worker processes. The file is split into byte ranges aligned to line
+    boundaries and each range is read by a worker, which also applies the
+    chained 'select' and 'where' stages. The 'count', 'sum', 'distinct' and
+    'group' aggregations are calculated for each range in the workers and
+    merged in current process, other results are concatenated in original
+    order. As for the ParallelLinque, all the callables must be picklable.
+    """
+    
+    def __init__(self, path, format='lines', encoding='utf-8', workers=None, range_size=RANGE_SIZE, buffer_size=BUFFER_SIZE, ordered=True, fallback=False, evaluate=False):
+        """
+        Initializes a new instance of ParallelFileLinque.
+        
+        Args:
+            path: str
+                Path of the file to read.
+            
+            format: str
+                File format.
+                    'lines' - lines without the line terminators
+                    'jsonl' - one JSON value per line
+            
+            encoding: str
+                Text encoding.
+            
+            workers: int or None
+                Maximum number of worker processes. If set to None, number of
+                CPUs is used.
+            
+            range_size: int
+                Maximum size of a byte range read by a worker at once. The
+                file is always split into at least as many ranges as workers.
+            
+            buffer_size: int
+                Size of blocks read at once in bytes.
+            
+            ordered: bool
+                If set to True, results are produced in the order of lines,
+                otherwise as they complete.
+            
+            fallback: bool
+                If set to True, the stages are applied in current process if
+                they cannot be pickled, otherwise error is raised.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        """
+        
+        if format not in ('lines', 'jsonl'):
+            message = "Unsupported parallel file format! -> '%s'" % format
+            raise ValueError(message)
+        
+        if _detect(path, 'infer') is not None:
+            message = "Compressed file cannot be read in parallel! -> '%s'" % path
+            raise ValueError(message)
+        
+        super().__init__((), workers, 1, ordered, fallback, evaluate)
+        
+        self._path = path
+        self._format = format
+        self._encoding = encoding
+        self._range_size = max(1, range_size)
+        self._buffer_size = max(1, buffer_size)
+    
+    
+    def _tasks(self):
+        """Gets file ranges to be read by workers."""
+        
+        size = os.path.getsize(self._path)
+        count = max(self._workers, -(-size // self._range_size))
+        step = max(1, -(-size // count))
+        
+        # align to lines
+        bounds = [0]
+        with open(self._path, 'rb') as stream:
+            for pos in range(step, size, step):
+                if pos <= bounds[-1]:
+                    continue
+                stream.seek(pos - 1)
+                stream.readline()
+                bound = stream.tell()
+                if bound < size:
+                    bounds.append(bound)
+        
+        bounds.append(size)
+        
+        return [FileRange(self._path, start, end, self._format, self._encoding, self._buffer_size) for start, end in zip(bounds, bounds[1:])]
+
+
+class FileRange(object):
+    """
+    FileRange represents a picklable part of a line-oriented file between
+    two byte offsets aligned to line boundaries. The file is opened only when
+    the range is iterated.
+    """
+    
+    def __init__(self, path, start, end, format='lines', encoding='utf-8', buffer_size=BUFFER_SIZE):
+        """
+        Initializes a new instance of FileRange.
+        
+        Args:
+            path: str
+                Path of the file to read.
+            
+            start: int
+                Offset of the first line.
+            
+            end: int
+                Offset after the last line.
+            
+            format: str
+                File format as 'lines' or 'jsonl'.
+            
+            encoding: str
+                Text encoding.
+            
+            buffer_size: int
+                Size of blocks read at once in bytes.
+        """
+        
+        self.path = path
+        self.start = start
+        self.end = end
+        self.format = format
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+    
+    
+    def __iter__(self):
+        """Gets items iterator."""
+        
+        encoding = self.encoding
+        jsonl = self.format == 'jsonl'
+        
+        with open(self.path, 'rb', buffering=self.buffer_size) as stream:
+            stream.seek(self.start)
+            pos = self.start
+            
+            for line in stream:
+                if pos >= self.end:
+                    break
+                
+                pos += len(line)
+                
+                if jsonl:
+                    if line.strip():
+                        yield json.loads(line.decode(encoding))
+                    continue
+                
+                if line[-1:] == b'\n':
+                    line = line[:-1]
+                if line[-1:] == b'\r':
+                    line = line[:-1]
+                yield line.decode(encoding)
+
+
+
+def write(sequence, path, format='lines', encoding='utf-8', compression='infer', batch_size=BATCH_SIZE, buffer_size=BUFFER_SIZE, **options):
+    """
+    Writes items of a sequence into a file as they are produced. The items
+    are serialized in batches, which are written through a buffered and
+    optionally compressed stream into a temporary file in the same folder.
+    The temporary file replaces the target file only after all the items
+    were written, so the target is never left partially written.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to write.
+        
+        path: str
+            Path of the file to write.
+        
+        format: str
+            File format.
+                'lines' - string representation of each item per line
+                'csv' - CSV rows from dictionaries or sequences
+                'jsonl' - one JSON value per line
+        
+        encoding: str
+            Text encoding.
+        
+        compression: str or None
+            Compression type as 'gzip', 'bz2' or 'xz'. If set to 'infer',
+            the compression is detected from the file extension.
+        
+        batch_size: int
+            Number of items serialized and written at once.
+        
+        buffer_size: int
+            Size of the write buffer in bytes.
+        
+        options: {str: any}
+            Additional format options. For CSV the 'header' (bool) and
+            'fieldnames' ((str,)) are used for dictionaries and the rest is
+            passed to 'csv.writer'. For JSON lines all are passed to
+            'json.dumps'.
+    
+    Returns:
+        {str: any}
+            Summary as number of written 'rows', final file size in 'bytes'
+            and 'elapsed' time in seconds.
+    """
+    
+    if format not in ('lines', 'csv', 'jsonl'):
+        message = "Unknown file format! -> '%s'" % format
+        raise ValueError(message)
+    
+    # get compression
+    if compression == 'infer':
+        compression = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    
+    if compression is not None and compression not in OPENERS:
+        message = "Unknown compression! -> '%s'" % compression
+        raise ValueError(message)
+    
+    # get serializer
+    if format == 'csv':
+        serialize = _csv_writer(options)
+    
+    elif format == 'jsonl':
+        serialize = lambda items: "".join(json.dumps(d, **options) + "\n" for d in items)
+    
+    else:
+        serialize = lambda items: "".join("%s\n" % (d,) for d in items)
+    
+    # write into temporary file
+    start = time.perf_counter()
+    temp = "%s.%s.tmp" % (path, uuid.uuid4().hex[:8])
+    rows = 0
+    
+    try:
+        with open(temp, 'xb', buffering=buffer_size) as raw:
+            stream = OPENERS[compression](raw, 'wb') if compression else raw
+            
+            try:
+                for batch in iters.chunk(sequence, max(1, batch_size)):
+                    stream.write(serialize(batch).encode(encoding))
+                    rows += len(batch)
+                
+                if not rows:
+                    stream.write(serialize(()).encode(encoding))
+            
+            finally:
+                if stream is not raw:
+                    stream.close()
+        
+        os.replace(temp, path)
+    
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    
+    return {
+        'rows': rows,
+        'bytes': os.path.getsize(path),
+        'elapsed': time.perf_counter() - start}
+
+
+
+def _csv_writer(options):
+    """Creates CSV batch serializer."""
+    
+    options = dict(options)
+    header = options.pop('header', True)
+    names = options.pop('fieldnames', None)
+    
+    buff = io.StringIO()
+    writer = csv.writer(buff, **options)
+    
+    def serialize(items):
+        nonlocal names, header
+        
+        # init names
+        if names is None and items and isinstance(items[0], dict):
+            names = list(items[0])
+        
+        # write header
+        if header and names is not None:
+            writer.writerow(names)
+        header = False
+        
+        # write rows
+        if names is None:
+            writer.writerows(items)
+        else:
+            writer.writerows([d.get(k) for k in names] if isinstance(d, dict) else d for d in items)
+        
+        text = buff.getvalue()
+        buff.seek(0)
+        buff.truncate()
+        
+        return text
+    
+    return serialize
+
+
+def _detect(path, compression):
+    """Gets compression type of given file."""
+    
+    if compression != 'infer':
+        return compression
+    
+    with open(path, 'rb') as stream:
+        head = stream.read(6)
+    
+    for signature, name in SIGNATURES:
+        if head.startswith(signature):
+            return name
+    
+    return None
+
+
+def _needles(expr, format):
+    """Gets raw text required by given expression as (str,) alternatives."""
+    
+    op = expr.op
+    args = expr.args
+    
+    # conjunction
+    if op == 'and':
+        return _needles(args[0], format) + _needles(args[1], format)
+    
+    # disjunction
+    if op == 'or':
+        left = _needles(args[0], format)
+        right = _needles(args[1], format)
+        if left and right:
+            return [left[0] + right[0]]
+        return []
+    
+    # equality
+    if op == 'eq':
+        field, value = args
+        if field.op == 'lit':
+            field, value = value, field
+        if field.op != 'field' or value.op != 'lit':
+            return []
+        values = (value.args[0],)
+    
+    # membership
+    elif op == 'isin':
+        if args[0].op != 'field':
+            return []
+        values = args[1].args[0]
+    
+    else:
+        return []
+    
+    # make needles
+    needles = tuple(_needle(d, format) for d in values)
+    if not needles or None in needles:
+        return []
+    
+    return [needles]
+
+
+def _needle(value, format):
+    """Gets raw text of given value or None if not known."""
+    
+    if value is None:
+        return 'null' if format == 'jsonl' else None
+    
+    if not isinstance(value, str) or not value:
+        return None
+    
+    if format == 'jsonl':
+        return value if json.dumps(value)[1:-1] == value and '/' not in value else None
+    
+    return value if '"' not in value else None
+
+
+def _records(lines, match, skip, quotechar, escapechar):
+    """Skips CSV records not passing given prefilter."""
+    
+    buff = []
+    inside = False
+    
+    for line in lines:
+        buff.append(line)
+        
+        # check quoted newline
+        if quotechar:
+            text = line.replace(escapechar + quotechar, '') if escapechar else line
+            if text.count(quotechar) % 2:
+                inside = not inside
+        
+        if inside:
+            continue
+        
+        # test record
+        if skip:
+            skip -= 1
+            yield from buff
+        
+        elif match(buff[0] if len(buff) == 1 else "".join(buff)):
+            yield from buff
+        
+        buff = []
+    
+    yield from buff
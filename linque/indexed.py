@@ -0,0 +1,240 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+from . import iters
+from .linque import Linque
+
+
+class IndexedLinque(Linque):
+    """
+    IndexedLinque is a fully evaluated Linque keeping one or more hash indexes
+    of its items by specified keys. Each index maps item's key to the list of
+    items sharing the key, therefore equality lookups, 'contains' and joins
+    using indexed key run in constant time instead of scanning all the items.
+    Indexes are kept up to date when new items are appended.
+    """
+    
+    def __init__(self, source, evaluate=False):
+        """
+        Initializes a new instance of IndexedLinque.
+        
+        Args:
+            source: iterable
+                Sequence of items.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        """
+        
+        super().__init__(list(source), evaluate)
+        
+        self._indexes = []
+    
+    
+    def __len__(self):
+        """Gets number of items."""
+        
+        return len(self._source)
+    
+    
+    def __getitem__(self, idx):
+        """Gets item at specified index."""
+        
+        return self._source[idx]
+    
+    
+    def append(self, item):
+        """
+        Appends given item at the end of current sequence and updates all the
+        indexes. If any unique index already contains item's key, error is
+        raised and nothing is changed.
+        
+        Args:
+            item: any
+                Item to append.
+        
+        Returns:
+            IndexedLinque
+        """
+        
+        keys = [selector(item) for key, selector, unique, name, lookup in self._indexes]
+        
+        # check unique
+        for k, (key, selector, unique, name, lookup) in zip(keys, self._indexes):
+            if unique and k in lookup:
+                raise KeyError("Key is not unique.")
+        
+        # update indexes
+        for k, (key, selector, unique, name, lookup) in zip(keys, self._indexes):
+            self._add(lookup, k, item, False)
+        
+        self._source.append(item)
+        
+        return self
+    
+    
+    def contains(self, value, key=None):
+        """
+        Determines whether current sequence contains specified item or value
+        by using default comparer or specified item's key. If the key is
+        indexed, the index is used.
+        
+        Args:
+            value: any
+                Item or value to check.
+            
+            key: callable, (callable,), str or None
+                Item's key selector or index name.
+        
+        Returns:
+            bool
+        """
+        
+        lookup = self.get_index(key)
+        if lookup is not None:
+            return value in lookup
+        
+        return super().contains(value, key)
+    
+    
+    def extend(self, items):
+        """
+        Appends given items at the end of current sequence and updates all the
+        indexes.
+        
+        Args:
+            items: (any,)
+                Items to append.
+        
+        Returns:
+            IndexedLinque
+        """
+        
+        for item in items:
+            self.append(item)
+        
+        return self
+    
+    
+    def get_index(self, key=None):
+        """
+        Gets index created for specified key selector or name. The index is a
+        dictionary mapping item's key to a list of items sharing the key. It
+        should not be modified directly.
+        
+        Args:
+            key: callable, (callable,), str or None
+                Item's key selector or index name.
+        
+        Returns:
+            dict or None
+                Index or None if not available.
+        """
+        
+        for k, selector, unique, name, lookup in self._indexes:
+            if self._same(k, key) or (name is not None and isinstance(key, str) and name == key):
+                return lookup
+        
+        return None
+    
+    
+    def index_by(self, key=None, unique=False, name=None):
+        """
+        Creates new hash index of current items by specified key. Multiple
+        indexes can be created for the same sequence.
+        
+        Args:
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+            
+            unique: bool
+                If set to True, error is raised if the key is not unique.
+            
+            name: str or None
+                Index name to be used for lookups instead of the key itself.
+        
+        Returns:
+            IndexedLinque
+        """
+        
+        selector = iters._selector(key)
+        lookup = {}
+        
+        for item in self._source:
+            self._add(lookup, selector(item), item, unique)
+        
+        self._indexes.append((key, selector, unique, name, lookup))
+        
+        return self
+    
+    
+    def lookup(self, value, key=None):
+        """
+        Produces new sequence of items having specified value of indexed key.
+        
+        Args:
+            value: any
+                Key value to search.
+            
+            key: callable, (callable,), str or None
+                Item's key selector or index name.
+        
+        Returns:
+            Linque
+        """
+        
+        lookup = self.get_index(key)
+        if lookup is None:
+            raise KeyError("Key is not indexed.")
+        
+        result = tuple(lookup.get(value, ()))
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def to_lookup(self, key=None):
+        """
+        Evaluates items into dictionary of lists of items sharing the same key.
+        If the key is indexed, the index is used. Since the index is copied to
+        keep it safe from modifications, this still takes O(n) time. Use
+        'get_index' to access the index directly in constant time.
+        
+        Args:
+            key: callable, (callable,), str or None
+                Item's key selector or index name.
+        
+        Returns:
+            dict
+        """
+        
+        lookup = self.get_index(key)
+        if lookup is not None:
+            return {k: list(v) for k, v in lookup.items()}
+        
+        return super().to_lookup(key)
+    
+    
+    @staticmethod
+    def _add(lookup, key, item, unique):
+        """Adds item into index."""
+        
+        if key not in lookup:
+            lookup[key] = [item]
+        
+        elif unique:
+            raise KeyError("Key is not unique.")
+        
+        else:
+            lookup[key].append(item)
+    
+    
+    @staticmethod
+    def _same(key1, key2):
+        """Checks whether given key selectors are identical."""
+        
+        if isinstance(key1, tuple) and isinstance(key2, tuple):
+            return len(key1) == len(key2) and all(a is b for a, b in zip(key1, key2))
+        
+        return key1 is key2
@@ -1,11 +1,84 @@
 #  Created byMartin.cz
 #  Copyright (c) Martin Strohalm. All rights reserved.
 
+import heapq
 from itertools import islice
 
 UNDEFINED = object()
 
 
+class _MultiKey(object):
+    """Key wrapper comparing individual columns in specified directions."""
+    
+    __slots__ = ('key', 'reverse')
+    
+    def __init__(self, key, reverse):
+        self.key = key
+        self.reverse = reverse
+    
+    def __eq__(self, other):
+        return self.key == other.key
+    
+    def __lt__(self, other):
+        last = len(self.reverse) - 1
+        for i, (a, b) in enumerate(zip(self.key, other.key)):
+            if a != b:
+                return a > b if self.reverse[min(i, last)] else a < b
+        return False
+
+
+def _selector(key):
+    """Creates single key selector from given selector or tuple of selectors."""
+    
+    if key is None:
+        return lambda d: d
+    
+    if isinstance(key, (list, tuple)):
+        keys = tuple(key)
+        return lambda d: tuple(k(d) for k in keys)
+    
+    return key
+
+
+def _keys(sequence, key):
+    """Gets hash index or set of keys of all items."""
+    
+    index = _index(sequence, key)
+    if index is not None:
+        return index
+    
+    key = _selector(key)
+    return set(key(d) for d in sequence)
+
+
+def _index(sequence, key):
+    """Gets existing hash index of items by key if provided by sequence."""
+    
+    get_index = getattr(sequence, 'get_index', None)
+    
+    return get_index(key) if get_index is not None else None
+
+
+def _lookup(sequence, key):
+    """Builds dictionary of items lists by their keys keeping items order."""
+    
+    index = _index(sequence, key)
+    if index is not None:
+        return index
+    
+    key = _selector(key)
+    lookup = {}
+    
+    for item in sequence:
+        k = key(item)
+        if k in lookup:
+            lookup[k].append(item)
+        else:
+            lookup[k] = [item]
+    
+    return lookup
+
+
 def aggregate(sequence, func, seed=None):
     """
     Applies accumulator function over a sequence.
@@ -36,6 +109,40 @@ def aggregate(sequence, func, seed=None):
     return res
 
 
+def anti_join(sequence, items, key=None, items_key=None):
+    """
+    Iterates over items of a sequence for which no matching item exists in
+    given items by using default comparer or specified keys. Unlike the
+    'exclude', the key of given items can be specified separately and
+    composite keys can be used.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to match against.
+        
+        key: callable, (callable,) or None
+            Item's key selector. Multiple selectors can be provided to create
+            composite key.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+    
+    Returns:
+        iter(any)
+            Iterator over non-matching items.
+    """
+    
+    keys = _keys(items, key if items_key is None else items_key)
+    key = _selector(key)
+    
+    for item in sequence:
+        if key(item) not in keys:
+            yield item
+
+
 def argmax(sequence, key=None):
     """
     Returns index of the maximum item in a sequence by using default comparer
@@ -114,6 +221,92 @@ def argsort(sequence, key=None, reverse=False):
     return sorted(range(len(items)), key=items.__getitem__, reverse=reverse)
 
 
+def asof_join(sequence, items, key=None, items_key=None, tolerance=None, direction='backward', result=None, default=None):
+    """
+    Correlates each item of a sequence with the nearest item of given items
+    by their keys. The items are assumed to be sorted in ascending order by
+    their key, while the sequence can be in any order. Binary search is used
+    to find the matching item.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to join, sorted by key.
+        
+        key: callable or None
+            Item's key selector.
+        
+        items_key: callable or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        tolerance: int, float or None
+            Maximum allowed distance between matched keys.
+        
+        direction: str
+            Direction in which the match is searched.
+                'backward' - the last item having equal or lower key
+                'forward' - the first item having equal or higher key
+                'nearest' - the closest item in any direction
+        
+        result: callable or None
+            Result selector expecting two arguments (item, other). If set to
+            None, (item, other) pairs are produced.
+        
+        default: any
+            Value used if no item matches.
+    
+    Returns:
+        iter(any)
+            Iterator over joined items.
+    """
+    
+    if direction not in ('backward', 'forward', 'nearest'):
+        message = "Unknown direction specified! -> '%s'" % direction
+        raise ValueError(message)
+    
+    key = _selector(key)
+    items_key = key if items_key is None else _selector(items_key)
+    
+    if result is None:
+        result = lambda d1, d2: (d1, d2)
+    
+    others = list(items)
+    keys = [items_key(d) for d in others]
+    
+    for i in range(1, len(keys)):
+        if keys[i] < keys[i-1]:
+            message = "Items are not sorted by key! -> %s" % (keys[i],)
+            raise ValueError(message)
+    
+    for item in sequence:
+        k = key(item)
+        idx = None
+        
+        if direction == 'backward':
+            idx = bisect(keys, k, side='right') - 1
+            idx = idx if idx >= 0 else None
+        
+        elif direction == 'forward':
+            idx = bisect(keys, k, side='left')
+            idx = idx if idx < len(keys) else None
+        
+        else:
+            hi = bisect(keys, k, side='left')
+            lo = bisect(keys, k, side='right') - 1
+            
+            if lo >= 0 and (hi >= len(keys) or k - keys[lo] <= keys[hi] - k):
+                idx = lo
+            elif hi < len(keys):
+                idx = hi
+        
+        if idx is not None and tolerance is not None and abs(k - keys[idx]) > tolerance:
+            idx = None
+        
+        yield result(item, others[idx] if idx is not None else default)
+
+
 def bisect(sequence, value, key=None, side='left'):
     """
     Uses binary search to find index where if given value inserted, the order
@@ -383,6 +576,64 @@ def first(sequence, condition=None, default=UNDEFINED):
     return next(items)
 
 
+def full_join(sequence, items, key=None, items_key=None, result=None, default=None):
+    """
+    Correlates items of two sequences based on matching keys by using hash
+    join. All items from both sequences are used. If there is no matching
+    item on one side, specified default value is used instead. Non-matching
+    items of given items are produced at the end.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to join.
+        
+        key: callable, (callable,) or None
+            Item's key selector. Multiple selectors can be provided to create
+            composite key.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        result: callable or None
+            Result selector expecting two arguments (item, other). If set to
+            None, (item, other) pairs are produced.
+        
+        default: any
+            Value used for missing items.
+    
+    Returns:
+        iter(any)
+            Iterator over joined items.
+    """
+    
+    items_key = key if items_key is None else items_key
+    key = _selector(key)
+    
+    if result is None:
+        result = lambda d1, d2: (d1, d2)
+    
+    lookup = _lookup(items, items_key)
+    matched = set()
+    
+    for item in sequence:
+        k = key(item)
+        
+        if k in lookup:
+            matched.add(k)
+            for other in lookup[k]:
+                yield result(item, other)
+        else:
+            yield result(item, default)
+    
+    for k, others in lookup.items():
+        if k not in matched:
+            for other in others:
+                yield result(default, other)
+
+
 def group(sequence, key=None):
     """
     Groups items of a sequence according to default comparer or specified
@@ -416,6 +667,47 @@ def group(sequence, key=None):
     return [(k, tuple(groups[k])) for k in keys]
 
 
+def group_join(sequence, items, key=None, items_key=None, result=None):
+    """
+    Correlates items of two sequences based on matching keys by using hash
+    join and groups the matching items of given items for each item of the
+    sequence.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to join.
+        
+        key: callable, (callable,) or None
+            Item's key selector. Multiple selectors can be provided to create
+            composite key.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        result: callable or None
+            Result selector expecting two arguments (item, group). If set to
+            None, (item, group) pairs are produced.
+    
+    Returns:
+        iter(any)
+            Iterator over joined items.
+    """
+    
+    items_key = key if items_key is None else items_key
+    key = _selector(key)
+    
+    if result is None:
+        result = lambda d, g: (d, g)
+    
+    lookup = _lookup(items, items_key)
+    
+    for item in sequence:
+        yield result(item, tuple(lookup.get(key(item), ())))
+
+
 def index(sequence, condition):
     """
     Returns index of the first item in a sequence that satisfies specified
@@ -473,6 +765,61 @@ def intersect(sequence, items, key=None):
             yield item
 
 
+def join(sequence, items, key=None, items_key=None, result=None):
+    """
+    Correlates items of two sequences based on matching keys by using hash
+    join. Only items having matching item in the other sequence are used.
+    The lookup table is built from given items and the sequence is streamed
+    through it, so the results always follow the order of the sequence. If
+    both inputs are sized and the sequence is smaller, only the items having
+    key present in the sequence are kept in the lookup table. If given items
+    already provide hash index for the key (e.g. IndexedLinque), the index is
+    used directly.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to join.
+        
+        key: callable, (callable,) or None
+            Item's key selector. Multiple selectors can be provided to create
+            composite key.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        result: callable or None
+            Result selector expecting two arguments (item, other). If set to
+            None, (item, other) pairs are produced.
+    
+    Returns:
+        iter(any)
+            Iterator over joined items.
+    """
+    
+    items_key = key if items_key is None else items_key
+    
+    if result is None:
+        result = lambda d1, d2: (d1, d2)
+    
+    # skip items missing in smaller sequence
+    sized = hasattr(sequence, '__len__') and hasattr(items, '__len__')
+    if sized and len(sequence) < len(items) and _index(items, items_key) is None:
+        keys = _keys(sequence, key)
+        selector = _selector(items_key)
+        items = (d for d in items if selector(d) in keys)
+    
+    # build from items
+    lookup = _lookup(items, items_key)
+    key = _selector(key)
+    
+    for item in sequence:
+        for other in lookup.get(key(item), ()):
+            yield result(item, other)
+
+
 def last(sequence, condition=None, default=UNDEFINED):
     """
     Returns the last item in a sequence that satisfies specified condition or
@@ -508,6 +855,168 @@ def last(sequence, condition=None, default=UNDEFINED):
     return item
 
 
+def left_join(sequence, items, key=None, items_key=None, result=None, default=None):
+    """
+    Correlates items of two sequences based on matching keys by using hash
+    join. All items of the sequence are used. If there is no matching item,
+    specified default value is used instead.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to join.
+        
+        key: callable, (callable,) or None
+            Item's key selector. Multiple selectors can be provided to create
+            composite key.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        result: callable or None
+            Result selector expecting two arguments (item, other). If set to
+            None, (item, other) pairs are produced.
+        
+        default: any
+            Value used for missing items.
+    
+    Returns:
+        iter(any)
+            Iterator over joined items.
+    """
+    
+    items_key = key if items_key is None else items_key
+    key = _selector(key)
+    
+    if result is None:
+        result = lambda d1, d2: (d1, d2)
+    
+    lookup = _lookup(items, items_key)
+    missing = (default,)
+    
+    for item in sequence:
+        for other in lookup.get(key(item), missing):
+            yield result(item, other)
+
+
+def merge(*sequences, key=None, reverse=False):
+    """
+    Merges multiple sorted sequences into a single sorted sequence by using
+    default comparer or specified item's key. Each sequence is assumed to be
+    sorted by the same key and direction. Equal items are produced in the
+    order of given sequences, so merging of sorted consecutive parts of a
+    sequence gives the same result as stable sort of the whole sequence.
+    
+    Args:
+        sequences: iterable
+            Sorted sequences to be merged.
+        
+        key: callable or None
+            Item's key selector.
+        
+        reverse: bool or (bool,)
+            If set to True, sequences are assumed to be sorted in descending
+            order. This flag can be specified independently for each key
+            column, as for 'multisort'.
+    
+    Returns:
+        iter(any)
+            Iterator over merged items.
+    """
+    
+    # simple merge
+    if reverse is True or reverse is False:
+        return heapq.merge(*sequences, key=key, reverse=reverse)
+    
+    # merge by columns
+    if key is None:
+        return heapq.merge(*sequences, key=lambda d: _MultiKey(d, reverse))
+    
+    return heapq.merge(*sequences, key=lambda d: _MultiKey(key(d), reverse))
+
+
+def merge_join(sequence, items, key=None, items_key=None, result=None):
+    """
+    Correlates items of two sequences based on matching keys by using
+    sort-merge join. Both sequences are assumed to be sorted in ascending
+    order by their keys and they are streamed together, so only the items
+    sharing current key are kept in memory. Error is raised if unsorted item
+    is found.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through, sorted by key.
+        
+        items: iterable
+            Items to join, sorted by key.
+        
+        key: callable, (callable,) or None
+            Item's key selector. Multiple selectors can be provided to create
+            composite key.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        result: callable or None
+            Result selector expecting two arguments (item, other). If set to
+            None, (item, other) pairs are produced.
+    
+    Returns:
+        iter(any)
+            Iterator over joined items.
+    """
+    
+    key = _selector(key)
+    items_key = key if items_key is None else _selector(items_key)
+    
+    if result is None:
+        result = lambda d1, d2: (d1, d2)
+    
+    others = iter(items)
+    other = next(others, UNDEFINED)
+    other_key = items_key(other) if other is not UNDEFINED else None
+    
+    run = []
+    run_key = UNDEFINED
+    last_key = UNDEFINED
+    
+    for item in sequence:
+        k = key(item)
+        
+        # check order
+        if last_key is not UNDEFINED and k < last_key:
+            message = "Sequence is not sorted by key! -> %s" % (k,)
+            raise ValueError(message)
+        
+        last_key = k
+        
+        # collect next run of matching items
+        if run_key is UNDEFINED or run_key != k:
+            run = []
+            run_key = k
+            
+            while other is not UNDEFINED and other_key <= k:
+                
+                if other_key == k:
+                    run.append(other)
+                
+                other = next(others, UNDEFINED)
+                if other is UNDEFINED:
+                    break
+                
+                prev_key = other_key
+                other_key = items_key(other)
+                
+                if other_key < prev_key:
+                    message = "Items are not sorted by key! -> %s" % (other_key,)
+                    raise ValueError(message)
+        
+        for match in run:
+            yield result(item, match)
+
+
 def multisort(sequence, key=None, reverse=False, _n=0):
     """
     Produces new sequence by sorting elements of current sequence by using
@@ -687,6 +1196,39 @@ def rank(sequence, key=None, method='average', reverse=False):
     return ranks
 
 
+def semi_join(sequence, items, key=None, items_key=None):
+    """
+    Iterates over items of a sequence for which at least one matching item
+    exists in given items by using default comparer or specified keys.
+    Unlike the 'intersect', duplicate items of the sequence are kept.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to match against.
+        
+        key: callable, (callable,) or None
+            Item's key selector. Multiple selectors can be provided to create
+            composite key.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+    
+    Returns:
+        iter(any)
+            Iterator over matching items.
+    """
+    
+    keys = _keys(items, key if items_key is None else items_key)
+    key = _selector(key)
+    
+    for item in sequence:
+        if key(item) in keys:
+            yield item
+
+
 def single(sequence, condition=None, default=UNDEFINED):
     """
     Returns the single item in a sequence that satisfies specified condition or
@@ -3,7 +3,13 @@
 
 import statistics
 import random
+import weakref
+from collections.abc import Iterator, Sized
 from . import iters
+from .cache import Cache
+
+# define sequences safe to iterate repeatedly
+REUSABLE = (list, tuple, set, frozenset, range, Cache)
 
 
 class Linque(object):
@@ -13,9 +19,15 @@ class Linque(object):
     items, mostly without evaluating the sequence until necessary. Therefore,
     each linq chain can only be called once to get a final result. To break this
     logic, the class can be initialized with 'evaluate' parameter set to True,
-    to make sure all input data are stored as fully evaluated sequence such as
-    list. A linq chain can then be reused for the cost of keeping all internal
-    steps in memory as a list.
+    to make sure any step of the chain can be reused. In such case each step
+    based on single-pass sequence memoizes its items lazily as they are
+    pulled, so nothing is evaluated in advance and no step is ever calculated
+    twice. Once a step is no longer referenced, except by the steps derived
+    from it, it keeps only the items not yet pulled by all of them. Therefore
+    the intermediate steps of a linear chain are just streamed and the items
+    are kept only by steps, which are still accessible or consumed by several
+    steps at once. Steps based on sequences, which can be iterated repeatedly
+    (e.g. list or DiskLinque) are used directly.
     """
     
     def __init__(self, source, evaluate=False):
@@ -27,12 +39,17 @@ class Linque(object):
                 Sequence of items.
             
             evaluate: bool
-                If set to True, items sequence is evaluated into list upon
-                class init and for each method call as well.
+                If set to True, items sequence can be iterated repeatedly and
+                the same applies to all derived sequences as well.
         """
         
-        self._source = list(source) if evaluate else source
+        self._source = source
         self._evaluate = evaluate
+        
+        # memoize single-pass source
+        if evaluate and not _reusable(source):
+            self._source = Cache(source)
+            weakref.finalize(self, self._source.release)
     
     
     def __iter__(self):
@@ -76,6 +93,43 @@ class Linque(object):
         return all(condition(d) for d in self)
     
     
+    def anti_join(self, items, key=None, items_key=None, memory_limit=None):
+        """
+        Produces new sequence of items from current sequence for which no
+        matching item exists in given items by using default comparer or
+        specified keys. Unlike the 'exclude', the key of given items can be
+        specified separately and composite keys can be used. If memory limit
+        is specified and exceeded, items are partitioned into temporary files
+        and processed part by part.
+        
+        Args:
+            items: (any,)
+                Items to match against.
+            
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+            
+            items_key: callable, (callable,) or None
+                Other item's key selector. If set to None, 'key' is used.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        if memory_limit:
+            from . import spill
+            result = spill.anti_join(self, items, key, items_key, memory_limit)
+        else:
+            result = iters.anti_join(self, items, key, items_key)
+        
+        return Linque(result, self._evaluate)
+    
+    
     def any(self, condition=None):
         """
         Determines whether current sequence contains any item or whether any
@@ -152,6 +206,74 @@ class Linque(object):
         return Linque(result, self._evaluate)
     
     
+    def asof_join(self, items, key=None, items_key=None, tolerance=None, direction='backward', result=None, default=None):
+        """
+        Produces new sequence by correlating each item of current sequence with
+        the nearest item of given items by their keys. The items are assumed
+        to be sorted in ascending order by their key and error is raised if
+        not.
+        
+        Args:
+            items: (any,)
+                Items to join, sorted by key.
+            
+            key: callable or None
+                Item's key selector.
+            
+            items_key: callable or None
+                Other item's key selector. If set to None, 'key' is used.
+            
+            tolerance: int, float or None
+                Maximum allowed distance between matched keys.
+            
+            direction: str
+                Direction in which the match is searched.
+                    'backward' - the last item having equal or lower key
+                    'forward' - the first item having equal or higher key
+                    'nearest' - the closest item in any direction
+            
+            result: callable or None
+                Result selector expecting two arguments (item, other). If set
+                to None, (item, other) pairs are produced.
+            
+            default: any
+                Value used if no item matches.
+        
+        Returns:
+            Linque
+        """
+        
+        result = iters.asof_join(self, items, key, items_key, tolerance, direction, result, default)
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def cache(self, memory_limit=None, spill=False):
+        """
+        Produces new sequence memoizing items of current sequence lazily as
+        they are pulled. Unlike 'evaluate', nothing is pulled in advance.
+        Each iteration replays the items pulled so far and continues pulling
+        from current sequence only as far as needed, so the sequence can be
+        iterated repeatedly while it is consumed only once.
+        
+        Args:
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are kept in memory.
+            
+            spill: bool
+                If set to True, items exceeding the memory limit are stored in
+                temporary file, otherwise MemoryError is raised.
+        
+        Returns:
+            Linque
+        """
+        
+        result = Cache(self, memory_limit, spill)
+        
+        return Linque(result, self._evaluate)
+    
+    
     def choice(self, weights=None):
         """
         Returns random item from current sequence.
@@ -315,21 +437,30 @@ class Linque(object):
         return iters.count(self, condition)
     
     
-    def distinct(self, key=None):
+    def distinct(self, key=None, memory_limit=None):
         """
         Produces new sequence by selecting distinct items from current sequence
         using default comparer or specified item's key. First occurrence of each
-        item is used.
+        item is used. If memory limit is specified and the number of distinct
+        keys exceeds it, remaining items are partitioned into temporary files.
         
         Args:
             key: callable or None
                 Item's key selector.
+            
+            memory_limit: int or None
+                Maximum number of keys to be kept in memory. If set to None,
+                all keys are processed in memory.
         
         Returns:
             Linque
         """
         
-        result = iters.distinct(self, key)
+        if memory_limit:
+            from . import spill
+            result = spill.distinct(self, key, memory_limit)
+        else:
+            result = iters.distinct(self, key)
         
         return Linque(result, self._evaluate)
     
@@ -370,25 +501,58 @@ class Linque(object):
         return Linque(result, self._evaluate)
     
     
-    def evaluate(self):
+    def evaluate(self, storage='memory', path=None):
         """
         Evaluates all the iterators in current sequence and stores items as
-        internal list.
+        internal list. If storage is set to 'disk', the items are pickled into
+        a file instead and DiskLinque accessing them through memory mapping
+        is used as internal source and returned, so that the items can also
+        be accessed by index.
+        
+        Args:
+            storage: str
+                Storage type as 'memory' or 'disk'.
+            
+            path: str or None
+                Path of the file to create for disk storage. If set to None,
+                temporary file is created, which is removed when no longer
+                used.
         
         Returns:
-            Linque
+            Linque or DiskLinque
         """
         
+        # skip memoizing of unused source
+        items = self
+        if isinstance(self._source, Cache) and not self._source.started:
+            items = self._source.source
+        
+        if storage == 'disk':
+            from .disk import DiskLinque, dump
+            
+            if not isinstance(self._source, DiskLinque) or path is not None:
+                temporary = path is None
+                path = dump(items, path)
+                self._source = DiskLinque(path, self._evaluate, temporary)
+            
+            return self._source
+        
+        if storage != 'memory':
+            message = "Unknown storage specified! -> '%s'" % storage
+            raise ValueError(message)
+        
         if not isinstance(self._source, (list, tuple, set)):
-            self._source = list(self)
+            self._source = list(items)
         
         return self
     
     
-    def exclude(self, items, key=None):
+    def exclude(self, items, key=None, memory_limit=None):
         """
         Produces new sequence by excluding specified items from current sequence
-        using default comparer or specified item's key.
+        using default comparer or specified item's key. If memory limit is
+        specified and exceeded, items are partitioned into temporary files and
+        processed part by part.
         
         Args:
             items: (any,)
@@ -396,12 +560,20 @@ class Linque(object):
             
             key: callable or None
                 Item's key selector.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
         
         Returns:
             Linque
         """
         
-        result = iters.exclude(self, items, key)
+        if memory_limit:
+            from . import spill
+            result = spill.exclude(self, items, key, memory_limit)
+        else:
+            result = iters.exclude(self, items, key)
         
         return Linque(result, self._evaluate)
     
@@ -447,22 +619,338 @@ class Linque(object):
         return Linque(result, self._evaluate)
     
     
-    def group(self, key=None):
+    def fork(self, *pipelines, chunk_size=1000, buffer_size=16):
+        """
+        Runs several pipelines over a single pass of current sequence and
+        returns all their results. Each pipeline is a function expecting
+        Linque and returning result (e.g. lambda d: d.count()), which is
+        called in its own thread. The items are fed to all pipelines at once
+        through bounded queues. A pipeline finishing early (e.g. by 'take')
+        is detached without stalling the others.
+        
+        Args:
+            pipelines: (callable,)
+                Functions expecting Linque and returning result. If the
+                result is Linque itself, it is evaluated into list.
+            
+            chunk_size: int
+                Number of items sent to pipelines at once.
+            
+            buffer_size: int
+                Maximum number of chunks waiting for each pipeline.
+        
+        Returns:
+            (any,)
+                Results of the pipelines.
+        """
+        
+        from .parallel import fork
+        
+        return fork(self, pipelines, chunk_size, buffer_size)
+    
+    
+    @staticmethod
+    def from_array(array, evaluate=False):
+        """
+        Initializes a new instance of ArrayLinque keeping the items as NumPy
+        array, so the numeric aggregations, sorting, ranking and filtering run
+        vectorized. NumPy must be installed.
+        
+        Args:
+            array: numpy.ndarray or iterable
+                Array or sequence of items to be converted into array.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        
+        Returns:
+            ArrayLinque
+        """
+        
+        from .array import ArrayLinque
+        
+        return ArrayLinque(array, evaluate)
+    
+    
+    @staticmethod
+    def from_columns(columns, evaluate=False):
+        """
+        Initializes a new instance of ColumnarLinque keeping the items as
+        columns instead of individual rows. Row items are created as
+        dictionaries only when needed.
+        
+        Args:
+            columns: {str: iterable}
+                Column values by column name. All columns must have the same
+                length.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        
+        Returns:
+            ColumnarLinque
+        """
+        
+        from .columnar import ColumnarLinque
+        
+        return ColumnarLinque(columns, evaluate)
+    
+    
+    @staticmethod
+    def from_csv(path, header=True, encoding='utf-8', compression='infer', buffer_size=1024*1024, evaluate=False, **options):
+        """
+        Initializes a new instance of FileLinque lazily reading rows of given
+        CSV file. If header is used or field names are provided, the rows are
+        produced as dictionaries, otherwise as lists of strings. The file is
+        closed as soon as the iteration finishes or stops.
+        
+        Args:
+            path: str
+                Path of the file to read.
+            
+            header: bool
+                If set to True, the first row is used as field names.
+            
+            encoding: str
+                Text encoding.
+            
+            compression: str or None
+                Compression type as 'gzip', 'bz2' or 'xz'. If set to 'infer',
+                the compression is detected from the file content.
+            
+            buffer_size: int
+                Size of blocks read at once in bytes.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+            
+            options: {str: any}
+                Additional options passed to 'csv.reader'. Field names can be
+                provided as 'fieldnames'.
+        
+        Returns:
+            FileLinque
+        """
+        
+        from .files import FileLinque
+        
+        return FileLinque(path, 'csv', encoding, compression, buffer_size, evaluate, header=header, **options)
+    
+    
+    @staticmethod
+    def from_disk(path, evaluate=False):
+        """
+        Initializes a new instance of DiskLinque over items stored in given
+        file by 'evaluate' using disk storage. The file is opened read-only
+        and can be shared by multiple processes.
+        
+        Args:
+            path: str
+                Path of the file to read.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        
+        Returns:
+            DiskLinque
+        """
+        
+        from .disk import DiskLinque
+        
+        return DiskLinque(path, evaluate)
+    
+    
+    @staticmethod
+    def from_jsonl(path, encoding='utf-8', compression='infer', buffer_size=1024*1024, parallel=None, evaluate=False):
+        """
+        Initializes a new instance of FileLinque lazily reading values of
+        given JSON lines file. Empty lines are skipped. The file is closed as
+        soon as the iteration finishes or stops.
+        
+        Args:
+            path: str
+                Path of the file to read.
+            
+            encoding: str
+                Text encoding.
+            
+            compression: str or None
+                Compression type as 'gzip', 'bz2' or 'xz'. If set to 'infer',
+                the compression is detected from the file content.
+            
+            buffer_size: int
+                Size of blocks read at once in bytes.
+            
+            parallel: int or None
+                Number of worker processes. If set, the uncompressed file is
+                split into byte ranges aligned to line boundaries, which are
+                read by the workers together with the chained 'select' and
+                'where' stages.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        
+        Returns:
+            FileLinque or ParallelFileLinque
+        """
+        
+        if parallel:
+            from .files import ParallelFileLinque
+            return ParallelFileLinque(path, 'jsonl', encoding, parallel, buffer_size=buffer_size, evaluate=evaluate)
+        
+        from .files import FileLinque
+        
+        return FileLinque(path, 'jsonl', encoding, compression, buffer_size, evaluate)
+    
+    
+    @staticmethod
+    def from_lines(path, encoding='utf-8', compression='infer', buffer_size=1024*1024, parallel=None, evaluate=False):
+        """
+        Initializes a new instance of FileLinque lazily reading lines of given
+        text file without the line terminators. Lines are split by line feed
+        only, so that a lone carriage return is kept within the line. The file
+        is closed as soon as the iteration finishes or stops.
+        
+        Args:
+            path: str
+                Path of the file to read.
+            
+            encoding: str
+                Text encoding.
+            
+            compression: str or None
+                Compression type as 'gzip', 'bz2' or 'xz'. If set to 'infer',
+                the compression is detected from the file content.
+            
+            buffer_size: int
+                Size of blocks read at once in bytes.
+            
+            parallel: int or None
+                Number of worker processes. If set, the uncompressed file is
+                split into byte ranges aligned to line boundaries, which are
+                read by the workers together with the chained 'select' and
+                'where' stages.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        
+        Returns:
+            FileLinque or ParallelFileLinque
+        """
+        
+        if parallel:
+            from .files import ParallelFileLinque
+            return ParallelFileLinque(path, 'lines', encoding, parallel, buffer_size=buffer_size, evaluate=evaluate)
+        
+        from .files import FileLinque
+        
+        return FileLinque(path, 'lines', encoding, compression, buffer_size, evaluate)
+    
+    
+    @staticmethod
+    def from_sqlite(connection, table, evaluate=False):
+        """
+        Initializes a new instance of SqliteLinque reading rows of given SQLite
+        table as dictionaries. Supported operations using expressions or column
+        names are translated into SQL query.
+        
+        Args:
+            connection: sqlite3.Connection
+                Database connection.
+            
+            table: str
+                Table or view name.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        
+        Returns:
+            SqliteLinque
+        """
+        
+        from .sqlite import SqliteLinque
+        
+        return SqliteLinque(connection, table, evaluate)
+    
+    
+    def full_join(self, items, key=None, items_key=None, result=None, default=None, memory_limit=None):
+        """
+        Produces new sequence by correlating items of current sequence and given
+        items based on matching keys. All items from both sequences are used. If
+        there is no matching item on one side, specified default value is used
+        instead. If memory limit is specified and exceeded, items are
+        partitioned into temporary files and processed part by part.
+        
+        Args:
+            items: (any,)
+                Items to join.
+            
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+            
+            items_key: callable, (callable,) or None
+                Other item's key selector. If set to None, 'key' is used.
+            
+            result: callable or None
+                Result selector expecting two arguments (item, other). If set
+                to None, (item, other) pairs are produced.
+            
+            default: any
+                Value used for missing items.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        if memory_limit:
+            from . import spill
+            result = spill.full_join(self, items, key, items_key, result, default, memory_limit)
+        else:
+            result = iters.full_join(self, items, key, items_key, result, default)
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def group(self, key=None, memory_limit=None):
         """
         Produces new sequence by grouping items of current sequence according to
         default comparer or specified item's key and creates result values as
-        (key, group) pairs.
+        (key, group) pairs. If memory limit is specified and exceeded, items are
+        partitioned into temporary files and processed part by part.
         
         Args:
             key: callable or None
                 Item's key selector.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
         
         Returns:
             Linque
         """
         
         def source():
-            for item in iters.group(self, key):
+            
+            if memory_limit:
+                from . import spill
+                items = spill.group(self, key, memory_limit)
+            else:
+                items = iters.group(self, key)
+            
+            for item in items:
                 yield item
         
         result = ((k, Linque(g, self._evaluate)) for k, g in source())
@@ -470,10 +958,77 @@ class Linque(object):
         return Linque(result, self._evaluate)
     
     
-    def intersect(self, items, key=None):
+    def group_join(self, items, key=None, items_key=None, result=None, memory_limit=None):
+        """
+        Produces new sequence by correlating items of current sequence and given
+        items based on matching keys and grouping the matching items for each
+        item of current sequence. If memory limit is specified and exceeded,
+        items are partitioned into temporary files and processed part by part.
+        
+        Args:
+            items: (any,)
+                Items to join.
+            
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+            
+            items_key: callable, (callable,) or None
+                Other item's key selector. If set to None, 'key' is used.
+            
+            result: callable or None
+                Result selector expecting two arguments (item, group). If set
+                to None, (item, group) pairs are produced.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        if memory_limit:
+            from . import spill
+            result = spill.group_join(self, items, key, items_key, result, memory_limit)
+        else:
+            result = iters.group_join(self, items, key, items_key, result)
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def index_by(self, key=None, unique=False, name=None):
+        """
+        Evaluates current sequence into IndexedLinque and creates hash index
+        of its items by specified key. This makes equality lookups, 'contains',
+        'to_lookup' and joins using indexed key run in constant time.
+        
+        Args:
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+            
+            unique: bool
+                If set to True, error is raised if the key is not unique.
+            
+            name: str or None
+                Index name to be used for lookups instead of the key itself.
+        
+        Returns:
+            IndexedLinque
+        """
+        
+        from .indexed import IndexedLinque
+        
+        return IndexedLinque(self, self._evaluate).index_by(key, unique, name)
+    
+    
+    def intersect(self, items, key=None, memory_limit=None):
         """
         Produces new sequence of shared unique items from current sequence and
-        given items by using default comparer or specified item's key.
+        given items by using default comparer or specified item's key. If memory
+        limit is specified and exceeded, items are partitioned into temporary
+        files and processed part by part.
         
         Args:
             items: (any,)
@@ -481,12 +1036,66 @@ class Linque(object):
             
             key: callable or None
                 Item's key selector.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        if memory_limit:
+            from . import spill
+            result = spill.intersect(self, items, key, memory_limit)
+        else:
+            result = iters.intersect(self, items, key)
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def join(self, items, key=None, items_key=None, result=None, memory_limit=None):
+        """
+        Produces new sequence by correlating items of current sequence and given
+        items based on matching keys. Only items having matching item in the
+        other sequence are used. The results always follow the order of current
+        sequence. If both sequences are fully evaluated and current sequence is
+        smaller, only the items having matching key are kept in the lookup
+        table. If memory limit is specified and exceeded, items are partitioned
+        into temporary files and processed part by part.
+        
+        Args:
+            items: (any,)
+                Items to join.
+            
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+            
+            items_key: callable, (callable,) or None
+                Other item's key selector. If set to None, 'key' is used.
+            
+            result: callable or None
+                Result selector expecting two arguments (item, other). If set
+                to None, (item, other) pairs are produced.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
         
         Returns:
             Linque
         """
         
-        result = iters.intersect(self, items, key)
+        sequence = self
+        if not hasattr(sequence, '__len__') and isinstance(self._source, (list, tuple, range)) and type(self).__iter__ is Linque.__iter__:
+            sequence = self._source
+        
+        if memory_limit:
+            from . import spill
+            result = spill.join(sequence, items, key, items_key, result, memory_limit)
+        else:
+            result = iters.join(sequence, items, key, items_key, result)
         
         return Linque(result, self._evaluate)
     
@@ -511,6 +1120,49 @@ class Linque(object):
         return iters.last(self, condition, default)
     
     
+    def left_join(self, items, key=None, items_key=None, result=None, default=None, memory_limit=None):
+        """
+        Produces new sequence by correlating items of current sequence and given
+        items based on matching keys. All items of current sequence are used. If
+        there is no matching item, specified default value is used instead. If
+        memory limit is specified and exceeded, items are partitioned into
+        temporary files and processed part by part.
+        
+        Args:
+            items: (any,)
+                Items to join.
+            
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+            
+            items_key: callable, (callable,) or None
+                Other item's key selector. If set to None, 'key' is used.
+            
+            result: callable or None
+                Result selector expecting two arguments (item, other). If set
+                to None, (item, other) pairs are produced.
+            
+            default: any
+                Value used for missing items.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        if memory_limit:
+            from . import spill
+            result = spill.left_join(self, items, key, items_key, result, default, memory_limit)
+        else:
+            result = iters.left_join(self, items, key, items_key, result, default)
+        
+        return Linque(result, self._evaluate)
+    
+    
     def maximum(self, selector=None):
         """
         Returns maximum value in current sequence by specified items data
@@ -584,6 +1236,37 @@ class Linque(object):
         return statistics.median(selector(d) for d in self)
     
     
+    def merge_join(self, items, key=None, items_key=None, result=None):
+        """
+        Produces new sequence by correlating items of current sequence and
+        given items based on matching keys by using sort-merge join. Both
+        sequences are assumed to be sorted in ascending order by their keys
+        and error is raised if unsorted item is found.
+        
+        Args:
+            items: (any,)
+                Items to join, sorted by key.
+            
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+            
+            items_key: callable, (callable,) or None
+                Other item's key selector. If set to None, 'key' is used.
+            
+            result: callable or None
+                Result selector expecting two arguments (item, other). If set
+                to None, (item, other) pairs are produced.
+        
+        Returns:
+            Linque
+        """
+        
+        result = iters.merge_join(self, items, key, items_key, result)
+        
+        return Linque(result, self._evaluate)
+    
+    
     def minimum(self, selector=None):
         """
         Returns minimum value in current sequence by specified items data
@@ -619,6 +1302,39 @@ class Linque(object):
         return min(self, key=key) if key is not None else min(self)
     
     
+    def parallel(self, workers=None, chunk_size=1000, ordered=True, fallback=False):
+        """
+        Produces new sequence, which applies following 'select' and 'where'
+        stages in a pool of worker processes. Current sequence is split into
+        chunks, which are sent to the workers, and the results are produced
+        in original order or as they complete. All the callables of the
+        stages must be picklable.
+        
+        Args:
+            workers: int or None
+                Maximum number of worker processes. If set to None, number of
+                CPUs is used.
+            
+            chunk_size: int
+                Number of items sent to a worker at once.
+            
+            ordered: bool
+                If set to True, results are produced in the order of items,
+                otherwise as they complete.
+            
+            fallback: bool
+                If set to True, the stages are applied in current process if
+                they cannot be pickled, otherwise error is raised.
+        
+        Returns:
+            ParallelLinque
+        """
+        
+        from .parallel import ParallelLinque
+        
+        return ParallelLinque(self, workers, chunk_size, ordered, fallback, self._evaluate)
+    
+    
     def permutations(self):
         """
         Generates all possible permutations of items in current sequence.
@@ -633,6 +1349,39 @@ class Linque(object):
         return Linque(result, self._evaluate)
     
     
+    def prefetch(self, size=100, mode='thread'):
+        """
+        Produces new sequence, which consumes current sequence in a background
+        producer thread or process, so that the production of items overlaps
+        with their consumption. Produced items are kept in a bounded queue.
+        Any error raised by the producer is re-raised to the consumer and the
+        producer is stopped if the consumer stops early.
+        
+        Args:
+            size: int
+                Maximum number of items waiting in the queue.
+            
+            mode: str
+                Producer type to use.
+                    'thread' - the sequence is consumed by a background thread
+                    'process' - the sequence is consumed by a forked process,
+                        all items must be picklable
+        
+        Returns:
+            Linque
+        """
+        
+        from .parallel import prefetch
+        
+        def source():
+            for item in prefetch(self, size, mode):
+                yield item
+        
+        result = (d for d in source())
+        
+        return Linque(result, self._evaluate)
+    
+    
     def rank(self, key=None, method='average', reverse=False):
         """
         Provides 1-based rank for each item of current sequence by using default
@@ -706,19 +1455,39 @@ class Linque(object):
         return Linque(result, self._evaluate)
     
     
-    def select(self, selector):
+    def select(self, selector, threads=None, max_in_flight=None, ordered=True):
         """
         Produces new sequence by selecting items data by specified selector.
+        For I/O bound selectors, the calls can be made in a pool of threads.
+        In such case the number of submitted but not yet consumed calls is
+        limited, so that no more calls are made than needed by the consumer.
         
         Args:
             selector: callable
                 Item's data selector.
+            
+            threads: int or None
+                Number of threads to run the selector in. If set to None, the
+                selector is called in current thread.
+            
+            max_in_flight: int or None
+                Maximum number of pending calls. If set to None, twice the
+                number of threads is used.
+            
+            ordered: bool
+                If set to True, results are produced in the order of items,
+                otherwise as they complete.
         
         Returns:
             Linque
         """
         
-        result = (selector(d) for d in self)
+        if threads:
+            from .parallel import thread_map
+            result = thread_map(self, selector, threads, max_in_flight, ordered)
+        
+        else:
+            result = (selector(d) for d in self)
         
         return Linque(result, self._evaluate)
     
@@ -744,6 +1513,42 @@ class Linque(object):
         return Linque(result, self._evaluate)
     
     
+    def semi_join(self, items, key=None, items_key=None, memory_limit=None):
+        """
+        Produces new sequence of items from current sequence for which at least
+        one matching item exists in given items by using default comparer or
+        specified keys. Unlike the 'intersect', duplicate items are kept. If
+        memory limit is specified and exceeded, items are partitioned into
+        temporary files and processed part by part.
+        
+        Args:
+            items: (any,)
+                Items to match against.
+            
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+            
+            items_key: callable, (callable,) or None
+                Other item's key selector. If set to None, 'key' is used.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        if memory_limit:
+            from . import spill
+            result = spill.semi_join(self, items, key, items_key, memory_limit)
+        else:
+            result = iters.semi_join(self, items, key, items_key)
+        
+        return Linque(result, self._evaluate)
+    
+    
     def shuffle(self):
         """
         Produces new sequence by randomly shuffling items from current sequence.
@@ -819,12 +1624,15 @@ class Linque(object):
         return Linque(result, self._evaluate)
     
     
-    def sort(self, key=None, reverse=False):
+    def sort(self, key=None, reverse=False, parallel=None, memory_limit=None):
         """
         Produces new sequence by sorting elements of current sequence by using
         default comparer or specified item's key. If the key provides multiple
         columns, the sorting direction can be specified for each individual
-        column.
+        column. The items can be sorted in parts by multiple worker processes
+        and merged back, in which case the key must be picklable. If memory
+        limit is specified, sorted parts are spilled into temporary files and
+        lazily merged back, so the items do not need to fit into memory.
         
         Args:
             key: callable or None
@@ -833,13 +1641,32 @@ class Linque(object):
             reverse: bool
                 If set to True, sorting is reversed. This flag can be specified
                 independently foreach key column.
+            
+            parallel: int or None
+                Number of worker processes to use. If set to None, items are
+                sorted in current process.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are sorted in memory.
         
         Returns:
             Linque
         """
         
         def source():
-            for item in iters.multisort(self, key=key, reverse=reverse):
+            
+            if memory_limit:
+                from .spill import external_sort
+                items = external_sort(self, key, reverse, memory_limit)
+            
+            elif parallel:
+                from .parallel import parallel_sort
+                items = parallel_sort(self, key, reverse, parallel)
+            else:
+                items = iters.multisort(self, key=key, reverse=reverse)
+            
+            for item in items:
                 yield item
         
         result = (d for d in source())
@@ -902,6 +1729,47 @@ class Linque(object):
         return Linque(result, self._evaluate)
     
     
+    def to_csv(self, path, fieldnames=None, header=True, encoding='utf-8', compression='infer', batch_size=1000, **options):
+        """
+        Writes items into CSV file as they are produced. Items can be
+        dictionaries or sequences of values. The items are written into
+        temporary file, which replaces the target file at the end.
+        
+        Args:
+            path: str
+                Path of the file to write.
+            
+            fieldnames: (str,) or None
+                Names of the columns to write from dictionaries. If set to
+                None, the keys of the first item are used.
+            
+            header: bool
+                If set to True, the field names are written as first row.
+            
+            encoding: str
+                Text encoding.
+            
+            compression: str or None
+                Compression type as 'gzip', 'bz2' or 'xz'. If set to 'infer',
+                the compression is detected from the file extension.
+            
+            batch_size: int
+                Number of items serialized and written at once.
+            
+            options: {str: any}
+                Additional options passed to 'csv.writer'.
+        
+        Returns:
+            {str: any}
+                Summary as number of written 'rows', final file size in
+                'bytes' and 'elapsed' time in seconds.
+        """
+        
+        from .files import write
+        
+        return write(self, path, 'csv', encoding, compression, batch_size, fieldnames=fieldnames, header=header, **options)
+    
+    
     def to_dict(self, key, value=lambda d: d):
         """
         Evaluates items into dictionary.
@@ -928,6 +1796,71 @@ class Linque(object):
         return result
     
     
+    def to_file(self, path, encoding='utf-8', compression='infer', batch_size=1000):
+        """
+        Writes string representation of each item into text file as separate
+        line as they are produced. The items are written into temporary file,
+        which replaces the target file at the end.
+        
+        Args:
+            path: str
+                Path of the file to write.
+            
+            encoding: str
+                Text encoding.
+            
+            compression: str or None
+                Compression type as 'gzip', 'bz2' or 'xz'. If set to 'infer',
+                the compression is detected from the file extension.
+            
+            batch_size: int
+                Number of items serialized and written at once.
+        
+        Returns:
+            {str: any}
+                Summary as number of written 'rows', final file size in
+                'bytes' and 'elapsed' time in seconds.
+        """
+        
+        from .files import write
+        
+        return write(self, path, 'lines', encoding, compression, batch_size)
+    
+    
+    def to_jsonl(self, path, encoding='utf-8', compression='infer', batch_size=1000, **options):
+        """
+        Writes items into JSON lines file as they are produced. The items are
+        written into temporary file, which replaces the target file at the
+        end.
+        
+        Args:
+            path: str
+                Path of the file to write.
+            
+            encoding: str
+                Text encoding.
+            
+            compression: str or None
+                Compression type as 'gzip', 'bz2' or 'xz'. If set to 'infer',
+                the compression is detected from the file extension.
+            
+            batch_size: int
+                Number of items serialized and written at once.
+            
+            options: {str: any}
+                Additional options passed to 'json.dumps'.
+        
+        Returns:
+            {str: any}
+                Summary as number of written 'rows', final file size in
+                'bytes' and 'elapsed' time in seconds.
+        """
+        
+        from .files import write
+        
+        return write(self, path, 'jsonl', encoding, compression, batch_size, **options)
+    
+    
     def to_list(self):
         """
         Evaluate items into list.
@@ -939,6 +1872,32 @@ class Linque(object):
         return list(self)
     
     
+    def to_lookup(self, key=None):
+        """
+        Evaluates items into dictionary of lists of items sharing the same key.
+        
+        Args:
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+        
+        Returns:
+            dict
+        """
+        
+        key = iters._selector(key)
+        result = {}
+        
+        for item in self:
+            k = key(item)
+            if k in result:
+                result[k].append(item)
+            else:
+                result[k] = [item]
+        
+        return result
+    
+    
     def to_set(self):
         """
         Evaluate items into set.
@@ -950,6 +1909,43 @@ class Linque(object):
         return set(self)
     
     
+    def to_sqlite(self, connection, table, columns=None, batch_size=1000, on_conflict=None):
+        """
+        Inserts items into SQLite table as they are produced. The items are
+        inserted by 'executemany' in batches within single transaction, unless
+        a transaction is already open. The table is created if it does not
+        exist yet.
+        
+        Args:
+            connection: sqlite3.Connection
+                Database connection.
+            
+            table: str
+                Table name.
+            
+            columns: (str,), {str: str} or None
+                Column names or column types by column name used to create
+                the table. If set to None, the keys of the first item or the
+                columns of existing table are used.
+            
+            batch_size: int
+                Number of items inserted at once.
+            
+            on_conflict: str or None
+                Conflict resolution as 'rollback', 'abort', 'fail', 'ignore'
+                or 'replace'.
+        
+        Returns:
+            {str: any}
+                Summary as number of inserted 'rows', 'elapsed' time in
+                seconds and insertion 'rate' in rows per second.
+        """
+        
+        from .sqlite import write
+        
+        return write(self, connection, table, columns, batch_size, on_conflict)
+    
+    
     def to_tuple(self):
         """
         Evaluate items into tuple.
@@ -1033,3 +2029,12 @@ class Linque(object):
         result = zip(self, *sequences)
         
         return Linque(result, self._evaluate)
+
+
+def _reusable(sequence):
+    """Checks whether given sequence can be iterated repeatedly."""
+    
+    if isinstance(sequence, REUSABLE):
+        return True
+    
+    return isinstance(sequence, Sized) and not isinstance(sequence, Iterator)
@@ -0,0 +1,722 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import os
+import pickle
+import queue
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from . import iters
+from .linque import Linque
+
+CHUNK_SIZE = 1000
+
+
+class ParallelLinque(Linque):
+    """
+    ParallelLinque runs row-local 'select' and 'where' stages in a pool of
+    worker processes. The source sequence is split into chunks, which are
+    dispatched to the workers together with the chained stages and the
+    results are produced either in the original order or as they complete.
+    The 'count', 'sum', 'distinct' and 'group' aggregations calculate partial
+    results for each chunk in the workers, which are then merged in current
+    process. Any other operation is applied on the results in current
+    process as for the standard Linque. Since the stages must be sent to
+    other processes, all the callables must be picklable (i.e. module-level
+    functions rather than lambdas or closures).
+    """
+    
+    def __init__(self, source, workers=None, chunk_size=CHUNK_SIZE, ordered=True, fallback=False, evaluate=False):
+        """
+        Initializes a new instance of ParallelLinque.
+        
+        Args:
+            source: iterable
+                Sequence of items.
+            
+            workers: int or None
+                Maximum number of worker processes. If set to None, number of
+                CPUs is used.
+            
+            chunk_size: int
+                Number of items sent to a worker at once.
+            
+            ordered: bool
+                If set to True, results are produced in the order of source
+                items, otherwise as they complete.
+            
+            fallback: bool
+                If set to True, the stages are applied in current process if
+                they cannot be pickled, otherwise error is raised.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        """
+        
+        super().__init__(source, False)
+        
+        self._evaluate = evaluate
+        self._workers = workers or os.cpu_count() or 1
+        self._chunk_size = max(1, chunk_size)
+        self._ordered = ordered
+        self._fallback = fallback
+        self._stages = ()
+    
+    
+    def __iter__(self):
+        """Gets items iterator."""
+        
+        return (d for items in self._map() for d in items)
+    
+    
+    def count(self, condition=None):
+        """
+        Returns number of items in current sequence satisfying given condition.
+        Partial counts are calculated in worker processes.
+        
+        Args:
+            condition: callable or None
+                Condition to test.
+        
+        Returns:
+            int
+        """
+        
+        return sum(self._map(_reduce_count, condition, ordered=False))
+    
+    
+    def distinct(self, key=None, memory_limit=None):
+        """
+        Produces new sequence by selecting distinct items from current sequence
+        using default comparer or specified item's key. First occurrence of each
+        item is used. Distinct items of each chunk are selected in worker
+        processes and merged in original order. If memory limit is specified
+        and the number of distinct keys exceeds it, remaining items are
+        partitioned into temporary files during the merge.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+            
+            memory_limit: int or None
+                Maximum number of keys to be kept in memory. If set to None,
+                all keys are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        def pairs():
+            for chunk in self._map(_reduce_distinct, key, ordered=True):
+                for pair in chunk:
+                    yield pair
+        
+        def source():
+            
+            if memory_limit:
+                from . import spill
+                items = spill.distinct(pairs(), _first, memory_limit)
+            else:
+                items = iters.distinct(pairs(), _first)
+            
+            for k, item in items:
+                yield item
+        
+        result = (d for d in source())
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def evaluate(self, storage='memory', path=None):
+        """
+        Runs the stages in worker processes and stores the results into new
+        standard Linque, so that the stages are never applied again. See
+        'Linque.evaluate' for details.
+        
+        Args:
+            storage: str
+                Storage type as 'memory' or 'disk'.
+            
+            path: str or None
+                Path of the file to create for disk storage. If set to None,
+                temporary file is created, which is removed when no longer
+                used.
+        
+        Returns:
+            Linque or DiskLinque
+        """
+        
+        return Linque(self, self._evaluate).evaluate(storage, path)
+    
+    
+    def group(self, key=None, memory_limit=None):
+        """
+        Produces new sequence by grouping items of current sequence according to
+        default comparer or specified item's key and creates result values as
+        (key, group) pairs. Items of each chunk are grouped in worker processes
+        and the groups are merged in original order. If memory limit is
+        specified and exceeded, items are partitioned into temporary files
+        during the merge.
+        
+        Args:
+            key: callable or None
+                Item's key selector.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        def pairs():
+            for chunk in self._map(_reduce_group, key, ordered=True):
+                for k, items in chunk:
+                    for item in items:
+                        yield k, item
+        
+        def source():
+            
+            if memory_limit:
+                from . import spill
+                groups = spill.group(pairs(), _first, memory_limit)
+            else:
+                groups = iters.group(pairs(), _first)
+            
+            for k, items in groups:
+                yield k, Linque(tuple(d[1] for d in items), self._evaluate)
+        
+        result = (d for d in source())
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def select(self, selector):
+        """
+        Produces new sequence by selecting items data by specified selector.
+        The selector is called in worker processes.
+        
+        Args:
+            selector: callable
+                Item's data selector.
+        
+        Returns:
+            ParallelLinque
+        """
+        
+        return self._derive(('select', selector))
+    
+    
+    def sequential(self):
+        """
+        Produces standard Linque over the results so that following 'select'
+        and 'where' stages are applied in current process.
+        
+        Returns:
+            Linque
+        """
+        
+        return Linque(self, self._evaluate)
+    
+    
+    def sum(self, selector=None):
+        """
+        Returns summed value in current sequence by specified items data
+        selector. Partial sums are calculated in worker processes.
+        
+        Args:
+            selector: callable
+                Item's data selector.
+        
+        Returns:
+            any
+        """
+        
+        return sum(self._map(_reduce_sum, selector, ordered=False))
+    
+    
+    def where(self, condition):
+        """
+        Produces new sequence by selecting items by specified predicate. The
+        predicate is called in worker processes.
+        
+        Args:
+            condition: callable
+                Condition to test.
+        
+        Returns:
+            ParallelLinque
+        """
+        
+        return self._derive(('where', condition))
+    
+    
+    def _derive(self, stage):
+        """Creates new instance with additional stage."""
+        
+        linq = ParallelLinque.__new__(type(self))
+        linq.__dict__.update(self.__dict__)
+        linq._stages = self._stages + (stage,)
+        
+        return linq
+    
+    
+    def _map(self, reducer=None, arg=None, ordered=None):
+        """Runs the stages and reducer in worker processes."""
+        
+        ordered = self._ordered if ordered is None else ordered
+        
+        # check callables
+        try:
+            pickle.dumps((self._stages, reducer, arg))
+        
+        except Exception as e:
+            if not self._fallback:
+                message = "Parallel stages cannot be pickled, use module-level functions instead of lambdas or closures! -> %s" % e
+                raise TypeError(message) from e
+            
+            for chunk in self._tasks():
+                yield _run_chunk(self._stages, chunk, reducer, arg)
+            
+            return
+        
+        # run in pool
+        tasks = self._tasks()
+        pending = deque()
+        limit = 2 * self._workers
+        
+        with ProcessPoolExecutor(self._workers) as executor:
+            try:
+                for chunk in tasks:
+                    pending.append(executor.submit(_run_chunk, self._stages, chunk, reducer, arg))
+                    
+                    if len(pending) >= limit:
+                        yield self._collect(pending, ordered)
+                
+                while pending:
+                    yield self._collect(pending, ordered)
+            
+            finally:
+                for future in pending:
+                    future.cancel()
+    
+    
+    def _collect(self, pending, ordered):
+        """Collects next finished result."""
+        
+        # keep order
+        if ordered:
+            return pending.popleft().result()
+        
+        # get any finished
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        future = done.pop()
+        pending.remove(future)
+        
+        return future.result()
+    
+    
+    def _tasks(self):
+        """Gets items chunks to be sent to workers."""
+        
+        return iters.chunk(self._source, self._chunk_size)
+
+
+def _first(pair):
+    """Gets the first value of a pair."""
+    
+    return pair[0]
+
+
+def _reduce_count(items, condition):
+    """Counts items of a chunk."""
+    
+    return iters.count(items, condition)
+
+
+def _reduce_distinct(items, key):
+    """Gets distinct (key, item) pairs of a chunk."""
+    
+    seen = set()
+    pairs = []
+    
+    for item in items:
+        k = key(item) if key is not None else item
+        if k not in seen:
+            seen.add(k)
+            pairs.append((k, item))
+    
+    return pairs
+
+
+def _reduce_group(items, key):
+    """Gets (key, items) groups of a chunk."""
+    
+    return [(k, list(g)) for k, g in iters.group(items, key)]
+
+
+def _reduce_sum(items, selector):
+    """Sums items of a chunk."""
+    
+    if selector is None:
+        return sum(items)
+    
+    return sum(selector(d) for d in items)
+
+
+def _run_chunk(stages, chunk, reducer=None, arg=None):
+    """Applies stages and reducer to chunk of items."""
+    
+    items = chunk
+    
+    for kind, func in stages:
+        if kind == 'select':
+            items = [func(d) for d in items]
+        else:
+            items = [d for d in items if func(d)]
+    
+    if reducer is not None:
+        return reducer(items, arg)
+    
+    if not isinstance(items, (list, tuple)):
+        return list(items)
+    
+    return items
+
+
+def thread_map(sequence, func, threads, max_in_flight=None, ordered=True):
+    """
+    Applies given function to every item of a sequence in a pool of threads.
+    The number of submitted but not yet consumed calls is limited, so that
+    new calls are only submitted as the results are consumed. Pending calls
+    are cancelled if the iteration is stopped early.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        func: callable
+            Function to be applied.
+        
+        threads: int
+            Number of threads.
+        
+        max_in_flight: int or None
+            Maximum number of pending calls. If set to None, twice the number
+            of threads is used.
+        
+        ordered: bool
+            If set to True, results are produced in the order of items,
+            otherwise as they complete.
+    
+    Returns:
+        iter(any)
+            Iterator over results.
+    """
+    
+    limit = max(1, max_in_flight or 2 * threads)
+    executor = ThreadPoolExecutor(threads)
+    pending = deque()
+    items = iter(sequence)
+    
+    try:
+        while True:
+            
+            # fill pending calls
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= limit:
+                    break
+            
+            if not pending:
+                break
+            
+            # keep order
+            if ordered:
+                future = pending.popleft()
+            
+            # get any finished
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+            
+            yield future.result()
+    
+    finally:
+        for future in pending:
+            future.cancel()
+        
+        executor.shutdown(wait=False)
+
+
+def parallel_sort(sequence, key=None, reverse=False, workers=None):
+    """
+    Sorts items of a sequence by splitting them into parts, which are sorted
+    in worker processes and merged back by k-way merge. The sort is stable
+    and supports the same per-column directions as 'multisort'. The key must
+    be picklable.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to sort.
+        
+        key: callable or None
+            Item's key selector.
+        
+        reverse: bool or (bool,)
+            If set to True, sorting is reversed. This flag can be specified
+            independently foreach key column.
+        
+        workers: int or None
+            Maximum number of worker processes. If set to None, number of
+            CPUs is used.
+    
+    Returns:
+        iter(any)
+            Iterator over sorted items.
+    """
+    
+    workers = workers or os.cpu_count() or 1
+    
+    try:
+        pickle.dumps(key)
+    
+    except Exception as e:
+        message = "Sort key cannot be pickled, use module-level function instead of lambda or closure! -> %s" % e
+        raise TypeError(message) from e
+    
+    items = list(sequence)
+    size = -(-len(items) // workers)
+    
+    if workers < 2 or len(items) < 2 * workers:
+        return iter(iters.multisort(items, key, reverse))
+    
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(iters.multisort, items[i:i+size], key, reverse) for i in range(0, len(items), size)]
+        runs = [f.result() for f in futures]
+    
+    return iters.merge(*runs, key=key, reverse=reverse)
+
+
+def prefetch(sequence, size, mode='thread'):
+    """
+    Iterates over items of a sequence, which is consumed in background by a
+    producer thread or process, so that the production and consumption of
+    items overlap. Produced items are kept in a bounded queue. Any error
+    raised by the producer is re-raised in the consumer. If the iteration is
+    stopped early, the producer is stopped as well.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        size: int
+            Maximum number of items waiting in the queue.
+        
+        mode: str
+            Producer type to use.
+                'thread' - the sequence is consumed by a background thread
+                'process' - the sequence is consumed by a forked process, all
+                    items must be picklable
+    
+    Returns:
+        iter(any)
+            Iterator over items.
+    """
+    
+    size = max(1, size)
+    
+    if mode == 'thread':
+        buff = queue.Queue(size)
+        stop = threading.Event()
+        producer = threading.Thread(target=_produce, args=(sequence, buff, stop, False), daemon=True)
+    
+    elif mode == 'process':
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            message = "Process prefetch requires 'fork' start method!"
+            raise ValueError(message)
+        
+        context = multiprocessing.get_context('fork')
+        buff = context.Queue(size)
+        stop = context.Event()
+        producer = context.Process(target=_produce, args=(sequence, buff, stop, True), daemon=True)
+    
+    else:
+        message = "Unknown prefetch mode specified! -> '%s'" % mode
+        raise ValueError(message)
+    
+    return _consume(producer, buff, stop)
+
+
+def fork(sequence, pipelines, chunk_size=CHUNK_SIZE, buffer_size=16):
+    """
+    Runs several pipelines over a single pass of a sequence. Each pipeline is
+    called in its own thread with a Linque receiving the items through
+    bounded queue, so that the sequence is consumed only once and no branch
+    can get too far ahead of the others. A pipeline finishing early (e.g. by
+    'take' or 'first') is detached and does not receive any more items. The
+    sequence is not consumed further once all pipelines finished. Since the
+    items are shared by all pipelines, they should not be modified.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        pipelines: (callable,)
+            Functions expecting Linque and returning result. If the result is
+            Linque itself, it is evaluated into list.
+        
+        chunk_size: int
+            Number of items sent to pipelines at once.
+        
+        buffer_size: int
+            Maximum number of chunks waiting for each pipeline.
+    
+    Returns:
+        (any,)
+            Results of the pipelines.
+    """
+    
+    count = len(pipelines)
+    results = [None] * count
+    errors = [None] * count
+    buffs = [queue.Queue(max(1, buffer_size)) for _ in range(count)]
+    stops = [threading.Event() for _ in range(count)]
+    
+    def run(i):
+        try:
+            result = pipelines[i](Linque(_receive(buffs[i])))
+            results[i] = result.to_list() if isinstance(result, Linque) else result
+        except BaseException as e:
+            errors[i] = e
+        finally:
+            stops[i].set()
+    
+    branches = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(count)]
+    for branch in branches:
+        branch.start()
+    
+    # feed branches
+    items = iter(sequence)
+    message = ('done', None)
+    
+    try:
+        for chunk in iters.chunk(items, max(1, chunk_size)):
+            active = [_put(b, ('items', chunk), e) for b, e in zip(buffs, stops)]
+            if not any(active):
+                break
+    
+    except BaseException as e:
+        message = ('error', e)
+        raise
+    
+    finally:
+        if hasattr(items, 'close'):
+            items.close()
+        
+        for buff, stop in zip(buffs, stops):
+            _put(buff, message, stop)
+        
+        for branch in branches:
+            branch.join()
+    
+    # check errors
+    for error in errors:
+        if error is not None:
+            raise error
+    
+    return tuple(results)
+
+
+def _consume(producer, buff, stop):
+    """Gets items produced in background."""
+    
+    producer.start()
+    
+    try:
+        while True:
+            kind, value = buff.get()
+            
+            if kind == 'item':
+                yield value
+            
+            elif kind == 'error':
+                raise value
+            
+            else:
+                break
+    
+    finally:
+        stop.set()
+        
+        # unblock producer
+        while producer.is_alive():
+            try:
+                buff.get(timeout=0.01)
+            except queue.Empty:
+                pass
+        
+        producer.join()
+
+
+def _produce(sequence, buff, stop, pickled):
+    """Puts items into queue until finished or stopped."""
+    
+    items = iter(sequence)
+    message = ('done', None)
+    
+    try:
+        for item in items:
+            if not _put(buff, ('item', item), stop):
+                return
+    
+    except Exception as e:
+        
+        # make sure error can be sent back
+        if pickled:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = RuntimeError(repr(e))
+        
+        message = ('error', e)
+    
+    finally:
+        if hasattr(items, 'close'):
+            items.close()
+    
+    _put(buff, message, stop)
+
+
+def _receive(buff):
+    """Gets items sent to a fork branch."""
+    
+    while True:
+        kind, value = buff.get()
+        
+        if kind == 'items':
+            yield from value
+        
+        elif kind == 'error':
+            raise value
+        
+        else:
+            break
+
+
+def _put(buff, message, stop):
+    """Puts message into queue unless stopped."""
+    
+    while not stop.is_set():
+        try:
+            buff.put(message, timeout=0.05)
+            return True
+        except queue.Full:
+            pass
+    
+    return False
@@ -0,0 +1,527 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+from bisect import bisect_left, bisect_right
+from . import iters
+from .linque import Linque
+
+LOAD = 1000
+
+
+class SortedLinque(Linque):
+    """
+    SortedLinque is a fully evaluated Linque keeping its items sorted by
+    default comparer or specified item's key while new items are inserted or
+    existing removed. Items are stored as a list of sorted sublists together
+    with their cached keys, so the key selector is called only once per item
+    and inserts, removals and range queries only need binary search over the
+    sublists' maximum keys and within single sublist. Positions of the
+    sublists are tracked by binary indexed tree of their sizes, so indexing
+    stays logarithmic while items are inserted and removed. Equal items are
+    kept in insertion order.
+    """
+    
+    def __init__(self, source=(), key=None, evaluate=False, load=LOAD):
+        """
+        Initializes a new instance of SortedLinque.
+        
+        Args:
+            source: iterable
+                Sequence of items.
+            
+            key: callable, (callable,) or None
+                Item's key selector. Multiple selectors can be provided to
+                create composite key.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+            
+            load: int
+                Sublist size used to split the items. Sublists are split when
+                they grow over twice this size.
+        """
+        
+        super().__init__((), evaluate)
+        
+        self._key = iters._selector(key)
+        self._load = max(1, load)
+        
+        self._lists = []
+        self._keys = []
+        self._maxes = []
+        self._tree = None
+        self._size = 0
+        
+        self.update(source)
+    
+    
+    def __iter__(self):
+        """Gets items iterator."""
+        
+        return (d for items in self._lists for d in items)
+    
+    
+    def __len__(self):
+        """Gets number of items."""
+        
+        return self._size
+    
+    
+    def __getitem__(self, idx):
+        """Gets item at specified index."""
+        
+        size = len(self)
+        
+        if idx < 0:
+            idx += size
+        
+        if idx < 0 or idx >= size:
+            raise IndexError("Index out of range.")
+        
+        pos, idx = self._locate(idx)
+        
+        return self._lists[pos][idx]
+    
+    
+    def __contains__(self, item):
+        """Checks whether given item is present."""
+        
+        return self._find(item) is not None
+    
+    
+    def add(self, item):
+        """
+        Inserts given item into current sequence keeping the order.
+        
+        Args:
+            item: any
+                Item to insert.
+        
+        Returns:
+            SortedLinque
+        """
+        
+        k = self._key(item)
+        
+        # first item
+        if not self._maxes:
+            self._lists.append([item])
+            self._keys.append([k])
+            self._maxes.append(k)
+            self._tree = None
+            self._size = 1
+            return self
+        
+        # find sublist
+        pos = bisect_right(self._maxes, k)
+        if pos == len(self._maxes):
+            pos -= 1
+        
+        # insert item
+        keys = self._keys[pos]
+        idx = bisect_right(keys, k)
+        keys.insert(idx, k)
+        self._lists[pos].insert(idx, item)
+        self._maxes[pos] = keys[-1]
+        self._size += 1
+        
+        # split sublist
+        if len(keys) > 2 * self._load:
+            self._split(pos)
+        else:
+            self._resize(pos, 1)
+        
+        return self
+    
+    
+    def between(self, lo=None, hi=None, inclusive=(True, True)):
+        """
+        Produces new sequence of items having key within specified range.
+        
+        Args:
+            lo: any
+                Lower bound of the range. If set to None, the range is not
+                limited from below.
+            
+            hi: any
+                Upper bound of the range. If set to None, the range is not
+                limited from above.
+            
+            inclusive: (bool, bool)
+                Specifies whether the bounds are included.
+        
+        Returns:
+            Linque
+        """
+        
+        start = 0 if lo is None else self._bisect(lo, 'left' if inclusive[0] else 'right')
+        stop = len(self) if hi is None else self._bisect(hi, 'right' if inclusive[1] else 'left')
+        
+        result = self._slice(start, stop)
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def ceiling(self, value, default=iters.UNDEFINED):
+        """
+        Returns the first item having equal or higher key than specified value
+        or raises error if no item found and no default value is provided.
+        
+        Args:
+            value: any
+                Key value to search.
+            
+            default: any
+                Default value.
+        
+        Returns:
+            any
+        """
+        
+        idx = self._bisect(value, 'left')
+        
+        if idx < len(self):
+            return self[idx]
+        
+        if default is not iters.UNDEFINED:
+            return default
+        
+        raise KeyError("No item found.")
+    
+    
+    def count_between(self, lo=None, hi=None, inclusive=(True, True)):
+        """
+        Returns number of items having key within specified range.
+        
+        Args:
+            lo: any
+                Lower bound of the range. If set to None, the range is not
+                limited from below.
+            
+            hi: any
+                Upper bound of the range. If set to None, the range is not
+                limited from above.
+            
+            inclusive: (bool, bool)
+                Specifies whether the bounds are included.
+        
+        Returns:
+            int
+        """
+        
+        start = 0 if lo is None else self._bisect(lo, 'left' if inclusive[0] else 'right')
+        stop = len(self) if hi is None else self._bisect(hi, 'right' if inclusive[1] else 'left')
+        
+        return max(0, stop - start)
+    
+    
+    def discard(self, item):
+        """
+        Removes given item from current sequence if present.
+        
+        Args:
+            item: any
+                Item to remove.
+        
+        Returns:
+            SortedLinque
+        """
+        
+        found = self._find(item)
+        
+        if found is not None:
+            self._delete(*found)
+        
+        return self
+    
+    
+    def floor(self, value, default=iters.UNDEFINED):
+        """
+        Returns the last item having equal or lower key than specified value
+        or raises error if no item found and no default value is provided.
+        
+        Args:
+            value: any
+                Key value to search.
+            
+            default: any
+                Default value.
+        
+        Returns:
+            any
+        """
+        
+        idx = self._bisect(value, 'right')
+        
+        if idx > 0:
+            return self[idx-1]
+        
+        if default is not iters.UNDEFINED:
+            return default
+        
+        raise KeyError("No item found.")
+    
+    
+    def pop(self, idx=-1):
+        """
+        Removes and returns item at specified index.
+        
+        Args:
+            idx: int
+                Index of the item to remove.
+        
+        Returns:
+            any
+        """
+        
+        size = len(self)
+        
+        if idx < 0:
+            idx += size
+        
+        if idx < 0 or idx >= size:
+            raise IndexError("Index out of range.")
+        
+        pos, idx = self._locate(idx)
+        item = self._lists[pos][idx]
+        self._delete(pos, idx)
+        
+        return item
+    
+    
+    def rank_of(self, value):
+        """
+        Returns number of items having lower key than specified value, which
+        is also the index at which an item of such key would be inserted.
+        
+        Args:
+            value: any
+                Key value to search.
+        
+        Returns:
+            int
+        """
+        
+        return self._bisect(value, 'left')
+    
+    
+    def remove(self, item):
+        """
+        Removes given item from current sequence or raises error if not
+        present.
+        
+        Args:
+            item: any
+                Item to remove.
+        
+        Returns:
+            SortedLinque
+        """
+        
+        found = self._find(item)
+        
+        if found is None:
+            raise ValueError("Item not found.")
+        
+        self._delete(*found)
+        
+        return self
+    
+    
+    def update(self, items):
+        """
+        Inserts given items into current sequence keeping the order.
+        
+        Args:
+            items: (any,)
+                Items to insert.
+        
+        Returns:
+            SortedLinque
+        """
+        
+        items = list(items)
+        
+        # insert few items one by one
+        if len(items) < len(self) // 2:
+            for item in items:
+                self.add(item)
+            return self
+        
+        # rebuild all
+        items = list(self) + items
+        keys = [self._key(d) for d in items]
+        idxs = sorted(range(len(items)), key=keys.__getitem__)
+        
+        self._lists = []
+        self._keys = []
+        self._maxes = []
+        self._tree = None
+        self._size = len(items)
+        
+        for i in range(0, len(idxs), self._load):
+            chunk = idxs[i:i+self._load]
+            self._lists.append([items[j] for j in chunk])
+            self._keys.append([keys[j] for j in chunk])
+            self._maxes.append(keys[chunk[-1]])
+        
+        return self
+    
+    
+    def _bisect(self, value, side):
+        """Gets overall index of given key value."""
+        
+        if side == 'left':
+            pos = bisect_left(self._maxes, value)
+            if pos == len(self._maxes):
+                return len(self)
+            idx = bisect_left(self._keys[pos], value)
+        
+        else:
+            pos = bisect_right(self._maxes, value)
+            if pos == len(self._maxes):
+                return len(self)
+            idx = bisect_right(self._keys[pos], value)
+        
+        return self._offset(pos) + idx
+    
+    
+    def _delete(self, pos, idx):
+        """Removes item at given sublist position and index."""
+        
+        del self._lists[pos][idx]
+        del self._keys[pos][idx]
+        self._size -= 1
+        
+        if self._keys[pos]:
+            self._maxes[pos] = self._keys[pos][-1]
+            self._resize(pos, -1)
+        
+        else:
+            del self._lists[pos]
+            del self._keys[pos]
+            del self._maxes[pos]
+            self._tree = None
+    
+    
+    def _find(self, item):
+        """Gets sublist position and index of given item."""
+        
+        if not self._maxes:
+            return None
+        
+        k = self._key(item)
+        pos = bisect_left(self._maxes, k)
+        
+        while pos < len(self._maxes):
+            keys = self._keys[pos]
+            items = self._lists[pos]
+            
+            idx = bisect_left(keys, k)
+            while idx < len(keys) and keys[idx] == k:
+                if items[idx] == item:
+                    return pos, idx
+                idx += 1
+            
+            if idx < len(keys):
+                return None
+            
+            pos += 1
+        
+        return None
+    
+    
+    def _locate(self, idx):
+        """Gets sublist position and index of item at overall index."""
+        
+        tree = self._index()
+        pos = 0
+        step = 1 << len(tree).bit_length()
+        
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] <= idx:
+                idx -= tree[nxt]
+                pos = nxt
+            step >>= 1
+        
+        return pos, idx
+    
+    
+    def _offset(self, pos):
+        """Gets overall index of the first item in given sublist."""
+        
+        tree = self._index()
+        total = 0
+        
+        while pos > 0:
+            total += tree[pos]
+            pos -= pos & -pos
+        
+        return total
+    
+    
+    def _index(self):
+        """Gets binary indexed tree of sublists sizes."""
+        
+        if self._tree is None:
+            
+            tree = [0] * (len(self._lists) + 1)
+            
+            for i, items in enumerate(self._lists, 1):
+                tree[i] += len(items)
+                parent = i + (i & -i)
+                if parent < len(tree):
+                    tree[parent] += tree[i]
+            
+            self._tree = tree
+        
+        return self._tree
+    
+    
+    def _resize(self, pos, delta):
+        """Updates size of given sublist in binary indexed tree."""
+        
+        tree = self._tree
+        if tree is None:
+            return
+        
+        pos += 1
+        while pos < len(tree):
+            tree[pos] += delta
+            pos += pos & -pos
+    
+    
+    def _slice(self, start, stop):
+        """Iterates over items within given overall indices."""
+        
+        if start >= stop:
+            return
+        
+        pos, idx = self._locate(start)
+        count = stop - start
+        
+        while count > 0 and pos < len(self._lists):
+            items = self._lists[pos]
+            chunk = items[idx:idx+count]
+            
+            for item in chunk:
+                yield item
+            
+            count -= len(chunk)
+            pos += 1
+            idx = 0
+    
+    
+    def _split(self, pos):
+        """Splits given sublist into halves."""
+        
+        items = self._lists[pos]
+        keys = self._keys[pos]
+        half = len(keys) // 2
+        
+        self._lists[pos:pos+1] = [items[:half], items[half:]]
+        self._keys[pos:pos+1] = [keys[:half], keys[half:]]
+        self._maxes[pos:pos+1] = [keys[half-1], keys[-1]]
+        self._tree = None
@@ -0,0 +1,835 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import os
+import heapq
+import pickle
+import tempfile
+from itertools import chain, islice
+from . import iters
+
+BLOCK_SIZE = 1000
+PARTITIONS = 16
+LEVELS = 4
+
+
+class Spill(object):
+    """
+    Spill represents a temporary file to store items out of memory. The items
+    are pickled in blocks, so they can be streamed back without loading the
+    whole file. The file is removed when the spill is closed.
+    """
+    
+    def __init__(self, block_size=BLOCK_SIZE):
+        """
+        Initializes a new instance of Spill.
+        
+        Args:
+            block_size: int
+                Number of items pickled together.
+        """
+        
+        fd, self._path = tempfile.mkstemp(prefix='linque_', suffix='.spill')
+        
+        self._file = os.fdopen(fd, 'w+b')
+        self._block_size = max(1, block_size)
+        self._block = []
+        self._count = 0
+    
+    
+    def __len__(self):
+        """Gets number of items."""
+        
+        return self._count
+    
+    
+    def __iter__(self):
+        """Gets items iterator."""
+        
+        self.flush()
+        
+        with open(self._path, 'rb') as f:
+            while True:
+                try:
+                    block = pickle.load(f)
+                except EOFError:
+                    return
+                
+                for item in block:
+                    yield item
+    
+    
+    def append(self, item):
+        """
+        Appends given item at the end of the file.
+        
+        Args:
+            item: any
+                Item to append.
+        """
+        
+        self._block.append(item)
+        self._count += 1
+        
+        if len(self._block) >= self._block_size:
+            self.flush()
+    
+    
+    def close(self):
+        """Closes and removes the file."""
+        
+        if self._file is None:
+            return
+        
+        self._file.close()
+        self._file = None
+        self._block = []
+        
+        try:
+            os.remove(self._path)
+        except OSError:
+            pass
+    
+    
+    def extend(self, items):
+        """
+        Appends given items at the end of the file.
+        
+        Args:
+            items: (any,)
+                Items to append.
+        """
+        
+        for item in items:
+            self.append(item)
+    
+    
+    def flush(self):
+        """Writes pending items into the file."""
+        
+        if self._block:
+            pickle.dump(self._block, self._file, pickle.HIGHEST_PROTOCOL)
+            self._block = []
+        
+        self._file.flush()
+
+
+def external_sort(sequence, key=None, reverse=False, memory_limit=100000):
+    """
+    Sorts items of a sequence without keeping all of them in memory. The
+    items are split into runs of specified size, which are sorted and
+    spilled to temporary files. The runs are then lazily merged by k-way
+    merge, so only the beginning of each run is read if the iteration stops
+    early. If all the items fit into single run, nothing is spilled. The sort
+    is stable and supports the same per-column directions as 'multisort'.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to sort.
+        
+        key: callable or None
+            Item's key selector.
+        
+        reverse: bool or (bool,)
+            If set to True, sorting is reversed. This flag can be specified
+            independently foreach key column.
+        
+        memory_limit: int
+            Maximum number of items kept in memory.
+    
+    Returns:
+        iter(any)
+            Iterator over sorted items.
+    """
+    
+    spills = []
+    
+    try:
+        for chunk in iters.chunk(sequence, max(1, memory_limit)):
+            items = iters.multisort(chunk, key, reverse)
+            
+            # all fits into memory
+            if not spills and len(chunk) < memory_limit:
+                for item in items:
+                    yield item
+                return
+            
+            # spill run
+            spill = Spill()
+            spills.append(spill)
+            spill.extend(items)
+            spill.flush()
+        
+        # merge runs
+        for item in iters.merge(*spills, key=key, reverse=reverse):
+            yield item
+    
+    finally:
+        for spill in spills:
+            spill.close()
+
+
+def anti_join(sequence, items, key=None, items_key=None, memory_limit=100000, partitions=PARTITIONS):
+    """
+    Iterates over items of a sequence for which no matching item exists in
+    given items. If the items do not fit into memory, both sequences are
+    hash-partitioned into temporary files and processed partition by
+    partition. See 'iters.anti_join' for details.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to match against.
+        
+        key: callable, (callable,) or None
+            Item's key selector.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        memory_limit: int
+            Maximum number of items kept in memory.
+        
+        partitions: int
+            Number of partitions used if the items do not fit into memory.
+    
+    Returns:
+        iter(any)
+            Iterator over non-matching items.
+    """
+    
+    def process(probe, build):
+        keys = set(k for j, k, d in build)
+        for i, k, item in probe:
+            if k not in keys:
+                yield i, item
+    
+    return _grace(iters.anti_join, process, sequence, items, key, items_key, memory_limit, partitions)
+
+
+def distinct(sequence, key=None, memory_limit=100000, partitions=PARTITIONS):
+    """
+    Iterates over distinct items in a sequence by using default comparer or
+    specified item's key. First occurrence of each item is used. Items are
+    streamed until a new key would exceed the memory limit, then remaining
+    items are hash-partitioned into temporary files, deduplicated partition
+    by partition and merged back in original order.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        key: callable or None
+            Item's key selector.
+        
+        memory_limit: int
+            Maximum number of keys kept in memory.
+        
+        partitions: int
+            Number of partitions used if the keys do not fit into memory.
+    
+    Returns:
+        iter(any)
+            Iterator over distinct items.
+    """
+    
+    key = iters._selector(key)
+    items = iter(sequence)
+    seen = set()
+    
+    # stream in memory
+    for item in items:
+        k = key(item)
+        
+        if k in seen:
+            continue
+        
+        if len(seen) >= memory_limit:
+            break
+        
+        seen.add(k)
+        yield item
+    
+    else:
+        return
+    
+    # partition remaining
+    spills = [Spill() for i in range(partitions)]
+    outputs = []
+    
+    try:
+        for i, item in enumerate(chain((item,), items)):
+            k = key(item)
+            if k not in seen:
+                spills[hash(k) % partitions].append((i, k, item))
+        
+        seen = None
+        
+        # deduplicate partitions
+        for spill, in _split([(d,) for d in spills], memory_limit, partitions):
+            output = Spill()
+            outputs.append(output)
+            
+            keys = set()
+            for i, k, item in spill:
+                if k not in keys:
+                    keys.add(k)
+                    output.append((i, item))
+            
+            output.flush()
+            spill.close()
+        
+        # merge partitions
+        for i, item in heapq.merge(*outputs, key=lambda d: d[0]):
+            yield item
+    
+    finally:
+        for spill in chain(spills, outputs):
+            spill.close()
+
+
+def exclude(sequence, items, key=None, memory_limit=100000, partitions=PARTITIONS):
+    """
+    Excludes specified items from a sequence by using default comparer or
+    specified item's key. If the items to exclude do not fit into memory,
+    both sequences are hash-partitioned into temporary files and processed
+    partition by partition. See 'iters.exclude' for details.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to exclude.
+        
+        key: callable or None
+            Item's key selector.
+        
+        memory_limit: int
+            Maximum number of items kept in memory.
+        
+        partitions: int
+            Number of partitions used if the items do not fit into memory.
+    
+    Returns:
+        iter(any)
+            Iterator over remaining items.
+    """
+    
+    def process(probe, build):
+        keys = set(k for j, k, d in build)
+        for i, k, item in probe:
+            if k not in keys:
+                yield i, item
+    
+    def memory(sequence, items, key, items_key):
+        return iters.exclude(sequence, items, key)
+    
+    return _grace(memory, process, sequence, items, key, None, memory_limit, partitions)
+
+
+def full_join(sequence, items, key=None, items_key=None, result=None, default=None, memory_limit=100000, partitions=PARTITIONS):
+    """
+    Correlates items of two sequences based on matching keys. All items from
+    both sequences are used. If the items do not fit into memory, both
+    sequences are hash-partitioned into temporary files and processed
+    partition by partition. See 'iters.full_join' for details.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to join.
+        
+        key: callable, (callable,) or None
+            Item's key selector.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        result: callable or None
+            Result selector expecting two arguments (item, other).
+        
+        default: any
+            Value used for missing items.
+        
+        memory_limit: int
+            Maximum number of items kept in memory.
+        
+        partitions: int
+            Number of partitions used if the items do not fit into memory.
+    
+    Returns:
+        iter(any)
+            Iterator over joined items.
+    """
+    
+    if result is None:
+        result = lambda d1, d2: (d1, d2)
+    
+    def process(probe, build):
+        lookup, firsts = _build(build)
+        matched = set()
+        
+        for i, k, item in probe:
+            if k in lookup:
+                matched.add(k)
+                for other in lookup[k]:
+                    yield (0, i), result(item, other)
+            else:
+                yield (0, i), result(item, default)
+        
+        for k, others in lookup.items():
+            if k not in matched:
+                for other in others:
+                    yield (1, firsts[k]), result(default, other)
+    
+    def memory(sequence, items, key, items_key):
+        return iters.full_join(sequence, items, key, items_key, result, default)
+    
+    return _grace(memory, process, sequence, items, key, items_key, memory_limit, partitions)
+
+
+def group(sequence, key=None, memory_limit=100000, partitions=PARTITIONS):
+    """
+    Groups items of a sequence according to default comparer or specified
+    item's key and creates result values as (key, group) pairs. If the items
+    do not fit into memory, they are hash-partitioned into temporary files,
+    grouped partition by partition and merged back in order of first
+    occurrence of each key.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        key: callable or None
+            Item's key selector.
+        
+        memory_limit: int
+            Maximum number of items kept in memory.
+        
+        partitions: int
+            Number of partitions used if the items do not fit into memory.
+    
+    Returns:
+        iter((any, (any,)),)
+            Iterator over grouped items as (key, group) pairs.
+    """
+    
+    buff, rest = _buffer(sequence, memory_limit)
+    
+    # all fits into memory
+    if rest is None:
+        for item in iters.group(buff, key):
+            yield item
+        return
+    
+    buff = None
+    spills = []
+    outputs = []
+    
+    try:
+        spills = _partition(rest, key, partitions)
+        
+        # group partitions
+        for spill, in _split([(d,) for d in spills], memory_limit, partitions):
+            output = Spill()
+            outputs.append(output)
+            
+            lookup, firsts = _build(spill)
+            for k, items in lookup.items():
+                output.append((firsts[k], k, tuple(items)))
+            
+            output.flush()
+            spill.close()
+        
+        # merge partitions
+        for i, k, items in heapq.merge(*outputs, key=lambda d: d[0]):
+            yield k, items
+    
+    finally:
+        for spill in chain(spills, outputs):
+            spill.close()
+
+
+def group_join(sequence, items, key=None, items_key=None, result=None, memory_limit=100000, partitions=PARTITIONS):
+    """
+    Correlates items of two sequences based on matching keys and groups the
+    matching items of given items for each item of the sequence. If the
+    items do not fit into memory, both sequences are hash-partitioned into
+    temporary files and processed partition by partition. See
+    'iters.group_join' for details.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to join.
+        
+        key: callable, (callable,) or None
+            Item's key selector.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        result: callable or None
+            Result selector expecting two arguments (item, group).
+        
+        memory_limit: int
+            Maximum number of items kept in memory.
+        
+        partitions: int
+            Number of partitions used if the items do not fit into memory.
+    
+    Returns:
+        iter(any)
+            Iterator over joined items.
+    """
+    
+    if result is None:
+        result = lambda d, g: (d, g)
+    
+    def process(probe, build):
+        lookup, firsts = _build(build)
+        for i, k, item in probe:
+            yield i, result(item, tuple(lookup.get(k, ())))
+    
+    def memory(sequence, items, key, items_key):
+        return iters.group_join(sequence, items, key, items_key, result)
+    
+    return _grace(memory, process, sequence, items, key, items_key, memory_limit, partitions)
+
+
+def intersect(sequence, items, key=None, memory_limit=100000, partitions=PARTITIONS):
+    """
+    Produces a sequence of shared unique items from given sequences by using
+    default comparer or specified item's key. If the items do not fit into
+    memory, both sequences are hash-partitioned into temporary files and
+    processed partition by partition. See 'iters.intersect' for details.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to intersect with.
+        
+        key: callable or None
+            Item's key selector.
+        
+        memory_limit: int
+            Maximum number of items kept in memory.
+        
+        partitions: int
+            Number of partitions used if the items do not fit into memory.
+    
+    Returns:
+        iter(any)
+            Iterator over intersecting items.
+    """
+    
+    def process(probe, build):
+        keys = set(k for j, k, d in build)
+        for i, k, item in probe:
+            if k in keys:
+                keys.remove(k)
+                yield i, item
+    
+    def memory(sequence, items, key, items_key):
+        return iters.intersect(sequence, items, key)
+    
+    return _grace(memory, process, sequence, items, key, None, memory_limit, partitions)
+
+
+def join(sequence, items, key=None, items_key=None, result=None, memory_limit=100000, partitions=PARTITIONS):
+    """
+    Correlates items of two sequences based on matching keys by using hash
+    join. If the items do not fit into memory, both sequences are
+    hash-partitioned into temporary files and joined partition by partition
+    (grace hash join). The order of results follows the sequence. See
+    'iters.join' for details.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to join.
+        
+        key: callable, (callable,) or None
+            Item's key selector.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        result: callable or None
+            Result selector expecting two arguments (item, other).
+        
+        memory_limit: int
+            Maximum number of items kept in memory.
+        
+        partitions: int
+            Number of partitions used if the items do not fit into memory.
+    
+    Returns:
+        iter(any)
+            Iterator over joined items.
+    """
+    
+    if result is None:
+        result = lambda d1, d2: (d1, d2)
+    
+    def process(probe, build):
+        lookup, firsts = _build(build)
+        for i, k, item in probe:
+            for other in lookup.get(k, ()):
+                yield i, result(item, other)
+    
+    def memory(sequence, items, key, items_key):
+        return iters.join(sequence, items, key, items_key, result)
+    
+    return _grace(memory, process, sequence, items, key, items_key, memory_limit, partitions)
+
+
+def left_join(sequence, items, key=None, items_key=None, result=None, default=None, memory_limit=100000, partitions=PARTITIONS):
+    """
+    Correlates items of two sequences based on matching keys. All items of
+    the sequence are used. If the items do not fit into memory, both
+    sequences are hash-partitioned into temporary files and processed
+    partition by partition. See 'iters.left_join' for details.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to join.
+        
+        key: callable, (callable,) or None
+            Item's key selector.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        result: callable or None
+            Result selector expecting two arguments (item, other).
+        
+        default: any
+            Value used for missing items.
+        
+        memory_limit: int
+            Maximum number of items kept in memory.
+        
+        partitions: int
+            Number of partitions used if the items do not fit into memory.
+    
+    Returns:
+        iter(any)
+            Iterator over joined items.
+    """
+    
+    if result is None:
+        result = lambda d1, d2: (d1, d2)
+    
+    missing = (default,)
+    
+    def process(probe, build):
+        lookup, firsts = _build(build)
+        for i, k, item in probe:
+            for other in lookup.get(k, missing):
+                yield i, result(item, other)
+    
+    def memory(sequence, items, key, items_key):
+        return iters.left_join(sequence, items, key, items_key, result, default)
+    
+    return _grace(memory, process, sequence, items, key, items_key, memory_limit, partitions)
+
+
+def semi_join(sequence, items, key=None, items_key=None, memory_limit=100000, partitions=PARTITIONS):
+    """
+    Iterates over items of a sequence for which at least one matching item
+    exists in given items. If the items do not fit into memory, both
+    sequences are hash-partitioned into temporary files and processed
+    partition by partition. See 'iters.semi_join' for details.
+    
+    Args:
+        sequence: iterable
+            Sequence of items to go through.
+        
+        items: iterable
+            Items to match against.
+        
+        key: callable, (callable,) or None
+            Item's key selector.
+        
+        items_key: callable, (callable,) or None
+            Other item's key selector. If set to None, 'key' is used.
+        
+        memory_limit: int
+            Maximum number of items kept in memory.
+        
+        partitions: int
+            Number of partitions used if the items do not fit into memory.
+    
+    Returns:
+        iter(any)
+            Iterator over matching items.
+    """
+    
+    def process(probe, build):
+        keys = set(k for j, k, d in build)
+        for i, k, item in probe:
+            if k in keys:
+                yield i, item
+    
+    return _grace(iters.semi_join, process, sequence, items, key, items_key, memory_limit, partitions)
+
+
+def _buffer(sequence, limit):
+    """Reads items up to limit and gets remaining iterator if exceeded."""
+    
+    items = iter(sequence)
+    buff = list(islice(items, max(1, limit) + 1))
+    
+    if len(buff) <= limit:
+        return buff, None
+    
+    return buff, chain(buff, items)
+
+
+def _build(spill):
+    """Builds lookup and first occurrences from partition."""
+    
+    lookup = {}
+    firsts = {}
+    
+    for i, k, item in spill:
+        if k in lookup:
+            lookup[k].append(item)
+        else:
+            lookup[k] = [item]
+            firsts[k] = i
+    
+    return lookup, firsts
+
+
+def _grace(memory, process, sequence, items, key, items_key, memory_limit, partitions):
+    """
+    Runs in-memory or partitioned processing of two sequences. Partitions of
+    given items still exceeding the memory limit are split again recursively
+    by using different hash seed.
+    """
+    
+    items_key = key if items_key is None else items_key
+    buff, rest = _buffer(items, memory_limit)
+    
+    # all fits into memory
+    if rest is None:
+        for item in memory(sequence, buff, key, items_key):
+            yield item
+        return
+    
+    buff = None
+    builds = []
+    probes = []
+    outputs = []
+    
+    try:
+        builds = _partition(rest, items_key, partitions)
+        probes = _partition(sequence, key, partitions)
+        
+        # process partitions
+        for build, probe in _split(list(zip(builds, probes)), memory_limit, partitions):
+            output = Spill()
+            outputs.append(output)
+            
+            output.extend(process(probe, build))
+            output.flush()
+            
+            build.close()
+            probe.close()
+        
+        # merge partitions
+        for i, item in heapq.merge(*outputs, key=lambda d: d[0]):
+            yield item
+    
+    finally:
+        for spill in chain(builds, probes, outputs):
+            spill.close()
+
+
+def _partition(sequence, key, partitions):
+    """Splits items into partitions by key hash."""
+    
+    key = iters._selector(key)
+    spills = [Spill() for i in range(max(1, partitions))]
+    
+    try:
+        for i, item in enumerate(sequence):
+            k = key(item)
+            spills[hash(k) % len(spills)].append((i, k, item))
+    
+    except BaseException:
+        for spill in spills:
+            spill.close()
+        raise
+    
+    for spill in spills:
+        spill.flush()
+    
+    return spills
+
+
+def _repartition(spill, partitions, seed):
+    """Splits partitioned items again by key hash using given seed."""
+    
+    spills = [Spill() for i in range(max(1, partitions))]
+    
+    try:
+        for i, k, item in spill:
+            spills[hash((seed, k)) % len(spills)].append((i, k, item))
+    
+    except BaseException:
+        for spill in spills:
+            spill.close()
+        raise
+    
+    for spill in spills:
+        spill.flush()
+    
+    return spills
+
+
+def _split(groups, memory_limit, partitions, level=1, size=None):
+    """Iterates over partition groups splitting oversized ones recursively."""
+    
+    parts = []
+    
+    try:
+        for group in groups:
+            count = len(group[0])
+            
+            # fits into memory or cannot be split
+            if count <= memory_limit or level > LEVELS or (size is not None and count >= size):
+                yield group
+                continue
+            
+            # split by different seed
+            parts = []
+            for spill in group:
+                parts.append(_repartition(spill, partitions, level))
+                spill.close()
+            
+            for item in _split(list(zip(*parts)), memory_limit, partitions, level + 1, count):
+                yield item
+            
+            for spill in chain(*parts):
+                spill.close()
+    
+    finally:
+        for spill in chain(*parts):
+            spill.close()
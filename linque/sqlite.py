@@ -0,0 +1,668 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import time
+import sqlite3
+from itertools import groupby
+from . import iters
+from .linque import Linque
+from .expressions import Expression, col
+
+# check window functions support
+WINDOW = sqlite3.sqlite_version_info >= (3, 25, 0)
+
+# define SQL operators
+SQL_UNARY = {
+    'neg': "(-%s)",
+    'abs': "abs(%s)",
+    'not': "(NOT %s)"}
+
+SQL_BINARY = {
+    'add': "(%s + %s)",
+    'sub': "(%s - %s)",
+    'mul': "(%s * %s)",
+    'truediv': "(CAST(%s AS REAL) / %s)",
+    'eq': "(%s IS %s)",
+    'ne': "(%s IS NOT %s)",
+    'lt': "(%s < %s)",
+    'le': "(%s <= %s)",
+    'gt': "(%s > %s)",
+    'ge': "(%s >= %s)",
+    'and': "(%s AND %s)",
+    'or': "(%s OR %s)"}
+
+CONFLICTS = ('ROLLBACK', 'ABORT', 'FAIL', 'IGNORE', 'REPLACE')
+ARITHMETIC = ('neg', 'abs', 'add', 'sub', 'mul', 'truediv')
+NUMERIC = ('INT', 'REAL', 'FLOA', 'DOUB', 'NUM', 'DEC')
+
+
+class SqliteLinque(Linque):
+    """
+    SqliteLinque reads rows of SQLite table as dictionaries and translates
+    supported operations into SQL query, so that the filtering, sorting and
+    limiting is done by the database instead of pulling all the rows into
+    Python. Conditions and keys can be given as expressions or column names.
+    The 'where', 'sort', 'take', 'skip', 'select', 'count', 'distinct' and
+    'group' are pushed into the query if possible. Any other operation, or
+    any callable which cannot be translated (e.g. lambda), is applied in
+    Python on the rows produced by the query built so far.
+    """
+    
+    def __init__(self, connection, table, evaluate=False):
+        """
+        Initializes a new instance of SqliteLinque.
+        
+        Args:
+            connection: sqlite3.Connection
+                Database connection.
+            
+            table: str
+                Table or view name.
+            
+            evaluate: bool
+                If set to True, derived sequences memoize their items lazily,
+                so they can be iterated repeatedly.
+        """
+        
+        super().__init__((), False)
+        
+        self._evaluate = evaluate
+        self._connection = connection
+        
+        self._from = (_quote(table), ())
+        self._columns = None
+        self._where = ()
+        self._order = ()
+        self._limit = None
+        self._offset = 0
+        
+        # get column types
+        cursor = connection.execute("PRAGMA table_info(%s)" % _quote(table))
+        self._types = {d[1]: (d[2] or "").upper() for d in cursor}
+        cursor.close()
+    
+    
+    def __iter__(self):
+        """Gets row items iterator."""
+        
+        return _fetch(self._connection, *self.to_sql())
+    
+    
+    def count(self, condition=None):
+        """
+        Returns number of items in current sequence satisfying given condition.
+        The counting is done by the database if the condition is an expression
+        which can be translated into SQL.
+        
+        Args:
+            condition: Expression, callable or None
+                Condition to test.
+        
+        Returns:
+            int
+        """
+        
+        where = ("", ())
+        if condition is not None:
+            where = self._sql(condition)
+            if where is None:
+                return super().count(condition)
+            where = (" WHERE %s" % where[0], where[1])
+        
+        sql, params = self.to_sql()
+        sql = "SELECT COUNT(*) FROM (%s)%s" % (sql, where[0])
+        
+        cursor = self._connection.execute(sql, params + where[1])
+        count = cursor.fetchone()[0]
+        cursor.close()
+        
+        return count
+    
+    
+    def distinct(self, key=None, memory_limit=None):
+        """
+        Produces new sequence by selecting distinct items from current sequence
+        using default comparer or specified item's key. First occurrence of each
+        item is used. If the key is specified as column name, expression or
+        tuple of them, it is done by the database using GROUP BY.
+        
+        Args:
+            key: str, Expression, (str or Expression,), callable or None
+                Column name(s), expression(s) or item's key selector.
+            
+            memory_limit: int or None
+                Maximum number of keys to be kept in memory. If set to None,
+                all keys are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        keys = self._keys(key)
+        if keys is None or not WINDOW:
+            return super().distinct(key, memory_limit)
+        
+        sql, params = self._numbered()
+        groups = ", ".join(d[0] for d in keys)
+        params += tuple(p for d in keys for p in d[1])
+        
+        sql = "SELECT * FROM (SELECT *, MIN(_linque_n) AS _linque_m FROM (%s) GROUP BY %s) ORDER BY _linque_m" % (sql, groups)
+        result = _fetch(self._connection, sql, params)
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def group(self, key=None, memory_limit=None):
+        """
+        Produces new sequence by grouping items of current sequence according to
+        default comparer or specified item's key and creates result values as
+        (key, group) pairs. If the key is specified as column name, expression
+        or tuple of them, the database orders the rows by groups in order of
+        first occurrence so that only single group is kept in memory.
+        
+        Args:
+            key: str, Expression, (str or Expression,), callable or None
+                Column name(s), expression(s) or item's key selector.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are processed in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        keys = self._keys(key)
+        if keys is None or not WINDOW:
+            return super().group(key, memory_limit)
+        
+        sql, params = self._numbered()
+        groups = ", ".join(d[0] for d in keys)
+        params += tuple(p for d in keys for p in d[1])
+        
+        sql = "SELECT * FROM (%s) ORDER BY MIN(_linque_n) OVER (PARTITION BY %s), _linque_n" % (sql, groups)
+        selector = _selector(key)
+        
+        def source():
+            rows = _fetch(self._connection, sql, params)
+            for k, items in groupby(rows, selector):
+                yield k, Linque(tuple(items), self._evaluate)
+        
+        result = (d for d in source())
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def select(self, selector, threads=None, max_in_flight=None, ordered=True):
+        """
+        Produces new sequence by applying selector to each item of current
+        sequence. If the selector is specified as column name or expression,
+        the values are calculated by the database. If specified as tuple of
+        column names, the query is limited to those columns.
+        
+        Args:
+            selector: str, (str,), Expression or callable
+                Column name(s), expression or item's data selector.
+            
+            threads: int or None
+                Number of threads to use. If set to None, items are processed
+                in current thread.
+            
+            max_in_flight: int or None
+                Maximum number of items being processed at once.
+            
+            ordered: bool
+                If set to True, results are produced in the order of source
+                items, otherwise as they complete.
+        
+        Returns:
+            Linque
+        """
+        
+        # projection
+        if not threads and isinstance(selector, (list, tuple)) and selector and all(isinstance(d, str) for d in selector):
+            result = self._copy()
+            result._columns = tuple(selector)
+            return result
+        
+        # single value
+        value = None if threads else self._sql(col(selector) if isinstance(selector, str) else selector)
+        if value is None:
+            return super().select(selector, threads, max_in_flight, ordered)
+        
+        sql, params = self.to_sql()
+        sql = "SELECT %s FROM (%s)" % (value[0], sql)
+        result = (d[0] for d in _fetch(self._connection, sql, value[1] + params, False))
+        
+        return Linque(result, self._evaluate)
+    
+    
+    def skip(self, count):
+        """
+        Produces new sequence by bypassing specified number of items in current
+        sequence and returns the remaining items. This is done by the database
+        using OFFSET.
+        
+        Args:
+            count: int
+                Number of items to skip.
+        
+        Returns:
+            Linque
+        """
+        
+        count = max(0, count)
+        
+        result = self._copy()
+        result._offset += count
+        
+        if result._limit is not None:
+            result._limit = max(0, result._limit - count)
+        
+        return result
+    
+    
+    def sort(self, key=None, reverse=False, parallel=None, memory_limit=None):
+        """
+        Produces new sequence by sorting elements of current sequence by using
+        default comparer or specified item's key. If the key is specified as
+        column name, expression or tuple of them, the sorting is done by the
+        database using ORDER BY.
+        
+        Args:
+            key: str, Expression, (str or Expression,), callable or None
+                Column name(s), expression(s) or item's key selector.
+            
+            reverse: bool or (bool,)
+                If set to True, sorting is reversed. This flag can be specified
+                independently foreach key column.
+            
+            parallel: int or None
+                Number of worker processes to use. If set to None, items are
+                sorted in current process.
+            
+            memory_limit: int or None
+                Maximum number of items to be kept in memory. If set to None,
+                all items are sorted in memory.
+        
+        Returns:
+            Linque
+        """
+        
+        keys = self._keys(key)
+        if keys is None or parallel or memory_limit:
+            return super().sort(key, reverse, parallel, memory_limit)
+        
+        if isinstance(reverse, bool):
+            reverse = (reverse,)
+        
+        order = []
+        for i, (sql, params) in enumerate(keys):
+            desc = reverse[min(i, len(reverse) - 1)]
+            order.append(("%s %s" % (sql, "DESC" if desc else "ASC"), params))
+        
+        result = self._wrap()
+        result._order = tuple(order) + result._order
+        
+        return result
+    
+    
+    def take(self, count):
+        """
+        Produces new sequence by selecting specified number of contiguous items
+        from the start of current sequence. This is done by the database using
+        LIMIT.
+        
+        Args:
+            count: int
+                Number of items to take.
+        
+        Returns:
+            Linque
+        """
+        
+        count = max(0, count)
+        
+        result = self._copy()
+        result._limit = count if result._limit is None else min(count, result._limit)
+        
+        return result
+    
+    
+    def to_sql(self):
+        """
+        Gets SQL query and its parameters representing current sequence.
+        
+        Returns:
+            (str, tuple)
+                SQL query and parameters.
+        """
+        
+        columns = "*"
+        if self._columns is not None:
+            columns = ", ".join(_quote(d) for d in self._columns)
+        
+        sql = "SELECT %s FROM %s" % (columns, self._from[0])
+        params = list(self._from[1])
+        
+        if self._where:
+            sql += " WHERE " + " AND ".join(d[0] for d in self._where)
+            params += [p for d in self._where for p in d[1]]
+        
+        if self._order:
+            sql += " ORDER BY " + ", ".join(d[0] for d in self._order)
+            params += [p for d in self._order for p in d[1]]
+        
+        if self._limit is not None or self._offset:
+            limit = -1 if self._limit is None else self._limit
+            sql += " LIMIT %d OFFSET %d" % (limit, self._offset)
+        
+        return sql, tuple(params)
+    
+    
+    def where(self, condition):
+        """
+        Produces new sequence by selecting items by specified predicate. If
+        the predicate is an expression which can be translated into SQL, the
+        filtering is done by the database.
+        
+        Args:
+            condition: Expression or callable
+                Condition to test.
+        
+        Returns:
+            Linque
+        """
+        
+        where = self._sql(condition)
+        if where is None:
+            return super().where(condition)
+        
+        result = self._wrap()
+        result._where += (where,)
+        
+        return result
+    
+    
+    def _copy(self):
+        """Creates copy of current query."""
+        
+        result = SqliteLinque.__new__(SqliteLinque)
+        result.__dict__.update(self.__dict__)
+        
+        return result
+    
+    
+    def _keys(self, key):
+        """Translates key(s) into SQL or gets None if not possible."""
+        
+        keys = key if isinstance(key, (list, tuple)) else (key,)
+        if not keys:
+            return None
+        
+        sqls = []
+        for k in keys:
+            sql = self._sql(col(k) if isinstance(k, str) else k)
+            if sql is None:
+                return None
+            sqls.append(sql)
+        
+        return sqls
+    
+    
+    def _numbered(self):
+        """Gets query with rows numbered in current order."""
+        
+        sql, params = self.to_sql()
+        sql = "SELECT *, ROW_NUMBER() OVER () AS _linque_n FROM (%s)" % sql
+        
+        return sql, params
+    
+    
+    def _numeric(self, expr):
+        """Checks whether expression gives numeric value."""
+        
+        if expr.op == 'lit':
+            return isinstance(expr.args[0], (int, float))
+        
+        if expr.op == 'field':
+            kind = self._types.get(expr.args[0], "") if len(expr.args) == 1 else ""
+            return any(d in kind for d in NUMERIC)
+        
+        if expr.op in ARITHMETIC:
+            return all(self._numeric(d) for d in expr.args)
+        
+        return False
+    
+    
+    def _sql(self, expr):
+        """Translates expression into SQL or gets None if not possible."""
+        
+        if not isinstance(expr, Expression):
+            return None
+        
+        op = expr.op
+        args = expr.args
+        
+        # column
+        if op == 'field':
+            if len(args) == 1 and isinstance(args[0], str):
+                return _quote(args[0]), ()
+            return None
+        
+        # value
+        if op == 'lit':
+            if _is_value(args[0]):
+                return "?", (args[0],)
+            return None
+        
+        # membership
+        if op == 'isin':
+            value = self._sql(args[0])
+            values = args[1].args[0]
+            
+            if value is None or not all(_is_value(d) for d in values):
+                return None
+            
+            if not values:
+                return "0", ()
+            
+            sql = "(%s IN (%s))" % (value[0], ", ".join("?" * len(values)))
+            return sql, value[1] + tuple(values)
+        
+        # check arithmetic
+        if op in ARITHMETIC and not self._numeric(expr):
+            return None
+        
+        # operations
+        parts = [self._sql(d) for d in args]
+        if any(d is None for d in parts):
+            return None
+        
+        params = tuple(p for d in parts for p in d[1])
+        
+        if op in SQL_UNARY:
+            return SQL_UNARY[op] % parts[0][0], params
+        
+        if op in SQL_BINARY:
+            return SQL_BINARY[op] % (parts[0][0], parts[1][0]), params
+        
+        return None
+    
+    
+    def _wrap(self):
+        """Gets query which can be further filtered or sorted."""
+        
+        if self._limit is None and not self._offset and self._columns is None:
+            return self._copy()
+        
+        sql, params = self.to_sql()
+        
+        result = self._copy()
+        result._from = ("(%s)" % sql, params)
+        result._columns = None
+        result._where = ()
+        result._order = ()
+        result._limit = None
+        result._offset = 0
+        
+        return result
+
+
+
+def write(sequence, connection, table, columns=None, batch_size=1000, on_conflict=None):
+    """
+    Inserts items of a sequence into SQLite table. The items are inserted by
+    'executemany' in batches within single transaction, so that either all
+    or none of them are inserted. If a transaction is already open, the
+    batches are inserted into it and it is not committed. The table is
+    created if it does not exist yet.
+    
+    Args:
+        sequence: iterable
+            Sequence of dictionaries or sequences of values.
+        
+        connection: sqlite3.Connection
+            Database connection.
+        
+        table: str
+            Table name.
+        
+        columns: (str,), {str: str} or None
+            Column names or column types by column name used to create the
+            table. If set to None, the keys of the first item or the columns
+            of existing table are used.
+        
+        batch_size: int
+            Number of items inserted at once.
+        
+        on_conflict: str or None
+            Conflict resolution as 'rollback', 'abort', 'fail', 'ignore' or
+            'replace'.
+    
+    Returns:
+        {str: any}
+            Summary as number of inserted 'rows', 'elapsed' time in seconds
+            and insertion 'rate' in rows per second.
+    """
+    
+    start = time.perf_counter()
+    
+    # check conflict
+    if on_conflict is not None and on_conflict.upper() not in CONFLICTS:
+        message = "Unknown conflict resolution! -> '%s'" % on_conflict
+        raise ValueError(message)
+    
+    insert = "INSERT OR %s INTO" % on_conflict.upper() if on_conflict else "INSERT INTO"
+    
+    rows = 0
+    
+    batches = iters.chunk(sequence, max(1, batch_size))
+    batch = next(batches, ())
+    
+    # get columns
+    if columns is not None:
+        names = list(columns)
+    
+    elif batch and isinstance(batch[0], dict):
+        names = list(batch[0])
+    
+    else:
+        cursor = connection.execute("PRAGMA table_info(%s)" % _quote(table))
+        names = [d[1] for d in cursor]
+        cursor.close()
+    
+    if not names:
+        if not batch:
+            return {'rows': 0, 'elapsed': time.perf_counter() - start, 'rate': 0.0}
+        
+        message = "Columns must be specified for new table! -> '%s'" % table
+        raise ValueError(message)
+    
+    # begin transaction
+    begin = not connection.in_transaction
+    if begin:
+        connection.execute("BEGIN")
+    
+    try:
+        
+        # create table
+        types = columns if isinstance(columns, dict) else {}
+        defs = ", ".join(("%s %s" % (_quote(k), types[k]) if types.get(k) else _quote(k)) for k in names)
+        connection.execute("CREATE TABLE IF NOT EXISTS %s (%s)" % (_quote(table), defs))
+        
+        sql = "%s %s (%s) VALUES (%s)" % (insert, _quote(table), ", ".join(_quote(k) for k in names), ", ".join("?" * len(names)))
+        
+        # insert batches
+        while batch:
+            values = [tuple(d.get(k) for k in names) if isinstance(d, dict) else tuple(d) for d in batch]
+            connection.executemany(sql, values)
+            rows += len(values)
+            batch = next(batches, ())
+    
+    except BaseException:
+        if begin and connection.in_transaction:
+            connection.execute("ROLLBACK")
+        raise
+    
+    # commit transaction
+    if begin:
+        connection.execute("COMMIT")
+    
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'rows': rows,
+        'elapsed': elapsed,
+        'rate': rows / elapsed if elapsed else 0.0}
+
+
+def _fetch(connection, sql, params, rows=True):
+    """Iterates over query results as dictionaries."""
+    
+    cursor = connection.execute(sql, params)
+    
+    try:
+        if not rows:
+            for row in cursor:
+                yield row
+            return
+        
+        names = [d[0] for d in cursor.description]
+        keep = [i for i, d in enumerate(names) if not d.startswith("_linque_")]
+        
+        if len(keep) == len(names):
+            for row in cursor:
+                yield dict(zip(names, row))
+        
+        else:
+            names = [names[i] for i in keep]
+            for row in cursor:
+                yield dict(zip(names, (row[i] for i in keep)))
+    
+    finally:
+        cursor.close()
+
+
+def _is_value(value):
+    """Checks whether value can be used as SQL parameter."""
+    
+    return value is None or isinstance(value, (int, float, str, bytes))
+
+
+def _quote(name):
+    """Quotes SQL identifier."""
+    
+    return '"%s"' % name.replace('"', '""')
+
+
+def _selector(key):
+    """Creates Python key selector for columns and expressions."""
+    
+    if isinstance(key, (list, tuple)):
+        key = tuple(col(k) if isinstance(k, str) else k for k in key)
+    
+    elif isinstance(key, str):
+        key = col(key)
+    
+    return iters._selector(key)
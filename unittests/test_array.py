@@ -0,0 +1,113 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import unittest
+import linque
+
+# try import numpy
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy not available.")
+class TestCase(unittest.TestCase):
+    """Test case for linque.ArrayLinque."""
+    
+    
+    def test_init(self):
+        """Tests whether array linque is initialized correctly."""
+        
+        linq = linque.Linque.from_array(numpy.array([3, 1, 2]))
+        self.assertIsInstance(linq, linque.ArrayLinque)
+        self.assertEqual(len(linq), 3)
+        self.assertEqual(linq[1], 1)
+        self.assertEqual(linq.to_list(), [3, 1, 2])
+        
+        linq = linque.ArrayLinque(d for d in (3, 1, 2))
+        self.assertIsInstance(linq.to_array(), numpy.ndarray)
+    
+    
+    def test_aggregations(self):
+        """Tests whether aggregations work correctly."""
+        
+        data = (3, 1, 4, 1, 5, 9, 2, 6)
+        linq = linque.Linque.from_array(numpy.array(data))
+        
+        self.assertEqual(linq.sum(), 31)
+        self.assertEqual(linq.mean(), 3.875)
+        self.assertEqual(linq.minimum(), 1)
+        self.assertEqual(linq.maximum(), 9)
+        self.assertEqual(linq.argmin(), 1)
+        self.assertEqual(linq.argmax(), 5)
+        
+        self.assertIsInstance(linq.sum(), int)
+        
+        # test fallback
+        self.assertEqual(linq.sum(lambda d: d * 2), 62)
+        self.assertEqual(linq.maximum(lambda d: -d), -1)
+        self.assertEqual(linq.argmax(lambda d: -d), 1)
+        
+        # test overflow
+        big = 2 ** 62
+        linq = linque.Linque.from_array(numpy.array([big, big, big], dtype=numpy.int64))
+        self.assertEqual(linq.sum(), 3 * big)
+    
+    
+    def test_argsort(self):
+        """Tests whether argsort works correctly."""
+        
+        data = (3, 1, 4, 1, 5, 9, 2, 6)
+        linq = linque.Linque.from_array(numpy.array(data))
+        
+        self.assertEqual(linq.argsort().to_list(), linque.argsort(data))
+        self.assertEqual(linq.argsort(reverse=True).to_list(), linque.argsort(data, reverse=True))
+        self.assertEqual(linq.argsort(lambda d: -d).to_list(), linque.argsort(data, lambda d: -d))
+    
+    
+    def test_rank(self):
+        """Tests whether rank works correctly."""
+        
+        data = (3, 1, 4, 1, 5, 9, 2, 6, 5, 3)
+        linq = linque.Linque.from_array(numpy.array(data))
+        
+        for method in ('average', 'min', 'max', 'dense', 'ordinal'):
+            self.assertEqual(linq.rank(method=method).to_list(), linque.rank(data, method=method))
+            self.assertEqual(linq.rank(method=method, reverse=True).to_list(), linque.rank(data, method=method, reverse=True))
+    
+    
+    def test_sort(self):
+        """Tests whether sort works correctly."""
+        
+        data = (3, 1, 4, 1, 5, 9, 2, 6)
+        linq = linque.Linque.from_array(numpy.array(data))
+        
+        self.assertIsInstance(linq.sort(), linque.ArrayLinque)
+        self.assertEqual(linq.sort().to_list(), sorted(data))
+        self.assertEqual(linq.sort(reverse=True).to_list(), sorted(data, reverse=True))
+        self.assertEqual(linq.sort(lambda d: -d).to_list(), sorted(data, reverse=True))
+    
+    
+    def test_where(self):
+        """Tests whether where works correctly."""
+        
+        data = (3, 1, 4, 1, 5, 9, 2, 6)
+        linq = linque.Linque.from_array(numpy.array(data))
+        
+        self.assertIsInstance(linq.where(linque.item() > 3), linque.ArrayLinque)
+        self.assertEqual(linq.where(linque.item() > 3).to_list(), [4, 5, 9, 6])
+        self.assertEqual(linq.where((linque.item() > 1) & (linque.item() < 5)).sum(), 9)
+        self.assertEqual(linq.where(linque.item().isin((1, 2))).to_list(), [1, 1, 2])
+        self.assertEqual(linq.where(numpy.array(data) % 2 == 0).to_list(), [4, 2, 6])
+        
+        # test fallback
+        calls = []
+        self.assertEqual(linq.where(lambda d: calls.append(d) or d in (1, 2)).to_list(), [1, 1, 2])
+        self.assertEqual(calls, list(data))
+        self.assertEqual(linq.where(linque.item() + 1).count(), 8)
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,160 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import asyncio
+import unittest
+import linque
+
+
+async def agen(data):
+    for item in data:
+        await asyncio.sleep(0)
+        yield item
+
+
+async def double(x):
+    await asyncio.sleep(0.01 * (x % 3))
+    return 2 * x
+
+
+async def is_odd(x):
+    await asyncio.sleep(0)
+    return x % 2 == 1
+
+
+class TestCase(unittest.TestCase):
+    """Test case for AsyncLinque class."""
+    
+    
+    def test_aggregations(self):
+        """Tests whether aggregations work correctly."""
+        
+        data = (3, 1, 2, 0, 9, 7, 8)
+        
+        linq = linque.AsyncLinque(data)
+        self.assertEqual(asyncio.run(linq.count()), 7)
+        self.assertEqual(asyncio.run(linq.count(is_odd)), 4)
+        self.assertEqual(asyncio.run(linq.sum()), 30)
+        self.assertEqual(asyncio.run(linq.sum(double)), 60)
+        self.assertEqual(asyncio.run(linq.max()), 9)
+        self.assertEqual(asyncio.run(linq.min(lambda d: -d)), 9)
+        self.assertEqual(asyncio.run(linq.aggregate(lambda r, d: r + d)), 30)
+        self.assertTrue(asyncio.run(linq.any(is_odd)))
+        self.assertFalse(asyncio.run(linq.all(is_odd)))
+        self.assertTrue(asyncio.run(linq.contains(18, double)))
+        
+        linq = linque.AsyncLinque(agen(data))
+        self.assertEqual(asyncio.run(linq.sum()), 30)
+    
+    
+    def test_first_last(self):
+        """Tests whether first and last work correctly."""
+        
+        data = (3, 1, 2, 0, 9, 7, 8)
+        
+        linq = linque.AsyncLinque(data)
+        self.assertEqual(asyncio.run(linq.first()), 3)
+        self.assertEqual(asyncio.run(linq.first(lambda d: d > 5)), 9)
+        self.assertEqual(asyncio.run(linq.first(lambda d: d > 10, None)), None)
+        self.assertEqual(asyncio.run(linq.last(is_odd)), 7)
+        self.assertEqual(asyncio.run(linq.last(lambda d: d > 10, None)), None)
+        self.assertRaises(ValueError, asyncio.run, linq.first(lambda d: d > 10))
+        self.assertRaises(ValueError, asyncio.run, linque.AsyncLinque(()).last())
+    
+    
+    def test_group(self):
+        """Tests whether group and sort work correctly."""
+        
+        data = ((0, 1), (0, 1), (0, 2), (1, 1))
+        
+        linq = linque.AsyncLinque(agen(data))
+        result = asyncio.run(linq.group(lambda d: d[1]).select(lambda d: (d[0], d[1].to_tuple())).to_list())
+        self.assertEqual(result, [(1, ((0, 1), (0, 1), (1, 1))), (2, ((0, 2),))])
+        
+        linq = linque.AsyncLinque(agen(data))
+        result = asyncio.run(linq.sort(lambda d: (d[1], d[0]), reverse=(True, False)).to_tuple())
+        self.assertEqual(result, ((0, 2), (0, 1), (0, 1), (1, 1)))
+    
+    
+    def test_projections(self):
+        """Tests whether chained projections work correctly."""
+        
+        data = (0, 1, 2, 3, 4, 5, 6, 7, 8, 9)
+        
+        linq = linque.AsyncLinque(agen(data))
+        result = asyncio.run(linq.where(is_odd).select(double).skip(1).take(3).to_list())
+        self.assertEqual(result, [6, 10, 14])
+        
+        linq = linque.AsyncLinque(data)
+        result = asyncio.run(linq.take_while(lambda d: d < 5).skip_while(lambda d: d < 2).enumerate().to_list())
+        self.assertEqual(result, [(0, 2), (1, 3), (2, 4)])
+        
+        linq = linque.AsyncLinque(data)
+        result = asyncio.run(linq.chunk(4).flatten().concat(agen((1, 2))).distinct().exclude((0, 9)).to_tuple())
+        self.assertEqual(result, (1, 2, 3, 4, 5, 6, 7, 8))
+        
+        linq = linque.AsyncLinque(data)
+        result = asyncio.run(linq.to_linque())
+        self.assertEqual(result.where(lambda d: d > 7).to_list(), [8, 9])
+    
+    
+    def test_select_async(self):
+        """Tests whether select_async works correctly."""
+        
+        data = list(range(20))
+        
+        linq = linque.AsyncLinque(agen(data))
+        result = asyncio.run(linq.select_async(double, concurrency=5).to_list())
+        self.assertEqual(result, [2*d for d in data])
+        
+        linq = linque.AsyncLinque(data)
+        result = asyncio.run(linq.select_async(double, concurrency=5, ordered=False).to_list())
+        self.assertEqual(sorted(result), [2*d for d in data])
+        
+        calls = []
+        
+        async def record(x):
+            calls.append(x)
+            return await double(x)
+        
+        linq = linque.AsyncLinque(data)
+        result = asyncio.run(linq.select_async(record, concurrency=3).take(2).to_list())
+        self.assertEqual(result, [0, 2])
+        self.assertLessEqual(len(calls), 5)
+        
+        # test cancelling pending calls
+        finished = []
+        
+        async def slow(x):
+            await asyncio.sleep(0.01 * x)
+            finished.append(x)
+            return x
+        
+        async def run():
+            result = await linque.AsyncLinque(data).select_async(slow, concurrency=10).take(1).to_list()
+            await asyncio.sleep(0.1)
+            return result
+        
+        self.assertEqual(asyncio.run(run()), [0])
+        self.assertEqual(finished, [0])
+        
+        # test closing upstream
+        closed = []
+        
+        async def source():
+            try:
+                for d in data:
+                    yield d
+            finally:
+                closed.append(True)
+        
+        async def run():
+            result = await linque.AsyncLinque(source()).select_async(double, concurrency=3).take(2).to_list()
+            return result, list(closed)
+        
+        self.assertEqual(asyncio.run(run()), ([0, 2], [True]))
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
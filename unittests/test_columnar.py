@@ -0,0 +1,111 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import array
+import unittest
+import linque
+
+# try import numpy
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestCase(unittest.TestCase):
+    """Test case for linque.ColumnarLinque."""
+    
+    
+    def test_init(self):
+        """Tests whether columnar linque is initialized correctly."""
+        
+        columns = {'name': ['a', 'b', 'c'], 'qty': [1, 2, 3], 'price': [1.5, 2.5, 0.5]}
+        linq = linque.Linque.from_columns(columns)
+        
+        self.assertIsInstance(linq, linque.ColumnarLinque)
+        self.assertIsInstance(linq._columns['qty'], array.array)
+        self.assertIsInstance(linq._columns['price'], array.array)
+        self.assertIsInstance(linq._columns['name'], list)
+        
+        self.assertEqual(len(linq), 3)
+        self.assertEqual(linq.count(), 3)
+        self.assertEqual(linq[1], {'name': 'b', 'qty': 2, 'price': 2.5})
+        self.assertEqual(linq.to_list(), [
+            {'name': 'a', 'qty': 1, 'price': 1.5},
+            {'name': 'b', 'qty': 2, 'price': 2.5},
+            {'name': 'c', 'qty': 3, 'price': 0.5}])
+        self.assertEqual(linq.to_columns(), columns)
+        
+        # test generic methods
+        self.assertEqual(linq.where(lambda d: d['qty'] > 1).select(lambda d: d['name']).to_list(), ['b', 'c'])
+        
+        # test wrong size
+        with self.assertRaises(ValueError):
+            linque.Linque.from_columns({'a': [1, 2], 'b': [1]})
+    
+    
+    def test_select(self):
+        """Tests whether column projection works correctly."""
+        
+        columns = {'name': ['a', 'b', 'c'], 'qty': [1, 2, 3], 'price': [1.5, 2.5, 0.5]}
+        linq = linque.Linque.from_columns(columns)
+        
+        self.assertEqual(linq.select('qty').sum(), 6)
+        self.assertEqual(linq.select(('name', 'qty')).to_columns(), {'name': ['a', 'b', 'c'], 'qty': [1, 2, 3]})
+        self.assertIsInstance(linq.select(('name', 'qty')), linque.ColumnarLinque)
+        
+        with self.assertRaises(KeyError):
+            linq.select('unknown')
+    
+    
+    def test_where(self):
+        """Tests whether filtering by column works correctly."""
+        
+        columns = {'name': ['a', 'b', 'c', 'd'], 'qty': [1, 2, 3, 4]}
+        linq = linque.Linque.from_columns(columns)
+        
+        result = linq.where(lambda d: d % 2 == 0, column='qty')
+        self.assertIsInstance(result, linque.ColumnarLinque)
+        self.assertEqual(result.to_columns(), {'name': ['b', 'd'], 'qty': [2, 4]})
+    
+    
+    def test_sort(self):
+        """Tests whether sorting by columns works correctly."""
+        
+        columns = {'name': ['a', 'b', 'c', 'd'], 'group': [2, 1, 2, 1], 'qty': [1, 2, 3, 4]}
+        linq = linque.Linque.from_columns(columns)
+        
+        self.assertEqual(linq.sort('group').select('name').to_list(), ['b', 'd', 'a', 'c'])
+        self.assertEqual(linq.sort('qty', reverse=True).select('name').to_list(), ['d', 'c', 'b', 'a'])
+        self.assertEqual(linq.sort(('group', 'qty'), reverse=(False, True)).select('name').to_list(), ['d', 'b', 'c', 'a'])
+        self.assertEqual(linq.sort(lambda d: -d['qty']).select(lambda d: d['name']).to_list(), ['d', 'c', 'b', 'a'])
+    
+    
+    def test_group(self):
+        """Tests whether grouping by columns works correctly."""
+        
+        columns = {'name': ['a', 'b', 'c', 'd'], 'group': [2, 1, 2, 1], 'qty': [1, 2, 3, 4]}
+        linq = linque.Linque.from_columns(columns)
+        
+        result = linq.group('group').select(lambda d: (d[0], d[1].select('qty').sum())).to_list()
+        self.assertEqual(result, [(2, 4), (1, 6)])
+        
+        result = linq.group(('group', 'name')).select(lambda d: d[0]).to_list()
+        self.assertEqual(result, [(2, 'a'), (1, 'b'), (2, 'c'), (1, 'd')])
+    
+    
+    @unittest.skipIf(numpy is None, "NumPy not available.")
+    def test_numpy(self):
+        """Tests whether numpy columns work correctly."""
+        
+        columns = {'name': ['a', 'b', 'c'], 'qty': numpy.array([3, 1, 2])}
+        linq = linque.Linque.from_columns(columns)
+        
+        self.assertEqual(linq[0], {'name': 'a', 'qty': 3})
+        self.assertEqual(linq.sort('qty').select('name').to_list(), ['b', 'c', 'a'])
+        self.assertIsInstance(linq.where(lambda d: d > 1, column='qty')._columns['qty'], numpy.ndarray)
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
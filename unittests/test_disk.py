@@ -0,0 +1,113 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import linque
+
+
+class TestCase(unittest.TestCase):
+    """Test case for linque.DiskLinque."""
+    
+    
+    def setUp(self):
+        """Creates testing directory."""
+        
+        self.folder = tempfile.mkdtemp()
+    
+    
+    def tearDown(self):
+        """Removes testing directory."""
+        
+        shutil.rmtree(self.folder)
+    
+    
+    def test_evaluate(self):
+        """Tests whether disk evaluation works correctly."""
+        
+        data = [{'id': i, 'tags': ['x'] * (i % 3)} for i in range(100)]
+        
+        linq = linque.Linque(d for d in data)
+        stored = linq.evaluate(storage='disk')
+        self.assertIsInstance(stored, linque.DiskLinque)
+        
+        # test reuse
+        self.assertEqual(stored.to_list(), data)
+        self.assertEqual(stored.count(), 100)
+        self.assertEqual(linq.to_list(), data)
+        self.assertEqual(linq.evaluate(storage='disk'), stored)
+        
+        # test random access
+        self.assertEqual(len(stored), 100)
+        self.assertEqual(stored[5], data[5])
+        self.assertEqual(stored[-1], data[-1])
+        self.assertEqual(stored[10:20:3], data[10:20:3])
+        
+        with self.assertRaises(IndexError):
+            stored[100]
+        
+        # test pickling
+        with self.assertRaises(TypeError):
+            pickle.dumps(stored)
+        
+        # test cleanup
+        path = stored.path
+        self.assertTrue(os.path.exists(path))
+        stored.close()
+        self.assertFalse(os.path.exists(path))
+        
+        # test evaluated chain
+        linq = linque.Linque((d for d in data), True)
+        stored = linq.evaluate(storage='disk')
+        self.assertIs(linq._source, stored)
+        self.assertEqual(linq.to_list(), data)
+        stored.close()
+        
+        with self.assertRaises(ValueError):
+            linque.Linque(()).evaluate(storage='cloud')
+    
+    
+    def test_empty(self):
+        """Tests whether empty sequence is stored correctly."""
+        
+        with linque.Linque(()).evaluate(storage='disk') as stored:
+            self.assertEqual(len(stored), 0)
+            self.assertEqual(stored.to_list(), [])
+    
+    
+    def test_reopen(self):
+        """Tests whether stored file can be reopened."""
+        
+        path = os.path.join(self.folder, 'data.disk')
+        
+        stored = linque.Linque(range(10)).select(lambda d: d * d).evaluate(storage='disk', path=path)
+        self.assertEqual(stored.path, path)
+        
+        with linque.Linque.from_disk(path) as other:
+            self.assertEqual(other.to_list(), [d * d for d in range(10)])
+            self.assertEqual(other[3], 9)
+        
+        # test pickling
+        other = pickle.loads(pickle.dumps(stored))
+        self.assertEqual(other.sum(), 285)
+        other.close()
+        
+        stored.close()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(os.listdir(self.folder), ['data.disk'])
+        
+        # test invalid
+        path = os.path.join(self.folder, 'data.txt')
+        with open(path, 'w') as f:
+            f.write("not stored items")
+        
+        with self.assertRaises(ValueError):
+            linque.Linque.from_disk(path)
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
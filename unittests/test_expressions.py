@@ -0,0 +1,118 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import pickle
+import unittest
+import linque
+from linque import col, field, item, lit
+
+
+class Item(object):
+    """Simple object for attribute access."""
+    
+    def __init__(self, name, price):
+        self.name = name
+        self.price = price
+
+
+class TestCase(unittest.TestCase):
+    """Test case for linque.Expression."""
+    
+    
+    def test_field(self):
+        """Tests whether field selection works correctly."""
+        
+        self.assertEqual(col('a')({'a': 1}), 1)
+        self.assertEqual(col(1)((0, 5)), 5)
+        self.assertEqual(col('price')(Item('x', 3)), 3)
+        
+        data = {'user': {'id': 7, 'tags': ['a', 'b']}}
+        self.assertEqual(field('user.id')(data), 7)
+        self.assertEqual(field('user.tags.1')(data), 'b')
+        
+        self.assertEqual(lit(5)(None), 5)
+        self.assertEqual(item()(5), 5)
+        self.assertEqual(repr(item() > 2), "(item() > 2)")
+        self.assertEqual((item() > 2).fields(), ((),))
+    
+    
+    def test_operators(self):
+        """Tests whether operators work correctly."""
+        
+        item = {'a': 6, 'b': 4}
+        
+        self.assertEqual((col('a') + col('b'))(item), 10)
+        self.assertEqual((col('a') - 1)(item), 5)
+        self.assertEqual((1 - col('a'))(item), -5)
+        self.assertEqual((col('a') * col('b'))(item), 24)
+        self.assertEqual((col('a') / col('b'))(item), 1.5)
+        self.assertEqual((col('a') // col('b'))(item), 1)
+        self.assertEqual((col('a') % col('b'))(item), 2)
+        self.assertEqual((col('b') ** 2)(item), 16)
+        self.assertEqual((-col('a'))(item), -6)
+        self.assertEqual(abs(-col('a'))(item), 6)
+        
+        self.assertTrue((col('a') == 6)(item))
+        self.assertTrue((col('a') != 5)(item))
+        self.assertTrue((col('a') > col('b'))(item))
+        self.assertTrue((col('a') >= 6)(item))
+        self.assertFalse((col('a') < 6)(item))
+        self.assertTrue((col('a') <= 6)(item))
+        
+        self.assertTrue(((col('a') > 5) & (col('b') < 5))(item))
+        self.assertTrue(((col('a') > 10) | (col('b') < 5))(item))
+        self.assertFalse((~(col('a') > 5))(item))
+        self.assertTrue(col('a').isin((1, 6))(item))
+        
+        # test short circuit
+        self.assertFalse(((col('a') > 10) & (col('c') > 1))(item))
+        
+        # test bool
+        with self.assertRaises(TypeError):
+            bool(col('a') > 1)
+    
+    
+    def test_introspection(self):
+        """Tests whether introspection works correctly."""
+        
+        expr = (col('price') * col('qty') > 100) & field('user.id').isin([1, 2])
+        
+        self.assertEqual(expr.op, 'and')
+        self.assertEqual(expr.args[0].op, 'gt')
+        self.assertEqual(expr.args[0].args[1].args, (100,))
+        self.assertEqual(expr.fields(), (('price',), ('qty',), ('user', 'id')))
+        self.assertEqual(repr(expr), "(((col('price') * col('qty')) > 100) & field('user.id').isin((1, 2)))")
+        
+        # test pickle
+        expr = pickle.loads(pickle.dumps(expr))
+        self.assertTrue(expr({'price': 30, 'qty': 4, 'user': {'id': 2}}))
+    
+    
+    def test_linque(self):
+        """Tests whether expressions work with linque."""
+        
+        data = (
+            {'name': 'a', 'price': 30, 'qty': 4},
+            {'name': 'b', 'price': 10, 'qty': 2},
+            {'name': 'c', 'price': 50, 'qty': 1},
+            {'name': 'd', 'price': 20, 'qty': 6})
+        
+        linq = linque.Linque(d for d in data)
+        result = linq.where(col('price') * col('qty') > 40).sort(col('price')).select(col('name')).to_list()
+        self.assertEqual(result, ['d', 'a', 'c'])
+        
+        linq = linque.Linque(data)
+        self.assertEqual(linq.sum(col('qty')), 13)
+        self.assertEqual(linq.max(col('qty'))['name'], 'd')
+        
+        # test columnar
+        linq = linque.Linque.from_columns({k: [d[k] for d in data] for k in ('name', 'price', 'qty')})
+        result = linq.where(col('price') * col('qty') > 40).select(col('name')).to_list()
+        self.assertEqual(result, ['a', 'c', 'd'])
+        self.assertIsInstance(linq.where(col('qty') > 1), linque.ColumnarLinque)
+        self.assertEqual(linq.select(col('price') * col('qty')).to_list(), [120, 20, 50, 120])
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
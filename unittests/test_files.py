@@ -0,0 +1,286 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import os
+import bz2
+import gzip
+import lzma
+import shutil
+import tempfile
+import unittest
+import linque
+
+
+def is_odd(x):
+    return int(x) % 2 == 1
+
+
+def get_id(x):
+    return x['id']
+
+
+class TestCase(unittest.TestCase):
+    """Test case for linque.FileLinque."""
+    
+    
+    def setUp(self):
+        """Creates testing directory."""
+        
+        self.folder = tempfile.mkdtemp()
+    
+    
+    def tearDown(self):
+        """Removes testing directory."""
+        
+        shutil.rmtree(self.folder)
+    
+    
+    def write(self, name, data, opener=open):
+        """Writes testing file."""
+        
+        path = os.path.join(self.folder, name)
+        with opener(path, 'wb') as f:
+            f.write(data)
+        
+        return path
+    
+    
+    def test_lines(self):
+        """Tests whether lines are read correctly."""
+        
+        path = self.write('data.txt', "first\nsecond\r\n\nčtvrtý".encode('utf-8'))
+        
+        linq = linque.Linque.from_lines(path)
+        self.assertIsInstance(linq, linque.FileLinque)
+        self.assertEqual(linq.to_list(), ['first', 'second', '', 'čtvrtý'])
+        self.assertEqual(linq.where(lambda d: d).count(), 3)
+        
+        linq = linque.Linque.from_lines(path, buffer_size=2)
+        self.assertEqual(linq.to_list(), ['first', 'second', '', 'čtvrtý'])
+        
+        # test lone carriage return
+        path = self.write('data.txt', b"first\rsecond\r\nthird\n")
+        self.assertEqual(linque.Linque.from_lines(path).to_list(), ['first\rsecond', 'third'])
+        self.assertEqual(linque.Linque.from_lines(path, parallel=2).to_list(), ['first\rsecond', 'third'])
+    
+    
+    def test_compression(self):
+        """Tests whether compressed files are read correctly."""
+        
+        data = "\n".join(str(i) for i in range(1000)).encode('utf-8')
+        
+        for name, opener in (('data.gz', gzip.open), ('data.bz2', bz2.open), ('data.xz', lzma.open), ('data', gzip.open)):
+            path = self.write(name, data, opener)
+            linq = linque.Linque.from_lines(path, buffer_size=64)
+            self.assertEqual(linq.select(int).sum(), sum(range(1000)))
+        
+        path = self.write('data.gz', data, gzip.open)
+        linq = linque.Linque.from_lines(path, compression='gzip')
+        self.assertEqual(linq.count(), 1000)
+        
+        with self.assertRaises(ValueError):
+            linque.Linque.from_lines(path, compression='zip').to_list()
+    
+    
+    def test_csv(self):
+        """Tests whether CSV rows are read correctly."""
+        
+        path = self.write('data.csv', b'name,qty\npen,1\n"ink, blue",2\n"multi\nline",3\n')
+        
+        linq = linque.Linque.from_csv(path)
+        self.assertEqual(linq.to_list(), [
+            {'name': 'pen', 'qty': '1'},
+            {'name': 'ink, blue', 'qty': '2'},
+            {'name': 'multi\nline', 'qty': '3'}])
+        
+        linq = linque.Linque.from_csv(path, header=False)
+        self.assertEqual(linq.first(), ['name', 'qty'])
+        
+        linq = linque.Linque.from_csv(path, fieldnames=('a', 'b'))
+        self.assertEqual(linq.first(), {'a': 'pen', 'b': '1'})
+        
+        path = self.write('data.tsv', b'pen\t1\nink\t2\n')
+        linq = linque.Linque.from_csv(path, header=False, delimiter='\t')
+        self.assertEqual(linq.to_list(), [['pen', '1'], ['ink', '2']])
+    
+    
+    def test_jsonl(self):
+        """Tests whether JSON lines are read correctly."""
+        
+        path = self.write('data.jsonl', b'{"id": 1, "tags": ["a"]}\n\n{"id": 2, "tags": []}\n3\n')
+        
+        linq = linque.Linque.from_jsonl(path)
+        self.assertEqual(linq.to_list(), [{'id': 1, 'tags': ['a']}, {'id': 2, 'tags': []}, 3])
+        
+        # test repeated iteration
+        self.assertEqual(linq.count(), 3)
+    
+    
+    def test_where(self):
+        """Tests whether where is pushed down correctly."""
+        
+        path = self.write('data.jsonl', b'{"level": "error", "n": 1}\n{"level": "info", "msg": "error"}\nnot parsed\n{"level": "error", "n": 3}\n')
+        
+        linq = linque.Linque.from_jsonl(path)
+        
+        result = linq.where(linque.col('level') == 'error')
+        self.assertIsInstance(result, linque.FileLinque)
+        self.assertEqual(result._prefilters, (('error',),))
+        self.assertEqual(result.to_list(), [{'level': 'error', 'n': 1}, {'level': 'error', 'n': 3}])
+        
+        result = linq.where(linque.col('level').isin(('error', 'warning')) & (linque.col('n') > 1))
+        self.assertEqual(result.to_list(), [{'level': 'error', 'n': 3}])
+        
+        # test unparsable
+        with self.assertRaises(ValueError):
+            linq.where(linque.col('level') != 'info').to_list()
+        
+        # test explicit
+        result = linq.prefilter('"n"').where(lambda d: d['n'] > 1)
+        self.assertEqual(result.to_list(), [{'level': 'error', 'n': 3}])
+    
+    
+    def test_where_csv(self):
+        """Tests whether where is pushed down correctly for CSV."""
+        
+        path = self.write('data.csv', b'name,kind\npen,a\n"multi\nline",b\nink,"a\nb"\n')
+        
+        linq = linque.Linque.from_csv(path)
+        self.assertEqual(linq.where(linque.col('kind') == 'b').to_list(), [{'name': 'multi\nline', 'kind': 'b'}])
+        self.assertEqual(linq.where(linque.col('name') == 'ink').to_list(), [{'name': 'ink', 'kind': 'a\nb'}])
+        self.assertEqual(linq.prefilter('line', 'pen').select('name').to_list(), ['pen', 'multi\nline'])
+    
+    
+    def test_select(self):
+        """Tests whether select is pushed down correctly."""
+        
+        path = self.write('data.jsonl', b'{"id": 1, "name": "pen", "qty": 2}\n{"id": 2, "name": "ink"}\n')
+        
+        linq = linque.Linque.from_jsonl(path)
+        self.assertEqual(linq.select('name').to_list(), ['pen', 'ink'])
+        self.assertEqual(linq.select(('id', 'qty')).to_list(), [{'id': 1, 'qty': 2}, {'id': 2, 'qty': None}])
+        self.assertEqual(linq.select(('id', 'qty')).where(linque.col('id') > 1).to_list(), [{'id': 2, 'qty': None}])
+        
+        path = self.write('data.csv', b'id,name,qty\n1,pen,2\n2,ink,3\n')
+        
+        linq = linque.Linque.from_csv(path)
+        self.assertEqual(linq.select(('qty', 'name')).to_list(), [{'qty': '2', 'name': 'pen'}, {'qty': '3', 'name': 'ink'}])
+        self.assertEqual(linq.select(linque.col('name') + linque.col('qty')).to_list(), ['pen2', 'ink3'])
+        self.assertEqual(linq.where(linque.col('id') == '2').select('name').to_list(), ['ink'])
+        
+        linq = linque.Linque.from_csv(path, header=False)
+        self.assertEqual(linq.select(linque.col(1)).to_list(), ['name', 'pen', 'ink'])
+    
+    
+    def test_parallel(self):
+        """Tests whether file is read in parallel correctly."""
+        
+        lines = [str(i).zfill(i % 5 + 1) for i in range(500)]
+        path = self.write('data.txt', "\r\n".join(lines).encode('utf-8'))
+        
+        linq = linque.Linque.from_lines(path, parallel=2)
+        self.assertIsInstance(linq, linque.ParallelFileLinque)
+        self.assertEqual(linq.to_list(), lines)
+        self.assertEqual(linq.count(), 500)
+        self.assertEqual(linq.where(is_odd).select(int).sum(), sum(range(1, 500, 2)))
+        
+        # test small ranges
+        linq = linque.ParallelFileLinque(path, workers=3, range_size=7)
+        self.assertEqual(linq.to_list(), lines)
+        self.assertEqual(linq.where(is_odd).count(), 250)
+        
+        path = self.write('data.jsonl', "\n".join('{"id": %d}' % (i % 10) for i in range(100)).encode('utf-8'))
+        linq = linque.Linque.from_jsonl(path, parallel=2)
+        self.assertEqual(linq.select(get_id).distinct().to_list(), list(range(10)))
+        self.assertEqual(linq.group(get_id).select(lambda d: (d[0], d[1].count())).to_list(), [(i, 10) for i in range(10)])
+        
+        # test compressed
+        path = self.write('data.gz', b"1\n2\n", gzip.open)
+        with self.assertRaises(ValueError):
+            linque.Linque.from_lines(path, parallel=2)
+    
+    
+    def test_to_file(self):
+        """Tests whether items are written correctly."""
+        
+        path = os.path.join(self.folder, 'data.txt')
+        
+        summary = linque.Linque(range(2500)).to_file(path, batch_size=100)
+        self.assertEqual(summary['rows'], 2500)
+        self.assertEqual(summary['bytes'], os.path.getsize(path))
+        self.assertEqual(linque.Linque.from_lines(path).select(int).to_list(), list(range(2500)))
+        
+        for name in ('data.gz', 'data.bz2', 'data.xz'):
+            path = os.path.join(self.folder, name)
+            linque.Linque(range(100)).to_file(path)
+            self.assertEqual(linque.Linque.from_lines(path).count(), 100)
+            self.assertNotEqual(open(path, 'rb').read(1), b'0')
+        
+        # test failure
+        def source():
+            yield 1
+            raise RuntimeError()
+        
+        path = os.path.join(self.folder, 'data.txt')
+        with self.assertRaises(RuntimeError):
+            linque.Linque(source()).to_file(path)
+        
+        self.assertEqual(linque.Linque.from_lines(path).count(), 2500)
+        self.assertEqual(sorted(os.listdir(self.folder)), ['data.bz2', 'data.gz', 'data.txt', 'data.xz'])
+    
+    
+    def test_to_jsonl(self):
+        """Tests whether JSON lines are written correctly."""
+        
+        data = [{'id': i, 'tags': ['a'] * i} for i in range(10)]
+        path = os.path.join(self.folder, 'data.jsonl.gz')
+        
+        summary = linque.Linque(data).to_jsonl(path, batch_size=3, sort_keys=True)
+        self.assertEqual(summary['rows'], 10)
+        self.assertEqual(linque.Linque.from_jsonl(path).to_list(), data)
+    
+    
+    def test_to_csv(self):
+        """Tests whether CSV rows are written correctly."""
+        
+        data = [{'name': 'pen', 'qty': 1}, {'name': 'ink, blue', 'qty': 2}, {'name': 'multi\nline', 'qty': 3}]
+        path = os.path.join(self.folder, 'data.csv')
+        
+        linque.Linque(data).to_csv(path, batch_size=2)
+        self.assertEqual(linque.Linque.from_csv(path).to_list(), [{k: str(v) for k, v in d.items()} for d in data])
+        
+        linque.Linque(data).to_csv(path, fieldnames=('qty',), delimiter=';')
+        self.assertEqual(open(path).read().split(), ['qty', '1', '2', '3'])
+        
+        linque.Linque([(1, 2), (3, 4)]).to_csv(path, header=False)
+        self.assertEqual(linque.Linque.from_csv(path, header=False).to_list(), [['1', '2'], ['3', '4']])
+        
+        summary = linque.Linque(()).to_csv(path, fieldnames=('a', 'b'))
+        self.assertEqual(summary['rows'], 0)
+        self.assertEqual(open(path).read().split(), ['a,b'])
+    
+    
+    def test_close(self):
+        """Tests whether file is closed on early stop."""
+        
+        path = self.write('data.txt', "\n".join(str(i) for i in range(1000)).encode('utf-8'))
+        
+        linq = linque.Linque.from_lines(path)
+        self.assertEqual(linq.first(), '0')
+        self.assertEqual(len(linq._streams), 0)
+        
+        self.assertEqual(linq.take(3).to_list(), ['0', '1', '2'])
+        self.assertEqual(len(linq._streams), 0)
+        
+        # test explicit close
+        with linque.Linque.from_lines(path) as linq:
+            items = iter(linq)
+            self.assertEqual(next(items), '0')
+            self.assertEqual(len(linq._streams), 1)
+        
+        self.assertEqual(len(linq._streams), 0)
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
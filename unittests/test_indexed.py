@@ -0,0 +1,128 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import unittest
+import linque
+
+
+class TestCase(unittest.TestCase):
+    """Test case for IndexedLinque class."""
+    
+    
+    def test_append(self):
+        """Tests whether append updates indexes correctly."""
+        
+        data = ((1, 'a'), (2, 'b'))
+        key = lambda d: d[0]
+        
+        linq = linque.IndexedLinque(data).index_by(key, unique=True)
+        linq.append((3, 'c'))
+        linq.extend(((4, 'd'), (5, 'e')))
+        
+        self.assertEqual(len(linq), 5)
+        self.assertEqual(linq[2], (3, 'c'))
+        self.assertEqual(linq.lookup(4, key).to_tuple(), ((4, 'd'),))
+        self.assertTrue(linq.contains(5, key))
+        self.assertRaises(KeyError, linq.append, (1, 'x'))
+        
+        # test failed append
+        linq = linque.IndexedLinque(data).index_by(lambda d: d[1], name='name').index_by(key, unique=True)
+        self.assertRaises(KeyError, linq.append, (1, 'x'))
+        self.assertEqual(len(linq), 2)
+        self.assertEqual(linq.to_lookup('name'), {'a': [(1, 'a')], 'b': [(2, 'b')]})
+        self.assertFalse(linq.contains('x', 'name'))
+    
+    
+    def test_contains(self):
+        """Tests whether contains works correctly."""
+        
+        data = ((1, 'a'), (2, 'b'), (2, 'c'))
+        calls = []
+        
+        def key(d):
+            calls.append(d)
+            return d[0]
+        
+        linq = linque.IndexedLinque(data).index_by(key)
+        del calls[:]
+        
+        self.assertTrue(linq.contains(2, key))
+        self.assertFalse(linq.contains(3, key))
+        self.assertEqual(calls, [])
+        
+        self.assertTrue(linq.contains('c', lambda d: d[1]))
+        self.assertTrue(linq.contains((1, 'a')))
+    
+    
+    def test_index_by(self):
+        """Tests whether index_by works correctly."""
+        
+        data = ((1, 'a'), (2, 'b'), (2, 'c'))
+        
+        linq = linque.Linque(d for d in data).index_by(lambda d: d[0], name='id')
+        self.assertIsInstance(linq, linque.IndexedLinque)
+        self.assertEqual(linq.lookup(2, 'id').to_tuple(), ((2, 'b'), (2, 'c')))
+        self.assertEqual(linq.lookup(3, 'id').to_tuple(), ())
+        self.assertRaises(KeyError, linq.lookup, 2, 'name')
+        
+        linq.index_by(lambda d: d[1], unique=True, name='name')
+        self.assertEqual(linq.lookup('c', 'name').to_tuple(), ((2, 'c'),))
+        self.assertEqual(linq.lookup(1, 'id').to_tuple(), ((1, 'a'),))
+        
+        self.assertRaises(KeyError, linq.index_by, lambda d: d[0], unique=True)
+        
+        # test composite key
+        first = lambda d: d[0]
+        second = lambda d: d[1]
+        linq = linque.Linque(data).index_by((first, second), name='all')
+        self.assertEqual(linq.lookup((2, 'b'), 'all').to_tuple(), ((2, 'b'),))
+        self.assertIs(linq.get_index((first, second)), linq.get_index('all'))
+        self.assertIsNone(linq.get_index((second, first)))
+    
+    
+    def test_join(self):
+        """Tests whether joins use index correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'), (4, 'w'))
+        calls = []
+        
+        def key(d):
+            calls.append(d)
+            return d[0]
+        
+        other = linque.IndexedLinque(data2).index_by(key)
+        del calls[:]
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.join(other, lambda d: d[0], key, lambda d1, d2: d1[1]+d2[1]).to_tuple(), ('ax', 'ay', 'cz'))
+        self.assertEqual(calls, [])
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.left_join(other, lambda d: d[0], key, lambda d1, d2: d1[1]+(d2 and d2[1] or '-')).to_tuple(), ('ax', 'ay', 'b-', 'cz'))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.group_join(other, lambda d: d[0], key, lambda d, g: len(g)).to_tuple(), (2, 0, 1))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.semi_join(other, lambda d: d[0], key).to_tuple(), ((1, 'a'), (3, 'c')))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.anti_join(other, lambda d: d[0], key).to_tuple(), ((2, 'b'),))
+        
+        self.assertEqual(calls, [])
+    
+    
+    def test_to_lookup(self):
+        """Tests whether to_lookup works correctly."""
+        
+        data = ((1, 'a'), (2, 'b'), (2, 'c'))
+        
+        linq = linque.IndexedLinque(data).index_by(lambda d: d[0], name='id')
+        self.assertEqual(linq.to_lookup('id'), {1: [(1, 'a')], 2: [(2, 'b'), (2, 'c')]})
+        self.assertEqual(linq.to_lookup(lambda d: d[1]), {'a': [(1, 'a')], 'b': [(2, 'b')], 'c': [(2, 'c')]})
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
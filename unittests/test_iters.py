@@ -21,6 +21,25 @@ class TestCase(unittest.TestCase):
         self.assertEqual(linque.aggregate(items, lambda r, n: r+chr(n), ''), 'aggregate')
     
     
+    def test_anti_join(self):
+        """Tests whether anti_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (3, 'y'), (4, 'z'))
+        
+        items1 = data1
+        items2 = data2
+        self.assertEqual(tuple(linque.anti_join(items1, items2, lambda d: d[0])), ((2, 'b'), (2, 'b')))
+        
+        items1 = (d for d in data1)
+        items2 = (d for d in data2)
+        self.assertEqual(tuple(linque.anti_join(items1, items2, lambda d: d[0])), ((2, 'b'), (2, 'b')))
+        
+        items1 = data1
+        items2 = (1, 2)
+        self.assertEqual(tuple(linque.anti_join(items1, items2, lambda d: d[0], lambda d: d)), ((3, 'c'),))
+    
+    
     def test_argmax(self):
         """Tests whether argmax works correctly."""
         
@@ -89,6 +108,42 @@ class TestCase(unittest.TestCase):
         self.assertEqual(linque.argsort(items, lambda d: d[1], reverse=True), [0, 2, 1])
     
     
+    def test_asof_join(self):
+        """Tests whether asof_join works correctly."""
+        
+        data1 = (1, 3, 5, 10, 0)
+        data2 = (2, 4, 6)
+        
+        items1 = data1
+        items2 = data2
+        self.assertEqual(tuple(linque.asof_join(items1, items2)), ((1, None), (3, 2), (5, 4), (10, 6), (0, None)))
+        self.assertEqual(tuple(linque.asof_join(items1, items2, direction='forward')), ((1, 2), (3, 4), (5, 6), (10, None), (0, 2)))
+        self.assertEqual(tuple(linque.asof_join(items1, items2, direction='nearest')), ((1, 2), (3, 2), (5, 4), (10, 6), (0, 2)))
+        self.assertEqual(tuple(linque.asof_join(items1, items2, direction='nearest', tolerance=1)), ((1, 2), (3, 2), (5, 4), (10, None), (0, None)))
+        
+        items1 = (d for d in data1)
+        items2 = (d for d in data2)
+        self.assertEqual(tuple(linque.asof_join(items1, items2)), ((1, None), (3, 2), (5, 4), (10, 6), (0, None)))
+        
+        # test keys
+        data1 = ((1.5, 'a'), (3.0, 'b'))
+        data2 = ((1, 'x'), (3, 'y'))
+        
+        items1 = data1
+        items2 = data2
+        self.assertEqual(tuple(linque.asof_join(items1, items2, lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1])), ('ax', 'by'))
+        
+        # test unsorted
+        items1 = data1
+        items2 = (3, 1, 2)
+        self.assertRaises(ValueError, tuple, linque.asof_join(items1, items2, lambda d: d[0], lambda d: d))
+        
+        # test unknown direction
+        items1 = data1
+        items2 = data2
+        self.assertRaises(ValueError, tuple, linque.asof_join(items1, items2, direction='up'))
+    
+    
     def test_bisect(self):
         """Tests whether binary search works correctly."""
         
@@ -341,6 +396,23 @@ class TestCase(unittest.TestCase):
             linque.first(items, lambda d: d > 10)
     
     
+    def test_full_join(self):
+        """Tests whether full_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'), (4, 'w'))
+        
+        items1 = data1
+        items2 = data2
+        self.assertEqual(tuple(linque.full_join(items1, items2, lambda d: d[0], result=lambda d1, d2: (d1 and d1[1], d2 and d2[1]))), (
+            ('a', 'x'), ('a', 'y'), ('b', None), ('c', 'z'), (None, 'w')))
+        
+        items1 = (d for d in data1)
+        items2 = (d for d in data2)
+        self.assertEqual(tuple(linque.full_join(items1, items2, lambda d: d[0], default=())), (
+            ((1, 'a'), (1, 'x')), ((1, 'a'), (1, 'y')), ((2, 'b'), ()), ((3, 'c'), (3, 'z')), ((), (4, 'w'))))
+    
+    
     def test_group(self):
         """Tests whether group works correctly."""
         
@@ -369,6 +441,23 @@ class TestCase(unittest.TestCase):
             (2, ((0, 2),))))
     
     
+    def test_group_join(self):
+        """Tests whether group_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'), (4, 'w'))
+        
+        items1 = data1
+        items2 = data2
+        self.assertEqual(tuple(linque.group_join(items1, items2, lambda d: d[0])), (
+            ((1, 'a'), ((1, 'x'), (1, 'y'))), ((2, 'b'), ()), ((3, 'c'), ((3, 'z'),))))
+        
+        items1 = (d for d in data1)
+        items2 = (d for d in data2)
+        self.assertEqual(tuple(linque.group_join(items1, items2, lambda d: d[0], result=lambda d, g: (d[1], len(g)))), (
+            ('a', 2), ('b', 0), ('c', 1)))
+    
+    
     def test_index(self):
         """Tests whether index works correctly."""
         
@@ -404,6 +493,37 @@ class TestCase(unittest.TestCase):
         self.assertEqual(tuple(linque.intersect(items1, items2, lambda d: d[1])), ((0, 1), (0, 2)))
     
     
+    def test_join(self):
+        """Tests whether join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'), (4, 'w'))
+        
+        items1 = data1
+        items2 = data2
+        self.assertEqual(tuple(linque.join(items1, items2, lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1])), ('ax', 'ay', 'cz'))
+        
+        items1 = (d for d in data1)
+        items2 = (d for d in data2)
+        self.assertEqual(tuple(linque.join(items1, items2, lambda d: d[0])), (
+            ((1, 'a'), (1, 'x')), ((1, 'a'), (1, 'y')), ((3, 'c'), (3, 'z'))))
+        
+        # test different keys
+        items1 = data1
+        items2 = ('b', 'c', 'c')
+        self.assertEqual(tuple(linque.join(items1, items2, lambda d: d[1], lambda d: d)), (
+            ((2, 'b'), 'b'), ((3, 'c'), 'c'), ((3, 'c'), 'c')))
+        
+        # test composite keys
+        data1 = ((1, 'a', 0), (1, 'b', 1), (2, 'a', 2))
+        data2 = ((1, 'a', 'x'), (2, 'a', 'y'), (2, 'b', 'z'))
+        
+        items1 = data1
+        items2 = data2
+        self.assertEqual(tuple(linque.join(items1, items2, (lambda d: d[0], lambda d: d[1]), result=lambda d1, d2: (d1[2], d2[2]))), (
+            (0, 'x'), (2, 'y')))
+    
+    
     def test_last(self):
         """Tests whether last works correctly."""
         
@@ -436,6 +556,73 @@ class TestCase(unittest.TestCase):
             linque.last(items, lambda d: d > 10)
     
     
+    def test_left_join(self):
+        """Tests whether left_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'), (4, 'w'))
+        
+        items1 = data1
+        items2 = data2
+        self.assertEqual(tuple(linque.left_join(items1, items2, lambda d: d[0], result=lambda d1, d2: (d1[1], d2 and d2[1]))), (
+            ('a', 'x'), ('a', 'y'), ('b', None), ('c', 'z')))
+        
+        items1 = (d for d in data1)
+        items2 = (d for d in data2)
+        self.assertEqual(tuple(linque.left_join(items1, items2, lambda d: d[0], default=(0, '-'))), (
+            ((1, 'a'), (1, 'x')), ((1, 'a'), (1, 'y')), ((2, 'b'), (0, '-')), ((3, 'c'), (3, 'z'))))
+    
+    
+    def test_merge(self):
+        """Tests whether merge works correctly."""
+        
+        data1 = (0, 2, 4, 6)
+        data2 = (1, 2, 3)
+        
+        self.assertEqual(tuple(linque.merge(data1, data2)), (0, 1, 2, 2, 3, 4, 6))
+        self.assertEqual(tuple(linque.merge(reversed(data1), reversed(data2), reverse=True)), (6, 4, 3, 2, 2, 1, 0))
+        
+        # test stability
+        data1 = ((1, 'a'), (2, 'b'))
+        data2 = ((1, 'c'), (2, 'd'))
+        
+        self.assertEqual(tuple(linque.merge(data1, data2, key=lambda d: d[0])), ((1, 'a'), (1, 'c'), (2, 'b'), (2, 'd')))
+        
+        # test columns
+        data = ((1, 2, 'a'), (0, 1, 'b'), (1, 3, 'c'), (0, 1, 'd'), (1, 2, 'e'), (0, 4, 'f'))
+        key = lambda d: (d[0], d[1])
+        
+        items1 = linque.multisort(data[:3], key, (False, True))
+        items2 = linque.multisort(data[3:], key, (False, True))
+        self.assertEqual(tuple(linque.merge(items1, items2, key=key, reverse=(False, True))), tuple(linque.multisort(data, key, (False, True))))
+    
+    
+    def test_merge_join(self):
+        """Tests whether merge_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (2, 'c'), (4, 'd'))
+        data2 = ((0, 'w'), (1, 'x'), (2, 'y'), (2, 'z'), (3, 'q'), (4, 'v'))
+        
+        items1 = data1
+        items2 = data2
+        self.assertEqual(tuple(linque.merge_join(items1, items2, lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1])), (
+            'ax', 'by', 'bz', 'cy', 'cz', 'dv'))
+        
+        items1 = (d for d in data1)
+        items2 = (d for d in data2)
+        self.assertEqual(tuple(linque.merge_join(items1, items2, lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1])), (
+            'ax', 'by', 'bz', 'cy', 'cz', 'dv'))
+        
+        # test unsorted
+        items1 = (1, 3, 2)
+        items2 = (1, 2, 3)
+        self.assertRaises(ValueError, tuple, linque.merge_join(items1, items2))
+        
+        items1 = (1, 2, 3)
+        items2 = (1, 3, 2)
+        self.assertRaises(ValueError, tuple, linque.merge_join(items1, items2))
+    
+    
     def test_multisort(self):
         """Tests whether multisort works correctly."""
         
@@ -600,6 +787,25 @@ class TestCase(unittest.TestCase):
         self.assertEqual(linque.rank(items, lambda d: d[1], method='ordinal'), [1, 2, 4, 3])
     
     
+    def test_semi_join(self):
+        """Tests whether semi_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'))
+        
+        items1 = data1
+        items2 = data2
+        self.assertEqual(tuple(linque.semi_join(items1, items2, lambda d: d[0])), ((1, 'a'), (3, 'c'), (3, 'c')))
+        
+        items1 = (d for d in data1)
+        items2 = (d for d in data2)
+        self.assertEqual(tuple(linque.semi_join(items1, items2, lambda d: d[0])), ((1, 'a'), (3, 'c'), (3, 'c')))
+        
+        items1 = data1
+        items2 = ('b',)
+        self.assertEqual(tuple(linque.semi_join(items1, items2, lambda d: d[1], lambda d: d)), ((2, 'b'),))
+    
+    
     def test_single(self):
         """Tests whether single works correctly."""
         
@@ -2,6 +2,9 @@
 #  Copyright (c) Martin Strohalm. All rights reserved.
 
 import unittest
+import sys
+import subprocess
+import threading
 import linque
 
 
@@ -37,6 +40,19 @@ class TestCase(unittest.TestCase):
         self.assertFalse(linq.all(lambda d: d > 5))
     
     
+    def test_anti_join(self):
+        """Tests whether anti_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (3, 'y'), (4, 'z'))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.anti_join(data2, lambda d: d[0]).to_tuple(), ((2, 'b'), (2, 'b')))
+        
+        linq = linque.Linque(d for d in data1)
+        self.assertEqual(linq.anti_join((d for d in data2), lambda d: d[0]).to_tuple(), ((2, 'b'), (2, 'b')))
+    
+    
     def test_any(self):
         """Tests whether any works correctly."""
         
@@ -121,6 +137,58 @@ class TestCase(unittest.TestCase):
         self.assertEqual(linq.argsort(lambda d: d[1], reverse=True).to_tuple(), (0, 2, 1))
     
     
+    def test_asof_join(self):
+        """Tests whether asof_join works correctly."""
+        
+        data1 = (1, 3, 5, 10, 0)
+        data2 = (2, 4, 6)
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.asof_join(data2).to_tuple(), ((1, None), (3, 2), (5, 4), (10, 6), (0, None)))
+        
+        linq = linque.Linque(d for d in data1)
+        self.assertEqual(linq.asof_join((d for d in data2), direction='forward').to_tuple(), ((1, 2), (3, 4), (5, 6), (10, None), (0, 2)))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.asof_join(data2, direction='nearest', tolerance=1).to_tuple(), ((1, 2), (3, 2), (5, 4), (10, None), (0, None)))
+    
+    
+    def test_cache(self):
+        """Tests whether cache works correctly."""
+        
+        pulled = []
+        
+        def source():
+            for i in range(10):
+                pulled.append(i)
+                yield i
+        
+        linq = linque.Linque(source()).cache()
+        self.assertEqual(linq.take(3).to_list(), [0, 1, 2])
+        self.assertEqual(pulled, [0, 1, 2])
+        
+        self.assertEqual(linq.sum(), 45)
+        self.assertEqual(linq.count(), 10)
+        self.assertEqual(pulled, list(range(10)))
+        
+        # test interleaved
+        linq = linque.Linque(d for d in range(5)).cache()
+        self.assertEqual(linq.zip(linq).to_list(), [(i, i) for i in range(5)])
+        
+        # test limit
+        linq = linque.Linque(d for d in range(10)).cache(memory_limit=3)
+        self.assertEqual(linq.take(3).to_list(), [0, 1, 2])
+        
+        with self.assertRaises(MemoryError):
+            linq.to_list()
+        
+        # test spill
+        linq = linque.Linque(d for d in range(100)).cache(memory_limit=10, spill=True)
+        self.assertEqual(linq.take(50).to_list(), list(range(50)))
+        self.assertEqual(linq.zip(linq.skip(1)).count(), 99)
+        self.assertEqual(linq.to_list(), list(range(100)))
+    
+    
     def test_choice(self):
         """Tests whether choice works correctly."""
         
@@ -346,6 +414,10 @@ class TestCase(unittest.TestCase):
         
         linq = linque.Linque(d for d in data)
         self.assertEqual(linq.distinct(lambda d: d[1]).to_tuple(), ((0, 1), (0, 2)))
+        
+        # test memory limit
+        linq = linque.Linque(d for d in data)
+        self.assertEqual(linq.distinct(memory_limit=1).to_tuple(), ((0, 1), (0, 2), (1, 1), (1, 2)))
     
     
     def test_each(self):
@@ -390,6 +462,90 @@ class TestCase(unittest.TestCase):
         self.assertEqual(linq.take(4).to_tuple(), (0, 1, 2, 3))
     
     
+    def test_evaluate_flag(self):
+        """Tests whether evaluate flag works correctly."""
+        
+        calls = []
+        
+        def square(x):
+            calls.append(x)
+            return x * x
+        
+        data = (0, 1, 2, 3, 4, 5, 6, 7, 8, 9)
+        
+        # test linear chain
+        linq = linque.Linque((d for d in data), True)
+        step1 = linq.select(square)
+        step2 = step1.where(lambda d: d % 2)
+        result = step2.select(lambda d: d + 1)
+        memos = (step1._source, step2._source)
+        del step1, step2
+        
+        self.assertEqual(result.to_list(), [2, 10, 26, 50, 82])
+        self.assertEqual(len(calls), 10)
+        self.assertEqual([len(d) for d in memos], [0, 0])
+        self.assertEqual(len(linq._source), 10)
+        self.assertEqual(len(result._source), 5)
+        
+        # test reuse
+        self.assertEqual(result.sum(), 170)
+        self.assertEqual(result.count(), 5)
+        self.assertEqual(list(result), list(result))
+        self.assertEqual(len(calls), 10)
+        
+        # test inline chain
+        other = linque.Linque((d for d in data), True).select(square).where(lambda d: d % 2)
+        self.assertEqual(other.count(), 5)
+        self.assertEqual(other.to_list(), [1, 9, 25, 49, 81])
+        self.assertEqual(len(calls), 20)
+        
+        # test fork point
+        del calls[:]
+        
+        fork = linque.Linque((d for d in data), True).select(square)
+        odd = fork.where(lambda d: d % 2)
+        even = fork.where(lambda d: not d % 2)
+        self.assertEqual(odd.to_list(), [1, 9, 25, 49, 81])
+        self.assertEqual(even.to_list(), [0, 4, 16, 36, 64])
+        self.assertEqual(fork.take(2).to_list(), [0, 1])
+        self.assertEqual(len(calls), 10)
+        
+        # test interleaved
+        linq = linque.Linque((d for d in data), True).select(lambda d: d * 2)
+        self.assertEqual(linq.zip(linq.skip(1)).to_list()[:2], [(0, 2), (2, 4)])
+        
+        linq = linque.Linque((d for d in data), True).select(lambda d: d * 2)
+        result = linq.zip(linq.skip(1))
+        memo = linq._source
+        del linq
+        
+        items = iter(result)
+        self.assertEqual([next(items) for i in range(3)], [(0, 2), (2, 4), (4, 6)])
+        self.assertEqual(len(memo), 1)
+        self.assertEqual(len(list(items)), 6)
+        self.assertEqual(result.count(), 9)
+        
+        # test random
+        linq = linque.Linque(range(20), True).shuffle()
+        self.assertEqual(linq.to_list(), linq.to_list())
+        
+        # test single-pass argument
+        linq = linque.Linque(data[:5], True).concat(d for d in (5, 6, 7))
+        self.assertEqual(linq.to_list(), [0, 1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(linq.to_list(), [0, 1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(linq.count(), 8)
+        
+        linq = linque.Linque(data[:3], True).join(d for d in (1, 2, 3))
+        self.assertEqual(linq.to_list(), [(1, 1), (2, 2)])
+        self.assertEqual(linq.to_list(), [(1, 1), (2, 2)])
+        
+        # test reusable source
+        linq = linque.Linque(list(data), True)
+        self.assertIs(linq._source.__class__, list)
+        self.assertEqual(linq.sum(), 45)
+        self.assertEqual(linq.sum(), 45)
+    
+    
     def test_exclude(self):
         """Tests whether exclude works correctly."""
         
@@ -411,6 +567,11 @@ class TestCase(unittest.TestCase):
         linq = linque.Linque(d for d in data1)
         items2 = (d for d in data2)
         self.assertEqual(linq.exclude(items2, lambda d: d[1]).to_tuple(), ((0, 4),))
+        
+        # test memory limit
+        linq = linque.Linque(d for d in data1)
+        items2 = (d for d in data2)
+        self.assertEqual(linq.exclude(items2, memory_limit=1).to_tuple(), ((0, 2), (0, 3), (0, 4)))
     
     
     def test_first(self):
@@ -457,6 +618,63 @@ class TestCase(unittest.TestCase):
         self.assertEqual(linq.flatten(lambda d: d).to_tuple(), (0, 0, 1, 10, 2, 20, 3, 30, 4, 40))
     
     
+    def test_fork(self):
+        """Tests whether fork works correctly."""
+        
+        pulled = []
+        
+        def source(count):
+            for i in range(count):
+                pulled.append(i)
+                yield i
+        
+        linq = linque.Linque(source(1000))
+        result = linq.fork(
+            lambda d: d.count(),
+            lambda d: d.sum(),
+            lambda d: d.where(lambda x: x % 2).take(3),
+            lambda d: d.group(lambda x: x % 3).select(lambda g: (g[0], g[1].count())).to_list(),
+            chunk_size=7)
+        
+        self.assertEqual(result, (1000, 499500, [1, 3, 5], [(0, 334), (1, 333), (2, 333)]))
+        self.assertEqual(pulled, list(range(1000)))
+        
+        # test early stop
+        del pulled[:]
+        
+        linq = linque.Linque(source(1000))
+        result = linq.fork(lambda d: d.first(), lambda d: d.take(5).to_tuple(), chunk_size=10, buffer_size=2)
+        self.assertEqual(result, (0, (0, 1, 2, 3, 4)))
+        self.assertLess(len(pulled), 100)
+        
+        # test errors
+        linq = linque.Linque(source(100))
+        with self.assertRaises(ZeroDivisionError):
+            linq.fork(lambda d: d.count(), lambda d: d.select(lambda x: 1 / x).to_list())
+        
+        def failing():
+            yield 1
+            raise KeyError()
+        
+        with self.assertRaises(KeyError):
+            linque.Linque(failing()).fork(lambda d: d.count(), lambda d: d.take(5).to_list())
+    
+    
+    def test_full_join(self):
+        """Tests whether full_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'), (4, 'w'))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.full_join(data2, lambda d: d[0], result=lambda d1, d2: (d1 and d1[1], d2 and d2[1])).to_tuple(), (
+            ('a', 'x'), ('a', 'y'), ('b', None), ('c', 'z'), (None, 'w')))
+        
+        linq = linque.Linque(d for d in data1)
+        self.assertEqual(linq.full_join((d for d in data2), lambda d: d[0], result=lambda d1, d2: (d1 and d1[1], d2 and d2[1])).to_tuple(), (
+            ('a', 'x'), ('a', 'y'), ('b', None), ('c', 'z'), (None, 'w')))
+    
+    
     def test_group(self):
         """Tests whether group works correctly."""
         
@@ -483,6 +701,52 @@ class TestCase(unittest.TestCase):
         self.assertEqual(linq.group(lambda d: d[1]).to_dict(lambda d: d[0], lambda d: d[1].to_tuple()), {
             1: ((0, 1), (0, 1), (1, 1)),
             2: ((0, 2),)})
+        
+        # test memory limit
+        linq = linque.Linque(d for d in data)
+        self.assertEqual(linq.group(lambda d: d[1], memory_limit=1).select(lambda d: (d[0], d[1].to_tuple())).to_tuple(), (
+            (1, ((0, 1), (0, 1), (1, 1))),
+            (2, ((0, 2),))))
+    
+    
+    def test_group_join(self):
+        """Tests whether group_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'), (4, 'w'))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.group_join(data2, lambda d: d[0], result=lambda d, g: (d[1], len(g))).to_tuple(), (
+            ('a', 2), ('b', 0), ('c', 1)))
+        
+        linq = linque.Linque(d for d in data1)
+        self.assertEqual(linq.group_join((d for d in data2), lambda d: d[0], result=lambda d, g: (d[1], len(g))).to_tuple(), (
+            ('a', 2), ('b', 0), ('c', 1)))
+    
+    
+    def test_imports(self):
+        """Tests whether optional classes are imported on first use."""
+        
+        code = "import sys, linque; print(' '.join(m for m in ('linque.sqlite', 'linque.array', 'linque.parallel') if m in sys.modules))"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), '')
+        
+        from linque.sqlite import SqliteLinque
+        self.assertIs(linque.SqliteLinque, SqliteLinque)
+        self.assertIn('ParallelLinque', dir(linque))
+        self.assertRaises(AttributeError, getattr, linque, 'Unknown')
+    
+    
+    def test_index_by(self):
+        """Tests whether index_by works correctly."""
+        
+        data = ((1, 'a'), (2, 'b'), (2, 'c'))
+        
+        linq = linque.Linque(data)
+        self.assertEqual(linq.index_by(lambda d: d[0], name='id').lookup(2, 'id').to_tuple(), ((2, 'b'), (2, 'c')))
+        
+        linq = linque.Linque(d for d in data)
+        self.assertEqual(linq.index_by(lambda d: d[0], name='id').lookup(2, 'id').to_tuple(), ((2, 'b'), (2, 'c')))
     
     
     def test_intersect(self):
@@ -506,6 +770,35 @@ class TestCase(unittest.TestCase):
         linq = linque.Linque(d for d in data1)
         items2 = (d for d in data2)
         self.assertEqual(linq.intersect(items2, lambda d: d[1]).to_tuple(), ((0, 1), (0, 2)))
+        
+        # test memory limit
+        linq = linque.Linque(d for d in data1)
+        items2 = (d for d in data2)
+        self.assertEqual(linq.intersect(items2, memory_limit=1).to_tuple(), ((0, 1), (1, 2)))
+    
+    
+    def test_join(self):
+        """Tests whether join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'), (4, 'w'))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.join(data2, lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1]).to_tuple(), ('ax', 'ay', 'cz'))
+        
+        linq = linque.Linque(d for d in data1)
+        self.assertEqual(linq.join((d for d in data2), lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1]).to_tuple(), ('ax', 'ay', 'cz'))
+        
+        # test smaller build side
+        linq = linque.Linque(data2)
+        self.assertEqual(linq.join(data1, lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1]).to_tuple(), ('xa', 'ya', 'zc'))
+        
+        linq = linque.Linque(((3, 'c'), (1, 'a')))
+        self.assertEqual(linq.join(data2, lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1]).to_tuple(), ('cz', 'ax', 'ay'))
+        
+        # test memory limit
+        linq = linque.Linque(d for d in data1)
+        self.assertEqual(linq.join((d for d in data2), lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1], memory_limit=1).to_tuple(), ('ax', 'ay', 'cz'))
     
     
     def test_last(self):
@@ -540,6 +833,21 @@ class TestCase(unittest.TestCase):
             linq.last(lambda d: d > 10)
     
     
+    def test_left_join(self):
+        """Tests whether left_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'), (4, 'w'))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.left_join(data2, lambda d: d[0], result=lambda d1, d2: (d1[1], d2 and d2[1])).to_tuple(), (
+            ('a', 'x'), ('a', 'y'), ('b', None), ('c', 'z')))
+        
+        linq = linque.Linque(d for d in data1)
+        self.assertEqual(linq.left_join((d for d in data2), lambda d: d[0], result=lambda d1, d2: (d1[1], d2 and d2[1])).to_tuple(), (
+            ('a', 'x'), ('a', 'y'), ('b', None), ('c', 'z')))
+    
+    
     def test_max(self):
         """Tests whether max works correctly."""
         
@@ -618,6 +926,24 @@ class TestCase(unittest.TestCase):
         self.assertEqual(linq.median(lambda d: d[1]), 20)
     
     
+    def test_merge_join(self):
+        """Tests whether merge_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (2, 'c'), (4, 'd'))
+        data2 = ((0, 'w'), (1, 'x'), (2, 'y'), (2, 'z'), (3, 'q'), (4, 'v'))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.merge_join(data2, lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1]).to_tuple(), (
+            'ax', 'by', 'bz', 'cy', 'cz', 'dv'))
+        
+        linq = linque.Linque(d for d in data1)
+        self.assertEqual(linq.merge_join((d for d in data2), lambda d: d[0], result=lambda d1, d2: d1[1]+d2[1]).to_tuple(), (
+            'ax', 'by', 'bz', 'cy', 'cz', 'dv'))
+        
+        linq = linque.Linque((2, 1))
+        self.assertRaises(ValueError, linq.merge_join((1, 2)).to_tuple)
+    
+    
     def test_min(self):
         """Tests whether min works correctly."""
         
@@ -677,6 +1003,65 @@ class TestCase(unittest.TestCase):
             linq.permutations().select(lambda d: d.to_list()).to_list(), model)
     
     
+    def test_prefetch(self):
+        """Tests whether prefetch works correctly."""
+        
+        data = (0, 1, 2, 3, 4, 5, 6, 7, 8, 9)
+        
+        linq = linque.Linque(data)
+        self.assertEqual(linq.prefetch(3).to_tuple(), data)
+        
+        linq = linque.Linque(d for d in data)
+        self.assertEqual(linq.prefetch(3, 'process').to_tuple(), data)
+        
+        # test early stop
+        closed = []
+        
+        def source():
+            try:
+                for i in range(1000000):
+                    yield i
+            finally:
+                closed.append(True)
+        
+        linq = linque.Linque(source())
+        self.assertEqual(linq.prefetch(3).take(4).to_tuple(), (0, 1, 2, 3))
+        self.assertEqual(closed, [True])
+        
+        linq = linque.Linque(source())
+        self.assertEqual(linq.prefetch(3, 'process').first(lambda d: d > 4), 5)
+        
+        # test error
+        def source():
+            yield 1
+            raise KeyError()
+        
+        linq = linque.Linque(source())
+        self.assertRaises(KeyError, linq.prefetch(3).to_tuple)
+        
+        linq = linque.Linque(source())
+        self.assertRaises(KeyError, linq.prefetch(3, 'process').to_tuple)
+        
+        # test unpicklable error
+        class LockError(Exception):
+            def __init__(self):
+                super().__init__()
+                self.lock = threading.Lock()
+        
+        def source():
+            yield 1
+            raise LockError()
+        
+        linq = linque.Linque(source())
+        self.assertRaises(LockError, linq.prefetch(3).to_tuple)
+        
+        linq = linque.Linque(source())
+        self.assertRaises(RuntimeError, linq.prefetch(3, 'process').to_tuple)
+        
+        linq = linque.Linque(data)
+        self.assertRaises(ValueError, linq.prefetch(3, 'unknown').to_tuple)
+    
+    
     def test_rank(self):
         """Tests whether rank works correctly."""
         
@@ -764,6 +1149,23 @@ class TestCase(unittest.TestCase):
         
         linq = linque.Linque(d for d in data)
         self.assertEqual(linq.select(lambda d: d[1]).to_tuple(), (0, 10, 20, 30, 40))
+        
+        # test threads
+        linq = linque.Linque(data)
+        self.assertEqual(linq.select(lambda d: d[1], threads=3).to_tuple(), (0, 10, 20, 30, 40))
+        
+        linq = linque.Linque(d for d in data)
+        self.assertEqual(sorted(linq.select(lambda d: d[1], threads=3, ordered=False)), [0, 10, 20, 30, 40])
+        
+        # test bounded calls
+        calls = []
+        linq = linque.Linque(range(100))
+        self.assertEqual(linq.select(lambda d: calls.append(d) or d, threads=2, max_in_flight=3).take(2).to_tuple(), (0, 1))
+        self.assertLessEqual(len(calls), 5)
+        
+        # test error
+        linq = linque.Linque(data)
+        self.assertRaises(ZeroDivisionError, linq.select(lambda d: 1 / d[0], threads=2).to_tuple)
     
     
     def test_select_many(self):
@@ -778,6 +1180,19 @@ class TestCase(unittest.TestCase):
         self.assertEqual(linq.select_many(lambda d: d).to_tuple(), (0, 0, 1, 10, 2, 20, 3, 30, 4, 40))
     
     
+    def test_semi_join(self):
+        """Tests whether semi_join works correctly."""
+        
+        data1 = ((1, 'a'), (2, 'b'), (3, 'c'), (3, 'c'))
+        data2 = ((1, 'x'), (1, 'y'), (3, 'z'))
+        
+        linq = linque.Linque(data1)
+        self.assertEqual(linq.semi_join(data2, lambda d: d[0]).to_tuple(), ((1, 'a'), (3, 'c'), (3, 'c')))
+        
+        linq = linque.Linque(d for d in data1)
+        self.assertEqual(linq.semi_join((d for d in data2), lambda d: d[0]).to_tuple(), ((1, 'a'), (3, 'c'), (3, 'c')))
+    
+    
     def test_shuffle(self):
         """Tests whether shuffle works correctly."""
         
@@ -913,6 +1328,13 @@ class TestCase(unittest.TestCase):
         
         linq = linque.Linque(d for d in data)
         self.assertEqual(linq.sort(lambda d: (d[1], d[2]), reverse=[False, True]).to_tuple(), model)
+        
+        # test memory limit
+        linq = linque.Linque(data)
+        self.assertEqual(linq.sort(lambda d: (d[1], d[2]), reverse=[False, True], memory_limit=2).to_tuple(), model)
+        
+        linq = linque.Linque(d for d in data)
+        self.assertEqual(linq.sort(lambda d: (d[1], d[2]), reverse=[False, True], memory_limit=2).take(2).to_tuple(), model[:2])
     
     
     def test_sum(self):
@@ -1011,6 +1433,23 @@ class TestCase(unittest.TestCase):
         self.assertEqual(linq.to_list(), list(data))
     
     
+    def test_to_lookup(self):
+        """Tests whether to_lookup works correctly."""
+        
+        data = ((1, 'a'), (2, 'b'), (2, 'c'))
+        
+        linq = linque.Linque(data)
+        self.assertEqual(linq.to_lookup(lambda d: d[0]), {1: [(1, 'a')], 2: [(2, 'b'), (2, 'c')]})
+        
+        linq = linque.Linque(d for d in data)
+        self.assertEqual(linq.to_lookup(lambda d: d[0]), {1: [(1, 'a')], 2: [(2, 'b'), (2, 'c')]})
+        
+        linq = linque.Linque(data)
+        self.assertEqual(linq.to_lookup((lambda d: d[0], lambda d: d[1] > 'a')), {
+            (1, False): [(1, 'a')],
+            (2, True): [(2, 'b'), (2, 'c')]})
+    
+    
     def test_to_set(self):
         """Tests whether to_set works correctly."""
         
@@ -0,0 +1,171 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import unittest
+import linque
+
+
+def square(x):
+    return x * x
+
+
+def is_odd(x):
+    return x % 2 == 1
+
+
+def modulo(x):
+    return x % 7
+
+
+def columns(x):
+    return x[0], x[1]
+
+
+class TestCase(unittest.TestCase):
+    """Test case for ParallelLinque class."""
+    
+    
+    def test_count(self):
+        """Tests whether parallel count works correctly."""
+        
+        data = list(range(100))
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=7)
+        self.assertEqual(linq.count(), 100)
+        self.assertEqual(linq.select(square).count(is_odd), 50)
+    
+    
+    def test_distinct(self):
+        """Tests whether parallel distinct works correctly."""
+        
+        data = [(i * 37) % 23 for i in range(100)]
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=7)
+        self.assertEqual(linq.distinct().to_list(), linque.Linque(data).distinct().to_list())
+        
+        linq = linque.Linque(d for d in data).parallel(workers=2, chunk_size=7)
+        self.assertEqual(linq.distinct(modulo).to_list(), linque.Linque(data).distinct(modulo).to_list())
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=7)
+        self.assertEqual(linq.distinct(memory_limit=5).to_list(), linque.Linque(data).distinct().to_list())
+    
+    
+    def test_evaluate(self):
+        """Tests whether parallel evaluate works correctly."""
+        
+        data = list(range(10))
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=3).select(square)
+        result = linq.evaluate()
+        self.assertEqual(result.to_list(), [d*d for d in data])
+        self.assertEqual(result.to_list(), [d*d for d in data])
+        
+        with linq.evaluate(storage='disk') as stored:
+            self.assertEqual(stored.to_list(), [d*d for d in data])
+    
+    
+    def test_group(self):
+        """Tests whether parallel group works correctly."""
+        
+        data = [(i * 37) % 23 for i in range(100)]
+        expected = [(k, g.to_list()) for k, g in linque.Linque(data).group(modulo)]
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=7)
+        self.assertEqual([(k, g.to_list()) for k, g in linq.group(modulo)], expected)
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=7, ordered=False)
+        self.assertEqual([(k, g.to_list()) for k, g in linq.group(modulo)], expected)
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=7)
+        self.assertEqual([(k, g.to_list()) for k, g in linq.group(modulo, memory_limit=10)], expected)
+    
+    
+    def test_ordered(self):
+        """Tests whether ordered parallel stages work correctly."""
+        
+        data = list(range(100))
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=7)
+        self.assertEqual(linq.where(is_odd).select(square).to_list(), [d*d for d in data if d % 2])
+        
+        linq = linque.Linque(d for d in data).parallel(workers=2, chunk_size=7)
+        self.assertEqual(linq.select(square).where(is_odd).sum(), sum(d*d for d in data if d % 2))
+    
+    
+    def test_unordered(self):
+        """Tests whether unordered parallel stages work correctly."""
+        
+        data = list(range(100))
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=7, ordered=False)
+        self.assertEqual(sorted(linq.select(square).to_list()), [d*d for d in data])
+    
+    
+    def test_early_stop(self):
+        """Tests whether parallel stages can be stopped early."""
+        
+        data = list(range(1000))
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=10)
+        self.assertEqual(linq.select(square).take(3).to_list(), [0, 1, 4])
+        self.assertEqual(linq.select(square).first(lambda d: d > 50), 64)
+    
+    
+    def test_sort(self):
+        """Tests whether parallel sort works correctly."""
+        
+        data = [((i * 37) % 5, (i * 11) % 7, i) for i in range(100)]
+        
+        linq = linque.Linque(data)
+        self.assertEqual(linq.sort(columns, parallel=3).to_list(), sorted(data, key=columns))
+        
+        linq = linque.Linque(d for d in data)
+        self.assertEqual(linq.sort(columns, True, parallel=3).to_list(), sorted(data, key=columns, reverse=True))
+        
+        linq = linque.Linque(data)
+        self.assertEqual(linq.sort(columns, (True, False), parallel=3).to_list(), linque.multisort(data, columns, (True, False)))
+        
+        linq = linque.Linque(data)
+        self.assertRaises(TypeError, linq.sort(lambda d: d[0], parallel=3).to_list)
+    
+    
+    def test_sum(self):
+        """Tests whether parallel sum works correctly."""
+        
+        data = list(range(100))
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=7)
+        self.assertEqual(linq.sum(), sum(data))
+        self.assertEqual(linq.where(is_odd).sum(square), sum(d*d for d in data if d % 2))
+    
+    
+    def test_sequential(self):
+        """Tests whether sequential stages work correctly."""
+        
+        data = list(range(10))
+        
+        linq = linque.Linque(data).parallel(workers=2, chunk_size=3)
+        self.assertEqual(linq.select(square).sequential().select(lambda d: -d).to_list(), [-d*d for d in data])
+    
+    
+    def test_unpicklable(self):
+        """Tests whether unpicklable stages are handled correctly."""
+        
+        data = list(range(10))
+        
+        linq = linque.Linque(data).parallel(workers=2)
+        self.assertRaises(TypeError, linq.select(lambda d: d+1).to_list)
+        
+        linq = linque.Linque(data).parallel(workers=2)
+        self.assertRaises(TypeError, linq.count, lambda d: d > 1)
+        
+        linq = linque.Linque(data).parallel(workers=2, fallback=True)
+        self.assertEqual(linq.select(lambda d: d+1).to_list(), [d+1 for d in data])
+        
+        linq = linque.Linque(data).parallel(workers=2, fallback=True)
+        self.assertEqual(linq.group(lambda d: d % 2).select(lambda d: d[0]).to_list(), [0, 1])
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
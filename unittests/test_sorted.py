@@ -0,0 +1,126 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import unittest
+import linque
+
+
+class TestCase(unittest.TestCase):
+    """Test case for SortedLinque class."""
+    
+    
+    def test_add(self):
+        """Tests whether add keeps items sorted."""
+        
+        data = (5, 3, 8, 1, 9, 2, 7, 3, 0, 6)
+        
+        linq = linque.SortedLinque(load=2)
+        for d in data:
+            linq.add(d)
+        
+        self.assertEqual(linq.to_tuple(), (0, 1, 2, 3, 3, 5, 6, 7, 8, 9))
+        self.assertEqual(len(linq), 10)
+        self.assertEqual(linq[4], 3)
+        self.assertEqual(linq[-1], 9)
+        self.assertRaises(IndexError, linq.__getitem__, 10)
+        
+        linq = linque.SortedLinque(d for d in data).update((4, 4))
+        self.assertEqual(linq.to_tuple(), (0, 1, 2, 3, 3, 4, 4, 5, 6, 7, 8, 9))
+        
+        # test stability
+        data = ((1, 'a'), (0, 'b'), (1, 'c'))
+        
+        linq = linque.SortedLinque(data, key=lambda d: d[0], load=1)
+        linq.add((1, 'd'))
+        linq.add((0, 'e'))
+        self.assertEqual(linq.select(lambda d: d[1]).to_tuple(), ('b', 'e', 'a', 'c', 'd'))
+    
+    
+    def test_between(self):
+        """Tests whether between works correctly."""
+        
+        data = (5, 3, 8, 1, 9, 2, 7, 3, 0, 6)
+        
+        linq = linque.SortedLinque(data, load=2)
+        self.assertEqual(linq.between(3, 7).to_tuple(), (3, 3, 5, 6, 7))
+        self.assertEqual(linq.between(3, 7, (False, False)).to_tuple(), (5, 6))
+        self.assertEqual(linq.between(hi=2).to_tuple(), (0, 1, 2))
+        self.assertEqual(linq.between(lo=8).to_tuple(), (8, 9))
+        self.assertEqual(linq.between(7, 3).to_tuple(), ())
+        
+        self.assertEqual(linq.count_between(3, 7), 5)
+        self.assertEqual(linq.count_between(3, 7, (False, True)), 3)
+        self.assertEqual(linq.count_between(7, 3), 0)
+    
+    
+    def test_floor_ceiling(self):
+        """Tests whether floor and ceiling work correctly."""
+        
+        data = ((1, 'a'), (3, 'b'), (5, 'c'))
+        
+        linq = linque.SortedLinque(data, key=lambda d: d[0])
+        self.assertEqual(linq.floor(4), (3, 'b'))
+        self.assertEqual(linq.floor(3), (3, 'b'))
+        self.assertEqual(linq.floor(0, None), None)
+        self.assertRaises(KeyError, linq.floor, 0)
+        
+        self.assertEqual(linq.ceiling(4), (5, 'c'))
+        self.assertEqual(linq.ceiling(3), (3, 'b'))
+        self.assertEqual(linq.ceiling(6, None), None)
+        self.assertRaises(KeyError, linq.ceiling, 6)
+    
+    
+    def test_rank_of(self):
+        """Tests whether rank_of works correctly."""
+        
+        data = (5, 3, 8, 1, 9, 2, 7, 3, 0, 6)
+        
+        linq = linque.SortedLinque(data, load=2)
+        self.assertEqual(linq.rank_of(-1), 0)
+        self.assertEqual(linq.rank_of(3), 3)
+        self.assertEqual(linq.rank_of(3.5), 5)
+        self.assertEqual(linq.rank_of(10), 10)
+    
+    
+    def test_remove(self):
+        """Tests whether removing works correctly."""
+        
+        data = (5, 3, 8, 1, 9, 2, 7, 3, 0, 6)
+        
+        linq = linque.SortedLinque(data, load=2)
+        linq.remove(3)
+        linq.discard(8)
+        linq.discard(10)
+        self.assertEqual(linq.to_tuple(), (0, 1, 2, 3, 5, 6, 7, 9))
+        self.assertRaises(ValueError, linq.remove, 10)
+        
+        self.assertEqual(linq.pop(), 9)
+        self.assertEqual(linq.pop(0), 0)
+        self.assertEqual(linq.to_tuple(), (1, 2, 3, 5, 6, 7))
+        
+        self.assertTrue(5 in linq)
+        self.assertFalse(8 in linq)
+    
+    
+    def test_indexing(self):
+        """Tests whether indexing works correctly while items are changed."""
+        
+        data = [(i * 37) % 101 for i in range(60)]
+        model = []
+        
+        linq = linque.SortedLinque(load=2)
+        for i, item in enumerate(data):
+            linq.add(item)
+            model = sorted(model + [item])
+            
+            if i % 3 == 2:
+                self.assertEqual(linq.pop(i % len(model)), model.pop(i % len(model)))
+            
+            self.assertEqual(len(linq), len(model))
+            self.assertEqual([linq[j] for j in range(len(model))], model)
+            self.assertEqual(linq.rank_of(50), len([d for d in model if d < 50]))
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
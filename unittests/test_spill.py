@@ -0,0 +1,155 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import os.path
+import unittest
+import linque
+from linque import spill
+
+
+class TestCase(unittest.TestCase):
+    """Test case for spilling utilities."""
+    
+    
+    def test_spill(self):
+        """Tests whether spill works correctly."""
+        
+        data = [(i, str(i)) for i in range(25)]
+        
+        items = spill.Spill(block_size=4)
+        items.extend(data)
+        
+        self.assertEqual(len(items), 25)
+        self.assertEqual(list(items), data)
+        self.assertEqual(list(items), data)
+        
+        path = items._path
+        self.assertTrue(os.path.exists(path))
+        
+        items.close()
+        self.assertFalse(os.path.exists(path))
+    
+    
+    def test_external_sort(self):
+        """Tests whether external sort works correctly."""
+        
+        data = [((i * 37) % 5, (i * 11) % 7, i) for i in range(100)]
+        key = lambda d: (d[0], d[1])
+        
+        items = data
+        self.assertEqual(list(spill.external_sort(items, key, memory_limit=7)), linque.multisort(data, key))
+        self.assertEqual(list(spill.external_sort(items, key, True, memory_limit=7)), linque.multisort(data, key, True))
+        self.assertEqual(list(spill.external_sort(items, key, (True, False), memory_limit=7)), linque.multisort(data, key, (True, False)))
+        
+        items = (d for d in data)
+        self.assertEqual(list(spill.external_sort(items, key, memory_limit=1000)), linque.multisort(data, key))
+        
+        # test early stop
+        items = (d for d in data)
+        result = spill.external_sort(items, key, memory_limit=10)
+        self.assertEqual(next(result), (0, 0, 0))
+        result.close()
+    
+    
+    def test_distinct(self):
+        """Tests whether spilled distinct works correctly."""
+        
+        data = [(i * 37) % 23 for i in range(100)]
+        model = list(linque.distinct(data))
+        
+        self.assertEqual(list(spill.distinct(data, memory_limit=5, partitions=3)), model)
+        self.assertEqual(list(spill.distinct(data, memory_limit=1000)), model)
+        self.assertEqual(list(spill.distinct(data, lambda d: d % 4, memory_limit=2)), [0, 14, 5, 19])
+        
+        # test no spill within limit
+        created = []
+        original = spill.Spill
+        spill.Spill = lambda *args: created.append(args) or original(*args)
+        try:
+            self.assertEqual(list(spill.distinct(data, memory_limit=23)), model)
+        finally:
+            spill.Spill = original
+        
+        self.assertEqual(created, [])
+    
+    
+    def test_group(self):
+        """Tests whether spilled group works correctly."""
+        
+        data = [(i * 37) % 23 for i in range(100)]
+        key = lambda d: d % 7
+        model = list(linque.group(data, key))
+        
+        self.assertEqual(list(spill.group(data, key, memory_limit=10, partitions=3)), model)
+        self.assertEqual(list(spill.group((d for d in data), key, memory_limit=1000)), model)
+    
+    
+    def test_repartition(self):
+        """Tests whether oversized partitions are split recursively."""
+        
+        data = list(range(40))
+        
+        groups = [(d,) for d in spill._partition(data, None, 4)]
+        groups = [len(g[0]) for g in spill._split(groups, 3, 4)]
+        self.assertEqual(sum(groups), 40)
+        self.assertTrue(max(groups) <= 3)
+        
+        groups = [(d,) for d in spill._partition([1] * 10, None, 2)]
+        groups = [len(g[0]) for g in spill._split(groups, 3, 2)]
+        self.assertEqual(sorted(groups), [0, 0, 10])
+        
+        items = [(i % 13, i) for i in range(50)]
+        model = list(linque.join(data, items, None, lambda d: d[0]))
+        self.assertEqual(list(spill.join(data, items, None, lambda d: d[0], memory_limit=3, partitions=2)), model)
+    
+    
+    def test_set_operations(self):
+        """Tests whether spilled exclude and intersect work correctly."""
+        
+        data = [(i * 37) % 23 for i in range(100)]
+        items = list(range(0, 30, 3))
+        
+        model = list(linque.exclude(data, items))
+        self.assertEqual(list(spill.exclude(data, items, memory_limit=3, partitions=4)), model)
+        self.assertEqual(list(spill.exclude(data, items, memory_limit=1000)), model)
+        
+        model = list(linque.intersect(data, items))
+        self.assertEqual(list(spill.intersect(data, items, memory_limit=3, partitions=4)), model)
+        self.assertEqual(list(spill.intersect(data, items, memory_limit=1000)), model)
+    
+    
+    def test_joins(self):
+        """Tests whether spilled joins work correctly."""
+        
+        data = [(i, (i * 37) % 23) for i in range(60)]
+        items = [((i * 7) % 31, chr(65 + i % 26)) for i in range(40)]
+        key = lambda d: d[1]
+        items_key = lambda d: d[0]
+        
+        model = list(linque.join(data, items, key, items_key))
+        self.assertEqual(list(spill.join(data, items, key, items_key, memory_limit=5, partitions=3)), model)
+        
+        model = list(linque.left_join(data, items, key, items_key, default='-'))
+        self.assertEqual(list(spill.left_join(data, items, key, items_key, default='-', memory_limit=5, partitions=3)), model)
+        
+        model = list(linque.full_join(data, items, key, items_key))
+        self.assertEqual(list(spill.full_join(data, items, key, items_key, memory_limit=5, partitions=3)), model)
+        
+        model = list(linque.group_join(data, items, key, items_key))
+        self.assertEqual(list(spill.group_join(data, items, key, items_key, memory_limit=5, partitions=3)), model)
+        
+        model = list(linque.semi_join(data, items, key, items_key))
+        self.assertEqual(list(spill.semi_join(data, items, key, items_key, memory_limit=5, partitions=3)), model)
+        
+        model = list(linque.anti_join(data, items, key, items_key))
+        self.assertEqual(list(spill.anti_join(data, items, key, items_key, memory_limit=5, partitions=3)), model)
+        
+        # test order of unequal sizes
+        for sequence, others in ((data[:5], items), (data, items[:5])):
+            model = linque.Linque(sequence).join(others, key, items_key).to_list()
+            self.assertEqual(linque.Linque(sequence).join(others, key, items_key, memory_limit=3).to_list(), model)
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
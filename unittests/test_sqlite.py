@@ -0,0 +1,221 @@
+#  Created byMartin.cz
+#  Copyright (c) Martin Strohalm. All rights reserved.
+
+import sqlite3
+import unittest
+import linque
+from linque import col
+
+
+DATA = (
+    (1, 'pen', 'office', 2.5, 10),
+    (2, 'ink', 'office', 7.0, 3),
+    (3, 'cup', 'kitchen', 4.0, 6),
+    (4, 'pad', 'office', 1.5, 20),
+    (5, 'pot', 'kitchen', 12.0, 1),
+    (6, 'mug', 'kitchen', 4.0, None))
+
+
+class TestCase(unittest.TestCase):
+    """Test case for linque.SqliteLinque."""
+    
+    
+    def setUp(self):
+        """Creates testing database."""
+        
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.execute("CREATE TABLE items (id INTEGER, name TEXT, category TEXT, price REAL, qty INTEGER)")
+        self.connection.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?)", DATA)
+        
+        self.rows = [dict(zip(('id', 'name', 'category', 'price', 'qty'), d)) for d in DATA]
+    
+    
+    def tearDown(self):
+        """Closes testing database."""
+        
+        self.connection.close()
+    
+    
+    def test_iter(self):
+        """Tests whether rows are read correctly."""
+        
+        linq = linque.Linque.from_sqlite(self.connection, 'items')
+        
+        self.assertIsInstance(linq, linque.SqliteLinque)
+        self.assertEqual(linq.to_list(), self.rows)
+        self.assertEqual(linq.count(), 6)
+        self.assertEqual(linq.first(), self.rows[0])
+    
+    
+    def test_where(self):
+        """Tests whether where works correctly."""
+        
+        linq = linque.Linque.from_sqlite(self.connection, 'items')
+        
+        result = linq.where((col('category') == 'office') & (col('price') * col('qty') > 22))
+        self.assertIsInstance(result, linque.SqliteLinque)
+        self.assertIn("WHERE", result.to_sql()[0])
+        self.assertEqual(result.select('name').to_list(), ['pen', 'pad'])
+        
+        result = linq.where(col('qty') == None)
+        self.assertEqual(result.select('name').to_list(), ['mug'])
+        
+        result = linq.where(col('name').isin(['cup', 'pot'])).where(col('price') / 8 > 1)
+        self.assertEqual(result.select('name').to_list(), ['pot'])
+        
+        # test fallback
+        result = linq.where(lambda d: d['name'].startswith('p'))
+        self.assertNotIsInstance(result, linque.SqliteLinque)
+        self.assertEqual(result.select(lambda d: d['name']).to_list(), ['pen', 'pad', 'pot'])
+        
+        result = linq.where(col('name') + 's' == 'pens')
+        self.assertNotIsInstance(result, linque.SqliteLinque)
+        self.assertEqual(result.count(), 1)
+    
+    
+    def test_sort(self):
+        """Tests whether sort works correctly."""
+        
+        linq = linque.Linque.from_sqlite(self.connection, 'items')
+        
+        result = linq.sort('price')
+        self.assertIn("ORDER BY", result.to_sql()[0])
+        self.assertEqual(result.select('id').to_list(), [4, 1, 3, 6, 2, 5])
+        
+        result = linq.sort(('category', 'price'), reverse=(False, True))
+        self.assertEqual(result.select('id').to_list(), [5, 3, 6, 2, 1, 4])
+        
+        result = linq.sort('id', reverse=True).sort(col('price'))
+        self.assertEqual(result.select('id').to_list(), [4, 1, 6, 3, 2, 5])
+        
+        # test fallback
+        result = linq.sort(lambda d: d['name'])
+        self.assertEqual(result.select(lambda d: d['name']).to_list(), ['cup', 'ink', 'mug', 'pad', 'pen', 'pot'])
+    
+    
+    def test_take_skip(self):
+        """Tests whether take and skip work correctly."""
+        
+        linq = linque.Linque.from_sqlite(self.connection, 'items')
+        
+        result = linq.sort('id').skip(1).take(3)
+        self.assertIn("LIMIT", result.to_sql()[0])
+        self.assertEqual(result.select('id').to_list(), [2, 3, 4])
+        
+        result = linq.sort('id').take(4).skip(1).take(10)
+        self.assertEqual(result.select('id').to_list(), [2, 3, 4])
+        
+        result = linq.sort('id').take(4).where(col('category') == 'office')
+        self.assertEqual(result.select('id').to_list(), [1, 2, 4])
+        self.assertEqual(result.count(), 3)
+        
+        result = linq.sort('id').take(3).sort('price')
+        self.assertEqual(result.select('id').to_list(), [1, 3, 2])
+    
+    
+    def test_select(self):
+        """Tests whether select works correctly."""
+        
+        linq = linque.Linque.from_sqlite(self.connection, 'items')
+        
+        result = linq.select(('id', 'name')).take(2)
+        self.assertEqual(result.to_list(), [{'id': 1, 'name': 'pen'}, {'id': 2, 'name': 'ink'}])
+        
+        result = linq.select(col('price') * 2).take(2)
+        self.assertEqual(result.to_list(), [5.0, 14.0])
+    
+    
+    def test_count(self):
+        """Tests whether count works correctly."""
+        
+        linq = linque.Linque.from_sqlite(self.connection, 'items')
+        
+        self.assertEqual(linq.count(col('price') > 3), 4)
+        self.assertEqual(linq.count(lambda d: d['price'] > 3), 4)
+        self.assertEqual(linq.where(col('category') == 'kitchen').count(), 3)
+    
+    
+    def test_distinct(self):
+        """Tests whether distinct works correctly."""
+        
+        linq = linque.Linque.from_sqlite(self.connection, 'items')
+        
+        result = linq.distinct('price').select(lambda d: d['id']).to_list()
+        self.assertEqual(result, [1, 2, 3, 4, 5])
+        
+        result = linq.sort('id', reverse=True).distinct('category').select(lambda d: d['id']).to_list()
+        self.assertEqual(result, [6, 4])
+    
+    
+    def test_group(self):
+        """Tests whether group works correctly."""
+        
+        linq = linque.Linque.from_sqlite(self.connection, 'items')
+        
+        result = linq.group('category').select(lambda d: (d[0], d[1].select(lambda x: x['id']).to_tuple())).to_list()
+        self.assertEqual(result, [('office', (1, 2, 4)), ('kitchen', (3, 5, 6))])
+        
+        result = linq.group(('category', 'price')).select(lambda d: (d[0], d[1].count())).to_list()
+        self.assertEqual(result, [(('office', 2.5), 1), (('office', 7.0), 1), (('kitchen', 4.0), 2), (('office', 1.5), 1), (('kitchen', 12.0), 1)])
+        
+        # test fallback
+        result = linq.group(lambda d: d['qty'] is None).select(lambda d: (d[0], d[1].count())).to_list()
+        self.assertEqual(result, [(False, 5), (True, 1)])
+    
+    
+    def test_join(self):
+        """Tests whether generic methods use the query rows."""
+        
+        linq = linque.Linque.from_sqlite(self.connection, 'items')
+        
+        result = linq.join((('office', 'Office'),), col('category'), col(0), lambda d1, d2: d2[1]).to_list()
+        self.assertEqual(result, ['Office', 'Office', 'Office'])
+
+    
+    
+    def test_to_sqlite(self):
+        """Tests whether items are inserted correctly."""
+        
+        self.connection.commit()
+        
+        # test new table
+        data = [{'id': i, 'name': str(i)} for i in range(25)]
+        summary = linque.Linque(data).to_sqlite(self.connection, 'new', {'id': 'INTEGER PRIMARY KEY', 'name': 'TEXT'}, batch_size=10)
+        self.assertEqual(summary['rows'], 25)
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(linque.Linque.from_sqlite(self.connection, 'new').to_list(), data)
+        
+        # test conflict
+        with self.assertRaises(sqlite3.IntegrityError):
+            linque.Linque([(30, 'a'), (1, 'b')]).to_sqlite(self.connection, 'new', batch_size=1)
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(linque.Linque.from_sqlite(self.connection, 'new').count(), 25)
+        
+        linque.Linque([(1, 'b')]).to_sqlite(self.connection, 'new', on_conflict='replace')
+        self.assertEqual(linque.Linque.from_sqlite(self.connection, 'new').where(col('id') == 1).select('name').first(), 'b')
+        
+        # test existing table
+        linque.Linque([{'name': 'box', 'id': 7}]).to_sqlite(self.connection, 'items')
+        self.assertEqual(linque.Linque.from_sqlite(self.connection, 'items').last(), {'id': 7, 'name': 'box', 'category': None, 'price': None, 'qty': None})
+        
+        # test open transaction
+        self.connection.execute("DELETE FROM new")
+        linque.Linque([(1, 'a')]).to_sqlite(self.connection, 'new')
+        self.assertTrue(self.connection.in_transaction)
+        self.connection.rollback()
+        self.assertEqual(linque.Linque.from_sqlite(self.connection, 'new').count(), 25)
+        
+        with self.assertRaises(ValueError):
+            linque.Linque([(1, 2)]).to_sqlite(self.connection, 'missing')
+        
+        # test autocommit
+        connection = sqlite3.connect(":memory:", isolation_level=None)
+        linque.Linque(data).to_sqlite(connection, 'new', ('id', 'name'), batch_size=10)
+        self.assertFalse(connection.in_transaction)
+        self.assertEqual(linque.Linque.from_sqlite(connection, 'new').count(), 25)
+        connection.close()
+
+
+# run test case
+if __name__ == "__main__":
+    unittest.main(verbosity=2)